@@ -0,0 +1,89 @@
+"""
+Cold-start profile for the tripmate_agents package.
+
+Every run uses a fresh interpreter (like a new Cloud Run instance) and times:
+  framework - importing google.adk / google.genai (paid by the server either way)
+  import    - `import tripmate_agents`
+  build     - first access to tripmate_agents.agent.root_agent (agent tree)
+  warm_up   - tripmate_agents.agent.warm_up() (logging client, model clients), if present
+and reports the median over --runs. Run from the mytripmate/ directory:
+
+    python benchmarks/cold_start.py --runs 5
+    python benchmarks/cold_start.py --importtime 15   # slowest modules by -X importtime
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, time
+tf = time.perf_counter()
+from google.adk import Agent, Runner  # already loaded by `adk web`
+import google.genai.types
+t0 = time.perf_counter()
+import tripmate_agents
+t1 = time.perf_counter()
+root = tripmate_agents.agent.root_agent
+t2 = time.perf_counter()
+warm = getattr(tripmate_agents.agent, "warm_up", None)
+steps = warm() if warm else {}
+t3 = time.perf_counter()
+print("COLD_START " + json.dumps({
+    "framework": t0 - tf, "import": t1 - t0, "build": t2 - t1, "warm_up": t3 - t2 if warm else None,
+    "steps": steps,
+}))
+"""
+
+
+def run_once(cwd: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=cwd, capture_output=True, text=True, env=os.environ)
+    for line in out.stdout.splitlines():
+        if line.startswith("COLD_START "):
+            return json.loads(line[len("COLD_START "):])
+    raise RuntimeError(f"probe failed:\n{out.stderr[-2000:]}")
+
+
+def importtime(cwd: str, top: int) -> list:
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import tripmate_agents.agent as a; a.root_agent"],
+                         cwd=cwd, capture_output=True, text=True, env=os.environ)
+    rows = []
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cwd", default=os.getcwd(), help="directory containing tripmate_agents/")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N", help="also list the N slowest imports")
+    parser.add_argument("--json", action="store_true", help="print the raw result as JSON")
+    args = parser.parse_args()
+
+    runs = [run_once(args.cwd) for _ in range(args.runs)]
+    summary = {}
+    for phase in ("framework", "import", "build", "warm_up"):
+        values = [r[phase] for r in runs if r[phase] is not None]
+        summary[phase] = round(statistics.median(values) * 1000, 1) if values else None
+    summary["to_first_request"] = round(sum(v for k, v in summary.items() if k in ("import", "build") and v), 1)
+
+    if args.json:
+        print(json.dumps({"runs": runs, "median_ms": summary}, indent=2))
+    else:
+        print(f"cold start over {args.runs} fresh interpreters (median ms)")
+        for phase, value in summary.items():
+            print(f"  {phase:<18}{'n/a' if value is None else f'{value:>10.1f}'}")
+    if args.importtime:
+        print(f"\nslowest imports (cumulative us, self us, module)")
+        for cumulative, self_us, name in importtime(args.cwd, args.importtime):
+            print(f"  {cumulative:>10} {self_us:>10}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Offline end-to-end benchmark: drives root_agent through ADK's InMemoryRunner with the
+scripted StubLlm, so no Gemini, Places, google_search, weather API or Cloud Logging call
+is made. A scenario (benchmarks/scenarios/*.json) lists the user turns and, per turn, the
+model replies (texts and tool calls) in the order the agents ask for them.
+
+A recorded conversation (tools/replay.py) runs the same way: record it with
+TRAFFIC_MODE=record, write a scenario with just its "user" messages, and run this with
+TRAFFIC_MODE=replay TRAFFIC_FIXTURE=<recording>; the model replies then come from the
+recording instead of the script.
+
+Per turn it reports the median over --runs of:
+  wall     - runner.run_async for the turn
+  tools    - function tool time (AgentTool sub-agent runs excluded; they are mostly model time)
+  model    - model call time (stub: framework overhead only)
+  persist  - save_to_file callbacks
+  py_peak  - Python allocation high-water mark in the turn (--tracemalloc)
+  rss_max  - process RSS high-water mark after the turn
+Run from anywhere:
+
+    python benchmarks/e2e.py                              # every scenario, 5 runs
+    python benchmarks/e2e.py --scenario chikkamagaluru_weekend --runs 10 --tracemalloc
+    python benchmarks/e2e.py --save base.json             # record a baseline
+    python benchmarks/e2e.py --compare base.json --tolerance 0.25   # exit 1 on regression
+"""
+
+import argparse
+import asyncio
+import contextlib
+import glob
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIO_DIR = os.path.join(ROOT, "benchmarks", "scenarios")
+
+# Offline configuration; set before tripmate_agents reads its config.
+OFFLINE_ENV = {
+    "MODEL_STUB": "true",
+    "WEATHER_PROVIDER": "fixture",
+    "CLOUD_LOGGING": "false",
+    "SEARCH_CACHE_BACKEND": "memory",
+    "LOG_SAMPLE_RATE": "0",
+}
+
+METRICS = ("wall", "tools", "model", "persist", "py_peak_mb", "rss_max_mb")
+
+
+def load_scenarios(selected):
+    paths = sorted(glob.glob(os.path.join(SCENARIO_DIR, "*.json")))
+    paths += [os.path.abspath(p) for p in selected or [] if os.path.isfile(p)]
+    scenarios = []
+    for path in dict.fromkeys(paths):
+        with open(path, "r", encoding="utf-8") as f:
+            scenario = json.load(f)
+        if not selected or scenario["name"] in selected or os.path.abspath(path) in map(os.path.abspath, selected):
+            scenarios.append(scenario)
+    return scenarios
+
+
+def _histogram_sum(registry, name, include=None, exclude=()):
+    series = registry.metrics[name].series
+    return sum(s[1] for labels, s in series.items()
+               if (include is None or dict(labels).get("tool") in include) and dict(labels).get("tool") not in exclude)
+
+
+def _time_persistence(agents, memory, timings):
+    """Wrap every save_to_file callback so its duration lands in `timings`."""
+    async def timed(callback_context):
+        started = time.perf_counter()
+        try:
+            return await memory.save_to_file(callback_context)
+        finally:
+            timings.append(time.perf_counter() - started)
+
+    for agent in agents:
+        for field in ("before_agent_callback", "after_agent_callback"):
+            current = getattr(agent, field, None)
+            callbacks = current if isinstance(current, list) else [current]
+            if memory.save_to_file in callbacks:
+                wrapped = [timed if cb is memory.save_to_file else cb for cb in callbacks]
+                setattr(agent, field, wrapped if isinstance(current, list) else wrapped[0])
+
+
+async def run_scenario(scenario, env, use_tracemalloc):
+    from google.adk.runners import InMemoryRunner
+    from google.genai import types
+
+    StubLlm, registry, root, agent_names, persist, search_cache, tape = env
+    # Every run starts with empty search caches (a cached AgentTool would skip the
+    # sub-agent's scripted reply) and, in replay mode, a rewound fixture.
+    search_cache.backend.clear()
+    tape.rewind()
+    runner = InMemoryRunner(agent=root, app_name="tripmate_bench")
+    session = await runner.session_service.create_session(app_name="tripmate_bench", user_id="user_0001")
+    StubLlm.reset()
+    turns = []
+    for number, turn in enumerate(scenario["turns"], start=1):
+        StubLlm.queue(*turn.get("model", []))
+        before = (len(StubLlm.requests), StubLlm.misses, len(persist),
+                  _histogram_sum(registry, "tripmate_tool_duration_seconds", exclude=agent_names),
+                  _histogram_sum(registry, "tripmate_model_duration_seconds"))
+        if use_tracemalloc:
+            tracemalloc.reset_peak()
+        message = types.Content(role="user", parts=[types.Part(text=turn["user"])])
+        started = time.perf_counter()
+        final = None
+        async for event in runner.run_async(user_id="user_0001", session_id=session.id, new_message=message):
+            if event.content and event.content.parts and event.content.parts[0].text:
+                final = f"{event.author}: {event.content.parts[0].text[:80]}"
+        wall = time.perf_counter() - started
+        leftover = len(StubLlm.replies)
+        StubLlm.replies.clear()
+        turns.append({
+            "turn": number,
+            "wall": wall,
+            "tools": _histogram_sum(registry, "tripmate_tool_duration_seconds", exclude=agent_names) - before[3],
+            "model": _histogram_sum(registry, "tripmate_model_duration_seconds") - before[4],
+            "persist": sum(persist[before[2]:]),
+            "py_peak_mb": tracemalloc.get_traced_memory()[1] / 2 ** 20 if use_tracemalloc else None,
+            "rss_max_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "model_calls": len(StubLlm.requests) - before[0],
+            # The script must match the agents' requests exactly, or the numbers are not comparable.
+            "script_ok": StubLlm.misses == before[1] and leftover == 0,
+            "unscripted_calls": StubLlm.misses - before[1],
+            "unused_replies": leftover,
+            "final": final,
+        })
+    return turns
+
+
+def setup(itinerary_dir):
+    os.chdir(ROOT)
+    sys.path.insert(0, ROOT)
+    for key, value in OFFLINE_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.setdefault("itinerary_dir", itinerary_dir)
+
+    from tripmate_agents import agent as agent_module
+    from tripmate_agents import metrics
+    from tripmate_agents.tools import memory
+    from tripmate_agents.tools.models import StubLlm
+    from tripmate_agents.tools.replay import tape
+    from tripmate_agents.tools.search_cache import search_cache
+
+    root = agent_module.build_root_agent()
+    agents = agent_module._walk(root)
+    persist = []
+    _time_persistence(agents, memory, persist)
+    return StubLlm, metrics.registry, root, {a.name for a in agents}, persist, search_cache, tape
+
+
+def summarize(runs):
+    """Median per turn and metric over runs: {turn: {metric: value}}."""
+    summary = {}
+    for turn_runs in zip(*runs):
+        number = turn_runs[0]["turn"]
+        summary[number] = {}
+        for metric in METRICS:
+            values = [t[metric] for t in turn_runs if t[metric] is not None]
+            summary[number][metric] = round(statistics.median(values), 4) if values else None
+        summary[number]["model_calls"] = turn_runs[0]["model_calls"]
+        summary[number]["script_ok"] = all(t["script_ok"] for t in turn_runs)
+    return summary
+
+
+def compare(current, baseline, tolerance):
+    regressions = []
+    for name, turns in current.items():
+        for number, values in turns.items():
+            old = (baseline.get(name) or {}).get(str(number)) or (baseline.get(name) or {}).get(number)
+            if old and old.get("wall") and values["wall"] > old["wall"] * (1 + tolerance):
+                regressions.append(f"{name} turn {number}: wall {old['wall']:.3f}s -> {values['wall']:.3f}s")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", help="scenario name or path (repeatable); default: all")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs first (agent build, caches)")
+    parser.add_argument("--tracemalloc", action="store_true", help="track the Python allocation peak per turn")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--save", metavar="PATH", help="write the per-turn medians as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to compare wall time against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed wall-time growth vs the baseline")
+    args = parser.parse_args()
+
+    # The agents print to stdout; keep it for the report.
+    with tempfile.TemporaryDirectory(prefix="tripmate-bench-") as itinerary_dir, \
+            contextlib.redirect_stdout(sys.stderr):
+        env = setup(itinerary_dir)
+        if args.tracemalloc:
+            tracemalloc.start()
+        results, raw = {}, {}
+        for scenario in load_scenarios(args.scenario):
+            for _ in range(args.warmup):
+                asyncio.run(run_scenario(scenario, env, args.tracemalloc))
+            runs = [asyncio.run(run_scenario(scenario, env, args.tracemalloc)) for _ in range(args.runs)]
+            results[scenario["name"]] = summarize(runs)
+            raw[scenario["name"]] = runs
+
+    if args.json:
+        print(json.dumps({"median": results, "runs": raw}, indent=2, default=str))
+    else:
+        for name, turns in results.items():
+            print(f"{name}: median of {args.runs} runs (seconds, MB)")
+            print(f"  {'turn':>4} {'wall':>8} {'tools':>8} {'model':>8} {'persist':>8} {'py_peak':>8} "
+                  f"{'rss_max':>8} {'calls':>6}  script")
+            for number, v in turns.items():
+                cells = [f"{v[m]:>8.3f}" if v[m] is not None else f"{'-':>8}" for m in METRICS]
+                print(f"  {number:>4} {' '.join(cells)} {v['model_calls']:>6}  {'ok' if v['script_ok'] else 'MISMATCH'}")
+            total = sum(v["wall"] for v in turns.values())
+            print(f"  total wall {total:.3f}s")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    status = 0
+    if any(not v["script_ok"] for turns in results.values() for v in turns.values()):
+        print("scenario script does not match the agents' model requests (see --json for details)", file=sys.stderr)
+        status = 1
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        status = status or (1 if regressions else 0)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+"""
+Concurrent-session load test for one server instance, to find where it saturates.
+
+By default it starts a local `adk web --no-reload` (or, with --workers N, the production
+server.py under `uvicorn --workers N`) on a free port with the offline configuration of
+benchmarks/e2e.py and the stub model. The scenarios in benchmarks/scenarios/ are first
+played once through a stubbed server in record mode (StubLlm queued from their model
+replies via MODEL_STUB_SCRIPT, TRAFFIC_MODE=record); the server under load replays that
+recording (TRAFFIC_MODE=replay), so every simulated user gets the scripted replies for
+its own conversation, whatever the interleaving. No Gemini, Places, weather or Cloud
+Logging call is made.
+
+Each simulated user opens a session and plays a scenario's user turns through POST
+/run, then starts over with the next scenario, until the step's --duration is up.
+For every step of --users it reports:
+  turns/s        - completed turns per second (throughput)
+  p50/p95/p99    - turn latency (POST /run round trip), seconds
+  errors         - failed turns (HTTP error or timeout)
+  lag p50/p99    - server event-loop lag (bucket upper bound), from the metrics endpoint
+                   (with several workers, of the one that bound METRICS_PORT)
+  lag max        - worst server event-loop lag so far
+  rss            - resident memory per server process at the end of the step, MB
+  client lag     - this tool's own loop lag; if it grows, the generator is the bottleneck
+The step where turns/s stops growing while latency climbs is the instance's saturation point.
+
+    python benchmarks/load.py                               # 1,2,4,8,16 users, 20 s each
+    python benchmarks/load.py --users 8,16,32,64 --duration 60 --think 1
+    python benchmarks/load.py --users 4,16,32 --workers 4    # production server, 4 workers
+    python benchmarks/load.py --url http://localhost:8080 --metrics-url http://localhost:9464 \\
+        --pid 1234                                          # an already running server
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from e2e import OFFLINE_ENV, load_scenarios  # noqa: E402
+
+APP_NAME = "tripmate_agents"
+USER_ID = "user_0001"  # the user the scenarios are recorded for (profiles/user_0001.json)
+LAG_METRIC = "tripmate_event_loop_lag_seconds"
+
+
+# ---- Server ----
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workdir: str, name: str, session_uri: Optional[str] = None, workers: int = 0, **env):
+    """
+    `adk web` (or, with `workers`, `uvicorn server:app --workers N`) on a free port with the
+    offline configuration plus `env`; logs to workdir/<name>.log.
+    """
+    port = _free_port()
+    env = {**os.environ, **OFFLINE_ENV, "itinerary_dir": os.path.join(workdir, "itinerary"),
+           **{k: str(v) for k, v in env.items()}}
+    if workers:
+        env.update(SESSION_DB_PATH=os.path.join(workdir, "sessions.db"), **({"SESSION_DB_URL": session_uri}
+                                                                          if session_uri else {}))
+        command = [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1", "--port", str(port),
+                   "--workers", str(workers)]
+    else:
+        # adk's default session store is SQLite under tripmate_agents/.adk/.
+        session_args = ["--session_service_uri", session_uri] if session_uri else []
+        command = ["adk", "web", "--no-reload", "--host", "127.0.0.1", "--port", str(port), *session_args, ROOT]
+    log = open(os.path.join(workdir, f"{name}.log"), "w", encoding="utf-8")
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process, f"http://127.0.0.1:{port}", log
+
+
+def stop_server(process, log) -> None:
+    process.terminate()
+    with contextlib.suppress(subprocess.TimeoutExpired):
+        process.wait(timeout=10)
+    if process.poll() is None:
+        process.kill()
+    log.close()
+
+
+async def record_fixture(scenarios, workdir: str, path: str) -> None:
+    """
+    Record every scenario once, one session after another, through a stubbed server
+    (StubLlm queued from the scenarios' model replies) into the replay fixture. The
+    recording comes from `adk web` itself, so the replay sees the same agent routing.
+    """
+    scripts = []
+    for number, scenario in enumerate(scenarios):
+        scripts.append(os.path.join(workdir, f"script_{number}.json"))
+        with open(scripts[-1], "w", encoding="utf-8") as f:
+            json.dump(scenario, f)
+    process, url, log = start_server(workdir, "record", "memory://",
+                                     TRAFFIC_MODE="record", TRAFFIC_FIXTURE=path,
+                                     MODEL_STUB_SCRIPT=",".join(scripts))
+    try:
+        await wait_ready(url)
+        async with httpx.AsyncClient(timeout=120) as client:
+            for scenario in scenarios:
+                errors = []
+                await play(client, url, scenario, errors)
+                if errors:
+                    raise RuntimeError(f"recording {scenario['name']} failed: {errors[0]} (see {log.name})")
+    finally:
+        stop_server(process, log)
+
+
+async def wait_ready(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            with contextlib.suppress(httpx.HTTPError):
+                if (await client.get(f"{url}/list-apps")).status_code == 200:
+                    return
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not come up in {timeout:.0f}s")
+
+
+def process_rss(pid: int) -> dict:
+    """{pid: RSS MB} for `pid` and its descendants (Linux /proc)."""
+    rss, pending = {}, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status", encoding="utf-8") as f:
+                kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+            rss[current] = round(kb / 1024, 1)
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children", encoding="utf-8") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, StopIteration, ValueError):
+            continue
+    return rss
+
+
+# ---- Server metrics ----
+async def lag_snapshot(client: httpx.AsyncClient, metrics_url) -> dict:
+    """Cumulative lag histogram buckets {le: count} plus the running max, or {}."""
+    if not metrics_url:
+        return {}
+    try:
+        text = (await client.get(f"{metrics_url}/metrics")).text
+        summary = (await client.get(f"{metrics_url}/metrics.json")).json()
+    except (httpx.HTTPError, ValueError):
+        return {}
+    buckets = {}
+    for line in text.splitlines():
+        if line.startswith(f"{LAG_METRIC}_bucket"):
+            le = line.split('le="', 1)[1].split('"', 1)[0]
+            buckets[math.inf if le == "+Inf" else float(le)] = float(line.rsplit(" ", 1)[1])
+    series = summary.get(LAG_METRIC) or [{}]
+    return {"buckets": buckets, "max": series[0].get("max")}
+
+
+def lag_quantile(before: dict, after: dict, q: float):
+    """Bucket upper bound for quantile q of the lag samples taken between two snapshots."""
+    buckets = after.get("buckets") or {}
+    counts = [(le, n - (before.get("buckets") or {}).get(le, 0)) for le, n in sorted(buckets.items())]
+    if not counts or counts[-1][1] <= 0:
+        return None
+    target = q * counts[-1][1]
+    bound = next(le for le, n in counts if n >= target)
+    return min(bound, after["max"]) if after.get("max") is not None else bound
+
+
+# ---- Users ----
+async def play(client: httpx.AsyncClient, url: str, scenario, errors: list, stop_at: float = math.inf,
+               think: float = 0, latencies: Optional[list] = None) -> None:
+    """One session through the scenario's user turns (stops early at `stop_at` or on an error)."""
+    try:
+        response = await client.post(f"{url}/apps/{APP_NAME}/users/{USER_ID}/sessions", json={})
+        response.raise_for_status()
+        session_id = response.json()["id"]
+    except (httpx.HTTPError, ValueError, KeyError) as e:
+        errors.append(f"session: {e!r}")
+        return
+    for turn in scenario["turns"]:
+        if time.monotonic() >= stop_at:
+            return
+        body = {"app_name": APP_NAME, "user_id": USER_ID, "session_id": session_id,
+                "new_message": {"role": "user", "parts": [{"text": turn["user"]}]}}
+        started = time.perf_counter()
+        try:
+            response = await client.post(f"{url}/run", json=body)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            errors.append(f"run: {e!r}")
+            return
+        if latencies is not None:
+            latencies.append(time.perf_counter() - started)
+        if think:
+            await asyncio.sleep(think)
+
+
+async def run_user(client, url, scenarios, offset: int, stop_at: float, think: float,
+                   latencies: list, errors: list) -> None:
+    """Play the scenarios round-robin, a new session each, until `stop_at`."""
+    index = offset
+    while time.monotonic() < stop_at:
+        failed = len(errors)
+        await play(client, url, scenarios[index % len(scenarios)], errors, stop_at, think, latencies)
+        index += 1
+        if len(errors) > failed:
+            await asyncio.sleep(0.5)  # back off instead of hammering a failing server
+
+
+async def client_lag(stop: asyncio.Event, samples: list, interval: float = 0.05) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - started - interval))
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+async def run_step(url, metrics_url, pid, scenarios, users, duration, think, timeout) -> dict:
+    latencies, errors, lags = [], [], []
+    limits = httpx.Limits(max_connections=users + 4, max_keepalive_connections=users + 4)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        before = await lag_snapshot(client, metrics_url)
+        stop = asyncio.Event()
+        probe = asyncio.create_task(client_lag(stop, lags))
+        started = time.monotonic()
+        await asyncio.gather(*(run_user(client, url, scenarios, n, started + duration, think, latencies, errors)
+                               for n in range(users)))
+        elapsed = time.monotonic() - started
+        stop.set()
+        await probe
+        after = await lag_snapshot(client, metrics_url)
+    return {
+        "users": users,
+        "seconds": round(elapsed, 2),
+        "turns": len(latencies),
+        "turns_per_s": round(len(latencies) / elapsed, 2),
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "lag_p50": lag_quantile(before, after, 0.5),
+        "lag_p99": lag_quantile(before, after, 0.99),
+        "lag_max": after.get("max"),
+        "rss_mb": process_rss(pid) if pid else {},
+        "client_lag_max": round(max(lags), 4) if lags else None,
+    }
+
+
+def saturation(steps) -> str:
+    """First step whose throughput gained under 10% over the previous one."""
+    for previous, step in zip(steps, steps[1:]):
+        if step["turns_per_s"] < previous["turns_per_s"] * 1.1:
+            return (f"throughput flattens at ~{previous['users']} users "
+                    f"({previous['turns_per_s']} turns/s; {step['users']} users: {step['turns_per_s']} turns/s)")
+    return "no saturation within the tested steps"
+
+
+def _fmt(value, width=8, digits=3):
+    return f"{'-':>{width}}" if value is None else f"{value:>{width}.{digits}f}"
+
+
+async def main_async(args) -> list:
+    scenarios = load_scenarios(args.scenario)
+    if not scenarios:
+        raise SystemExit("no scenarios found")
+    server = None
+    with tempfile.TemporaryDirectory(prefix="tripmate-load-") as workdir:
+        url, metrics_url, pid = args.url, args.metrics_url, args.pid
+        try:
+            if not url:
+                fixture = args.fixture or os.path.join(workdir, "traffic.jsonl.gz")
+                if not args.fixture:
+                    print(f"recording {len(scenarios)} scenario(s) through the stub model ...", file=sys.stderr)
+                    await record_fixture(scenarios, workdir, fixture)
+                metrics_port = _free_port()
+                server = start_server(workdir, "server", args.session_service_uri, args.workers,
+                                      TRAFFIC_MODE="replay", TRAFFIC_FIXTURE=fixture,
+                                      METRICS_PORT=metrics_port, LOOP_LAG_INTERVAL=args.lag_interval)
+                process, url, log = server
+                metrics_url, pid = f"http://127.0.0.1:{metrics_port}", process.pid
+                print(f"server {url} (pid {pid})", file=sys.stderr)
+            await wait_ready(url)
+            steps = []
+            for users in (int(u) for u in args.users.split(",")):
+                step = await run_step(url, metrics_url, pid, scenarios, users, args.duration, args.think, args.timeout)
+                steps.append(step)
+                print(f"{users:>4} users: {step['turns_per_s']} turns/s, p95 {_fmt(step['p95'], 0)}s, "
+                      f"{step['errors']} errors", file=sys.stderr)
+            return steps
+        finally:
+            if server is not None:
+                process, _, log = server
+                stop_server(process, log)
+                if args.keep_log:
+                    shutil.copy(log.name, args.keep_log)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", default="1,2,4,8,16", help="comma-separated concurrent users per step")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per step")
+    parser.add_argument("--think", type=float, default=0, help="pause between a user's turns, seconds")
+    parser.add_argument("--timeout", type=float, default=120, help="per-turn timeout, seconds")
+    parser.add_argument("--scenario", action="append", help="scenario name or path (repeatable); default: all")
+    parser.add_argument("--fixture", help="replay this recording instead of recording the scenarios")
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="server loop-lag probe period, seconds")
+    parser.add_argument("--url", help="target an already running server (started with TRAFFIC_MODE=replay)")
+    parser.add_argument("--metrics-url", help="its metrics endpoint (METRICS_PORT), for event-loop lag")
+    parser.add_argument("--pid", type=int, help="its process id, for RSS")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="load server.py under uvicorn with this many workers instead of adk web")
+    parser.add_argument("--session-service-uri", help="session store URI (default: adk's / sessions.py's SQLite)")
+    parser.add_argument("--keep-log", metavar="PATH", help="copy the started server's log here")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    steps = asyncio.run(main_async(args))
+    if args.json:
+        print(json.dumps({"steps": steps, "saturation": saturation(steps)}, indent=2))
+        return 0
+    print(f"{'users':>5} {'turns/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>6} "
+          f"{'lag p50':>8} {'lag p99':>8} {'lag max':>8} {'rss MB':>8} {'cli lag':>8}")
+    for s in steps:
+        rss = sum(s["rss_mb"].values()) if s["rss_mb"] else None
+        print(f"{s['users']:>5} {s['turns_per_s']:>8.2f} {_fmt(s['p50'])} {_fmt(s['p95'])} {_fmt(s['p99'])} "
+              f"{s['errors']:>6} {_fmt(s['lag_p50'])} {_fmt(s['lag_p99'])} {_fmt(s['lag_max'])} "
+              f"{_fmt(rss, digits=1)} {_fmt(s['client_lag_max'])}")
+        if len(s["rss_mb"]) > 1:
+            print(f"{'':>5} rss per process: " + ", ".join(f"{pid}={mb}" for pid, mb in s["rss_mb"].items()))
+        for sample in s["error_samples"]:
+            print(f"{'':>5} error: {sample}")
+    print(saturation(steps))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,15 @@ PORT="${PORT:-8080}"
 # For you it’s the mytripmate folder (where you normally run `adk web`).
 cd /app
 
+# SERVE_MODE=web (default): the single-process `adk web` UI, as before.
+# SERVE_MODE=api (opt-in): the agent API from server.py behind uvicorn with one
+# worker per CPU (override with WEB_CONCURRENCY) and shared session storage
+# (SESSION_DB_URL, else SQLite at SESSION_DB_PATH).
+if [ "${SERVE_MODE:-web}" = "api" ]; then
+  exec uvicorn server:app --host 0.0.0.0 --port "${PORT}" \
+    --workers "${WEB_CONCURRENCY:-$(nproc)}" --timeout-graceful-shutdown 10
+fi
+
 # Launch ADK web bound to 0.0.0.0 so Cloud Run/LB can reach it.
 # Most ADK builds forward these to uvicorn; if your ADK version
 # ignores them, it will still run on 8000—Cloud Run will proxy to 8080.
@@ -0,0 +1,56 @@
+"""
+Production ASGI entrypoint: the ADK agent API (/run, /run_sse, /apps/.../sessions, ...)
+without the dev UI, for a multi-worker server:
+
+    uvicorn server:app --host 0.0.0.0 --port 8080 --workers 4
+
+serve.sh starts it this way with SERVE_MODE=api (opt-in; the default is still adk web)
+and WEB_CONCURRENCY workers, one per CPU unless set. Every worker is a separate process with its own event loop,
+so turns spread over all cores, and all workers share one session store
+(tripmate_agents/sessions.py: SESSION_DB_URL, or the pooled SQLite file at
+SESSION_DB_PATH), so any worker can continue any session and sessions outlive a
+restart. Large state values live beside them as artifacts (tools/blobs.py), in
+tripmate_agents/.adk/artifacts or at ARTIFACT_SERVICE_URI (gs://...). Each worker
+builds the agent tree and clients on startup (agent.warm_up), not on its first
+request. SERVE_WEB_UI=true adds the adk web UI.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from google.adk.cli.fast_api import get_fast_api_app
+
+from tripmate_agents import sessions
+from tripmate_agents.tools.config import ARTIFACT_SERVICE_URI
+
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ALLOW_ORIGINS = [o for o in os.environ.get("ALLOW_ORIGINS", "").split(",") if o]
+SERVE_WEB_UI = os.environ.get("SERVE_WEB_UI", "false").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    from tripmate_agents import agent
+
+    timings = await asyncio.to_thread(agent.warm_up)
+    logger.info("Worker %d ready: %s", os.getpid(), {k: round(v, 3) for k, v in timings.items()})
+    try:
+        yield
+    finally:
+        await sessions.close()
+
+
+sessions.register()
+app = get_fast_api_app(
+    agents_dir=ROOT,
+    session_service_uri=sessions.service_uri(),
+    session_db_kwargs=sessions.db_kwargs(),
+    artifact_service_uri=ARTIFACT_SERVICE_URI,
+    allow_origins=ALLOW_ORIGINS or None,
+    web=SERVE_WEB_UI,
+    lifespan=lifespan,
+)
@@ -0,0 +1,32 @@
+"""PII redaction of logged model traffic in callback_logging.py."""
+
+import pytest
+
+from tripmate_agents.callback_logging import redact
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Call 9876543210.", "Call [phone]."),
+    ("Call 98765 43210 or 98765-43210", "Call [phone] or [phone]"),
+    ("+91 98765 43210", "[phone]"),
+    ("+91-9876543210", "[phone]"),
+    ("+919876543210", "[phone]"),
+    ("US desk: +1 (415) 555-2671", "US desk: [phone]"),
+    ("mail a.b@example.com, pay riya@okaxis", "mail [email], pay [upi]"),
+])
+def test_redacts(text, expected):
+    assert redact(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Departs 2025-10-18 10:00",
+    "Departs 2025-10-18T10:00:00+05:30",
+    "Arrives 18/10/2025 09:30",
+    "PNR 4521 3344 12",
+    "PNR 4521334412",
+    "Train 12627, coach B2, berths 33-36",
+    "Total ₹1,24,500.00 for 6 nights",
+    "epoch 1760781600",
+])
+def test_leaves_non_phone_numbers(text):
+    assert redact(text) == text
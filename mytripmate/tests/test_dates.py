@@ -0,0 +1,36 @@
+"""Date phrases resolved by tools/dates.py."""
+
+from datetime import date
+
+import pytest
+
+from tripmate_agents.tools.dates import normalize_relative_dates
+
+FRIDAY = date(2025, 9, 19)
+SUNDAY = date(2025, 9, 21)
+
+
+@pytest.mark.parametrize("text, today, start, end, confidence", [
+    ("mon 6 oct", FRIDAY, "2025-10-06", "2025-10-06", "high"),
+    ("Monday, October 6", FRIDAY, "2025-10-06", "2025-10-06", "high"),
+    ("mon 5 oct", FRIDAY, "2025-10-05", "2025-10-05", "low"),  # 5 Oct 2025 is a Sunday
+    ("on friday 10 oct to 12 oct", FRIDAY, "2025-10-10", "2025-10-12", "high"),
+    ("15 Nov for 4 days", FRIDAY, "2025-11-15", "2025-11-18", "high"),
+    ("may 2 to may 5", FRIDAY, "2026-05-02", "2026-05-05", "high"),
+    ("we may travel on 2 may", FRIDAY, "2026-05-02", "2026-05-02", "high"),
+    ("weekend getaway for 2 days", SUNDAY, "2025-09-27", "2025-09-28", "medium"),
+    ("weekend getaway for 2 days", FRIDAY, "2025-09-20", "2025-09-21", "medium"),
+    ("this weekend", SUNDAY, "2025-09-21", "2025-09-21", "high"),
+    ("this Friday for 3 days", date(2025, 9, 16), "2025-09-19", "2025-09-21", "high"),
+    ("in 2 weeks", FRIDAY, "2025-10-03", "2025-10-03", "high"),
+    ("agle hafte", FRIDAY, "2025-09-22", "2025-09-28", "high"),
+    ("२ हफ्ते बाद", FRIDAY, "2025-10-03", "2025-10-03", "high"),
+])
+def test_resolves(text, today, start, end, confidence):
+    result = normalize_relative_dates(text, today)
+    assert (result["start_date"], result["end_date"], result["confidence"]) == (start, end, confidence)
+
+
+@pytest.mark.parametrize("text", ["I may 2 travel", "we may go somewhere cool", "she may 3 times visit"])
+def test_modal_may_is_not_a_month(text):
+    assert normalize_relative_dates(text, FRIDAY)["start_date"] is None
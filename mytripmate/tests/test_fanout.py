@@ -0,0 +1,46 @@
+"""Deadline handling of the transport fan-out (tools/fanout.py)."""
+
+import asyncio
+import json
+
+from tripmate_agents.tools import fanout
+
+TRAIN = json.dumps([{"mode": "train", "train_name": "Express", "duration": "5h 25m",
+                     "price_total": {"amount": 1460, "currency": "INR"}}])
+
+
+class _Search:
+    def __init__(self, delay, result="[]"):
+        self.delay, self.result, self.finished = delay, result, False
+
+    async def _search(self):
+        await asyncio.sleep(self.delay)
+        self.finished = True
+        return self.result
+
+
+class _DetachedSearch(_Search):
+    async def run_detached(self, args):
+        return await self._search()
+
+
+class _ContextSearch(_Search):
+    async def run_async(self, *, args, tool_context):
+        return await self._search()
+
+
+def test_late_searches_outlive_the_turn_only_when_detached():
+    fast, late, live = _DetachedSearch(0, TRAIN), _DetachedSearch(0.2), _ContextSearch(0.2)
+    tool = fanout.make_fanout_tool({"train": fast, "flight": late, "bus": live}, deadline=0.05)
+
+    async def main():
+        result = await tool("Bengaluru", "Mysuru", "2026-12-11", tool_context=None)
+        assert len(fanout._late) == 1
+        await asyncio.sleep(0.3)
+        return result
+
+    result = asyncio.run(main())
+    assert result["options"]["train"][0]["train_name"] == "Express"
+    assert sorted(result["timed_out"]) == ["bus", "flight"]
+    assert late.finished and not live.finished
+    assert not fanout._late
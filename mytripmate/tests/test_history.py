@@ -0,0 +1,38 @@
+"""Conversation-history window (history.py)."""
+
+from google.genai import types
+
+from tripmate_agents import history
+from tripmate_agents.tools import config
+
+
+def _user(text):
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def _model(text):
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+CONSTRAINT = ("We are 2 adults and my father, who uses a wheelchair, so no treks or long stairs; "
+              "all of us are strict vegetarians (Jain food, no onion or garlic) and we would like "
+              "quiet homestays rather than resorts, ideally close to the coffee estates.")
+DRAFT = "Draft itinerary:\nDay 1: Mullayanagiri viewpoint by car, estate lunch\nDay 2: Hirekolale lake, Jain thali"
+
+
+def test_window_is_off_by_default():
+    assert config.HISTORY_KEEP_TURNS == 0
+    contents = [_user(f"question {i}") for i in range(20)]
+    assert history.window(contents, {}) == (contents, 0)
+
+
+def test_summary_keeps_constraints_and_latest_draft():
+    contents = [_user(CONSTRAINT), _model("Some ideas: Chikkamagaluru, Coorg, Sakleshpur"),
+                _user("Chikkamagaluru please, 2 days"), _model(DRAFT),
+                _user("swap the days"), _model("Swapped."), _user("looks good")]
+    windowed, summarized = history.window(contents, {}, keep_turns=2)
+    summary = windowed[0].parts[0].text
+    assert summarized == 2
+    assert CONSTRAINT in summary
+    assert DRAFT in summary
+    assert windowed[1:] == contents[4:]
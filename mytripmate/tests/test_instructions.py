@@ -0,0 +1,39 @@
+"""Phase-dependent planning instruction (instructions.py, planing_agent/agent.py)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from tripmate_agents.instructions import mark_phase
+from tripmate_agents.sub_agents.planing_agent.agent import planning_instruction
+
+
+def _after(tool_name, response, state):
+    mark_phase(SimpleNamespace(name=tool_name), {}, SimpleNamespace(state=state), response)
+    return state
+
+
+def _sends_schema(state):
+    return "save" not in planning_instruction.render(state)[1]
+
+
+def test_schema_waits_for_the_hotel_step():
+    state = _after("rank_transport_options", {"status": "ok"}, {})
+    assert not _sends_schema(_after("allocate_seats", {"status": "ok"}, state))
+
+
+@pytest.mark.parametrize("tool_name, response", [
+    ("hotel_search_agent", '[{"name": "Coffee Estate Homestay"}]'),
+    ("hotel_room_selection_agent", '[{"room_type": "Deluxe"}]'),
+    ("optimize_rooms", {"status": "ok"}),
+    ("save_to_state", {"status": "error", "error": '"trip_plan" does not match the expected JSON shape'}),
+])
+def test_schema_is_sent_once_a_save_may_follow(tool_name, response):
+    assert _sends_schema(_after(tool_name, response, {}))
+
+
+def test_failed_room_optimization_still_sends_schema_after_hotel_search():
+    state = _after("hotel_search_agent", "[]", {})
+    state = _after("optimize_rooms", {"status": "error", "error": "no room options"}, state)
+    assert "_plan_rooms_chosen" not in state
+    assert _sends_schema(state)
@@ -0,0 +1,42 @@
+"""tools/json_repair.py: near-JSON model output repaired locally."""
+
+import pytest
+
+from tripmate_agents.tools.json_repair import repair
+
+
+@pytest.mark.parametrize("text, expected, fix", [
+    ('{"a": 1,}', {"a": 1}, "trailing comma"),
+    ('[1,, 2]', [1, 2], "extra comma"),
+    ('{a: 1, b_c: "x"}', {"a": 1, "b_c": "x"}, "unquoted key"),
+    ("{'a': 'say \\'hi\\' \"now\"'}", {"a": "say 'hi' \"now\""}, "single-quoted string"),
+    ('{"a": True, "b": None}', {"a": True, "b": None}, "Python literal"),
+    ('{"a": +1, "b": .5}', {"a": 1, "b": 0.5}, "number format"),
+    ('{"a": 1 // note\n}', {"a": 1}, "comment"),
+    ('{"a": "line\nbreak"}', {"a": "line\nbreak"}, "control character in string"),
+    ('```json\n{"a": 1}\n```', {"a": 1}, "text around JSON"),
+    ('Here you go: [1, 2] hope it helps', [1, 2], "text around JSON"),
+    ('{"a": [1, 2', {"a": [1, 2]}, "unclosed brackets"),
+    ('{"a": "trunc', {"a": "trunc"}, "unterminated string"),
+    ('{"a": 1, "b":', {"a": 1, "b": None}, "unclosed brackets"),
+    ('{"a": [1, 2}', {"a": [1, 2]}, "mismatched bracket"),
+])
+def test_repairs(text, expected, fix):
+    value, fixes = repair(text)
+    assert value == expected
+    assert fix in fixes
+
+
+def test_valid_json_is_untouched():
+    assert repair('{"a": [1, {"b": null}]}') == ({"a": [1, {"b": None}]}, [])
+
+
+def test_dangling_key_gets_null():
+    value, _ = repair('{"a": 1, "b"')
+    assert value == {"a": 1, "b": None}
+
+
+@pytest.mark.parametrize("text", ["not json at all", "", "   "])
+def test_unrepairable_raises(text):
+    with pytest.raises(ValueError):
+        repair(text)
@@ -0,0 +1,30 @@
+"""Duration parsing in tools/ranking.py."""
+
+import math
+
+import pytest
+
+from tripmate_agents.tools.ranking import _duration_minutes
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("2h 15m", 135),
+    ("2h15m", 135),
+    ("1h30m", 90),
+    ("PT2H15M", 135),
+    ("PT45M", 45),
+    ("P1DT3H", 1620),
+    ("02:15", 135),
+    ("135 min", 135),
+    ("2 hours 5 minutes", 125),
+    ("1 day 3 hrs", 1620),
+    ("1.5 hrs", 90),
+    (95, 95),
+])
+def test_duration_minutes(raw, expected):
+    assert _duration_minutes(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["", None, "overnight", "P"])
+def test_duration_minutes_unparsed(raw):
+    assert math.isnan(_duration_minutes(raw))
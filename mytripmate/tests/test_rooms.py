@@ -0,0 +1,46 @@
+"""Room-combination search in tools/rooms.py."""
+
+import itertools
+
+from tripmate_agents.tools.rooms import optimize_rooms
+
+
+def _room(name, occupancy, price, bed="queen", amenities=0):
+    return {"room_type": name, "occupancy_limit": occupancy, "bed_type": bed, "amenities": ["x"] * amenities,
+            "price_per_night": {"amount": price, "currency": "INR"}}
+
+
+def _cheapest_by_brute_force(rooms, guests, max_rooms):
+    best = None
+    for counts in itertools.product(range(max_rooms + 1), repeat=len(rooms)):
+        if 0 < sum(counts) <= max_rooms and sum(c * r["occupancy_limit"] for c, r in zip(counts, rooms)) >= guests:
+            price = sum(c * r["price_per_night"]["amount"] for c, r in zip(counts, rooms))
+            best = price if best is None else min(best, price)
+    return best
+
+
+def test_cheapest_matches_brute_force():
+    rooms = [_room("Single", 1, 1800), _room("Double", 2, 2600, "king", 5), _room("Family", 4, 5600, "twin", 3)]
+    for adults in range(1, 7):
+        result = optimize_rooms(rooms, adults, children=1, nights=2, top_k=2)
+        assert result["cheapest"]["total_price"]["amount"] == 2 * _cheapest_by_brute_force(rooms, adults + 1, adults)
+        prices = [o["total_price"]["amount"] for o in [result["cheapest"], *result["alternatives"]]]
+        assert prices == sorted(prices)
+
+
+def test_large_group_prunes_the_search():
+    rooms = [_room(f"R{i}", 1 + i % 4, 1500 + 350 * i, ("king", "twin", "queen", "single")[i % 4], i % 8)
+             for i in range(10)]
+    result = optimize_rooms(rooms, adults=20, nights=2, top_k=3)
+    assert result["status"] == "ok"
+    assert result["cheapest"]["total_price"]["amount"] == 25500
+    assert len(result["alternatives"]) == 3
+    assert result["considered"] < 5000  # of ~60k minimal combinations
+    assert sum(s["adults"] for s in result["best_comfort"]["allocation"]) == 20
+
+
+def test_budget_limits_best_comfort():
+    rooms = [_room("Standard", 2, 2000), _room("Suite", 2, 9000, "king", 8)]
+    result = optimize_rooms(rooms, adults=2, nights=1, budget=3000)
+    assert result["best_comfort"]["rooms"][0]["room_type"] == "Standard"
+    assert optimize_rooms(rooms, adults=2, nights=1)["best_comfort"]["rooms"][0]["room_type"] == "Suite"
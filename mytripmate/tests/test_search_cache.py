@@ -0,0 +1,61 @@
+"""What the shared search cache agrees to store (tools/search_cache.py)."""
+
+import json
+
+import pytest
+
+from tripmate_agents.tools import search_cache
+from tripmate_agents.tools.minhash import MinHashIndex
+from tripmate_agents.tools.search_cache import _cacheable, _exact, query_key
+
+TRAINS = json.dumps([{
+    "mode": "train", "train_name": "Chikkamagaluru Express", "train_number": "16239",
+    "origin": "Bengaluru", "destination": "Chikkamagaluru", "departure_time": "2026-12-11T06:45",
+    "arrival_time": "2026-12-11T12:10", "duration": "5h 25m", "class": "3A",
+    "price_total": {"amount": 1460, "currency": "INR"}, "stops": 6,
+}])
+
+
+def test_stores_search_answers():
+    assert _cacheable("train_search_agent", TRAINS)
+    assert _cacheable("train_search_agent", f"```json\n{TRAINS}\n```")
+    assert _cacheable("google_search_agent", "Coorg is best visited between October and March.")
+
+
+@pytest.mark.parametrize("agent, result", [
+    ("train_search_agent", "[]"),
+    ("train_search_agent", "Sorry, I couldn't find any trains on that date."),
+    ("train_search_agent", "Response was blocked due to SAFETY"),
+    ("train_search_agent", {"status": "error", "error": "timeout"}),
+    ("google_search_agent", "No results found for that question."),
+    ("google_search_agent", "Unfortunately I could not find anything."),
+    ("google_search_agent", ""),
+])
+def test_refuses_non_answers(agent, result):
+    assert not _cacheable(agent, result)
+
+
+def test_refuses_the_sub_agents_error_output():
+    error = "429 RESOURCE_EXHAUSTED. Quota exceeded."
+    assert _cacheable("google_search_agent", error)
+    assert not _cacheable("google_search_agent", error, [error])
+
+
+def test_similarity_tier_is_off_by_default():
+    assert search_cache.SEARCH_SIMILARITY_THRESHOLD == 0
+
+
+def _near_duplicate(first, second, threshold=0.3):
+    index = MinHashIndex(threshold=threshold)
+    key = query_key({"request": first})
+    index.add(key, frozenset(key.split()), _exact({"request": first}))
+    other = query_key({"request": second})
+    return index.query(frozenset(other.split()), _exact({"request": second})) is not None
+
+
+def test_near_duplicates_need_matching_request_fields():
+    assert _near_duplicate("good homestays in Coorg on 11 Dec 2026", "nice homestays in Coorg on 11 Dec, 2026")
+    assert not _near_duplicate("best homestays in Coorg on 11 Dec 2026", "best homestays in Coorg on 11 Jan 2026")
+    assert not _near_duplicate("homestays in Coorg in May", "homestays in Coorg in June")
+    assert not _near_duplicate("Coorg homestays under 5k for 2 adults", "Coorg homestays under 5k for 4 adults")
+    assert not _near_duplicate("Coorg homestays under 5k", "Coorg homestays under 8000")
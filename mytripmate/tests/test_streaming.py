@@ -0,0 +1,51 @@
+"""Day streaming in streaming.py: days land in state; enrichment only when streamed."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from google.genai import types as genai_types
+
+from tripmate_agents import streaming
+
+PLAN = ("Day 1 (Sat, 18 Oct 2025)\n- Morning: Mysore Palace\n"
+        "Day 2 (Sun, 19 Oct 2025)\n- Morning: Chamundi Hills\n"
+        "Day 3 (Mon, 20 Oct 2025)\n- Morning: Brindavan Gardens\n")
+
+
+@pytest.fixture(autouse=True)
+def fake_enrichment(monkeypatch):
+    calls = []
+    monkeypatch.setattr(streaming, "enrich_day", lambda day, city: calls.append(day["day"]) or {"weather": {}})
+    return calls
+
+
+def _run(invocation_id, chunks):
+    context = SimpleNamespace(invocation_id=invocation_id, agent_name="itinerary_planner", state={})
+    weather = SimpleNamespace(name="get_weather_batch")
+    streaming.remember_cities(weather, {"locations": [{"city": "Mysuru", "date": "2025-10-18"}]}, context, {})
+
+    async def main():
+        streaming.start_stream(context, None)
+        for text, partial in chunks:
+            content = genai_types.Content(role="model", parts=[genai_types.Part(text=text)])
+            await streaming.stream_days(context, SimpleNamespace(content=content, partial=partial))
+            await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    return context.state[streaming.STATE_KEY]
+
+
+def test_final_response_only_starts_no_lookups(fake_enrichment):
+    days = _run("plain", [(PLAN, False)])
+    assert [d["day"] for d in days] == [1, 2, 3]
+    assert all("weather" not in d for d in days)
+    assert fake_enrichment == []
+
+
+def test_streamed_days_are_enriched(fake_enrichment):
+    days = _run("sse", [(PLAN[:60], True), (PLAN[60:], True), (PLAN, False)])
+    assert [d["day"] for d in days] == [1, 2, 3]
+    assert [("weather" in d) for d in days] == [True, True, False]
+    assert sorted(fake_enrichment) == [1, 2]
+    assert not streaming._tasks
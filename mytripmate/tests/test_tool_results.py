@@ -0,0 +1,37 @@
+"""Tool-result reduction (tool_results.py): options payloads are never cut."""
+
+import json
+
+import pytest
+
+from tripmate_agents.tool_results import reduce
+
+OPTIONS = [{"mode": "train", "train_name": f"Express {i}", "notes": "x" * 300} for i in range(30)]
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(OPTIONS),
+    f"```json\n{json.dumps(OPTIONS)}\n```",
+    f"Here are the trains:\n{json.dumps(OPTIONS)}\nWhich one suits you?",
+])
+def test_search_answers_keep_every_option(text):
+    reduced, lists = reduce("planning_agent", "train_search_agent", text)
+    assert [o["train_name"] for o in json.loads(reduced)] == [o["train_name"] for o in OPTIONS]
+    assert lists == []
+
+
+def test_unparseable_payload_is_passed_on_whole():
+    text = "Options:\n" + " @@ ".join(json.dumps(o) for o in OPTIONS)
+    assert reduce("planning_agent", "train_search_agent", text)[0] == text
+
+
+def test_free_text_is_cut():
+    text = "Coorg is best visited between October and March [1]. " * 200
+    reduced, _ = reduce("planning_agent", "google_search_agent", text)
+    assert len(reduced) < len(text) and reduced.endswith("chars]")
+
+
+def test_display_only_lists_still_collapse():
+    places = {"places": [{"name": f"Place {i}", "lat": 1.0} for i in range(30)]}
+    reduced, lists = reduce("itinerary_planner", "map_tool", places)
+    assert reduced["places"]["count"] == 30 and lists[0][0] == "_result_map_tool_places"
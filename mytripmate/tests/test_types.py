@@ -0,0 +1,49 @@
+"""Coercion of model output in shared_libraries/types.py and its use by structured.check."""
+
+import pytest
+
+from tripmate_agents.shared_libraries import types
+from tripmate_agents.structured import check
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("₹6,500", 6500),
+    ("Rs. 3,200", 3200),
+    ("INR 4000", 4000),
+    ("4000 INR", 4000),
+    ("$120", 120),
+    ("₹1.2 lakh", 120000),
+    ("1.5 lacs", 150000),
+    ("1.5k", 1500),
+    ("12 crore", 120000000),
+    ("free", 0),
+    (1460, 1460),
+    (12.5, 12.5),
+])
+def test_to_number_coerces_single_amounts(raw, expected):
+    assert types._to_number(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["USD 12-15k", "2 x 3500", "2000-3000", "about 3 nights worth"])
+def test_to_number_leaves_ambiguous_amounts_unchanged(raw):
+    assert types._to_number(raw) == raw
+
+
+def test_ambiguous_amount_is_reported_invalid():
+    outcome = check('{"destination": "Goa", "budget": {"amount": "USD 12-15k"}}', types.ItinerarySaveSchema)
+    assert outcome.status == "invalid"
+    assert any(e.startswith("budget.amount") for e in outcome.errors)
+
+
+def test_multiplier_amount_is_coerced():
+    outcome = check({"destination": "Goa", "budget": {"amount": "₹1.2 lakh", "currency": "INR"}},
+                    types.ItinerarySaveSchema)
+    assert outcome.status == "coerced"
+    assert outcome.value["budget"]["amount"] == 120000
+
+
+def test_options_are_normalized_and_bad_ones_dropped():
+    outcome = check('[{"train_name": "X", "refundable": true, "price_total": {"amount": "₹1,460"}}, 5]',
+                    types.TrainsSelection)
+    assert outcome.status == "coerced"
+    assert outcome.value == [{"train_name": "X", "refundable": "yes", "price_total": {"amount": 1460}}]
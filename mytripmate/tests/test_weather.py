@@ -0,0 +1,38 @@
+"""get_weather_batch (tools/weather.py) must not block the event loop."""
+
+import asyncio
+import time
+
+from tripmate_agents.tools import weather
+
+
+class _SlowProvider:
+    name = "slow"
+
+    def issue_time(self):
+        return f"slow-{time.time()}"  # never a cache hit
+
+    def fetch(self, city, dates):
+        time.sleep(0.3)  # a blocking HTTP call
+        return {d: {"status": "ok", "summary": "clear"} for d in dates}
+
+
+def test_slow_provider_leaves_the_loop_free(monkeypatch):
+    monkeypatch.setattr(weather, "_provider", _SlowProvider())
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        task = asyncio.ensure_future(ticker())
+        result = await weather.get_weather_batch([{"city": "Mysuru", "date": "2026-12-11"}])
+        task.cancel()
+        return result
+
+    result = asyncio.run(main())
+    assert result["forecasts"][0]["summary"] == "clear"
+    assert len(ticks) > 10
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.15
@@ -1 +1,9 @@
+import threading
+
 from . import agent
+from .tools.config import WARMUP_ON_IMPORT
+
+# Build the agent tree and model/logging clients in the background right after import,
+# so the first request does not pay for them (see agent.warm_up).
+if WARMUP_ON_IMPORT:
+    threading.Thread(target=agent.warm_up, name="tripmate-warm-up", daemon=True).start()
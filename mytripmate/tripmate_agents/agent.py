@@ -2,9 +2,10 @@
 
 import os
 import logging
+import threading
+import time
 
 from dotenv import load_dotenv
-import google.cloud.logging
 from google.adk import Agent
 from google.genai import types
 from typing import Optional, List, Dict
@@ -19,29 +20,102 @@ from tripmate_agents import prompt
 # from tripmate_agents.sub_agents.planning.agent import planning_agent
 # from tripmate_agents.sub_agents.post_trip.agent import post_trip_agent
 # from tripmate_agents.sub_agents.pre_trip.agent import pre_trip_agent
-from .sub_agents.brainstormer_agent.agent import travel_brainstormer
-from .sub_agents.itinerary_agent.agent import itinerary_planner
-
 
+from tripmate_agents import history, instructions, metrics, streaming, structured, tool_results, tracing
+from tripmate_agents.callback_logging import setup_cloud_logging
 from tripmate_agents.tools.memory import load_user, save_to_file
+from tripmate_agents.tools.dates import resolve_dates
 from tripmate_agents.tools.config import MODEL
+from tripmate_agents.tools.models import FallbackLlm, model_for
 
 
-cloud_logging_client = google.cloud.logging.Client()
-cloud_logging_client.setup_logging()
 print("MODEL: ", MODEL)
 
-my_trip_mate_agent = Agent(
-    model=MODEL,
-    name="my_trip_mate_agent",
-    description="Start a user on a Trip Planning.",
-    instruction=prompt.my_trip_mate_agent_prompt,
-    generate_content_config=types.GenerateContentConfig(temperature=0.2,),
-    sub_agents=[travel_brainstormer, itinerary_planner],
-    before_agent_callback=load_user,
-    # after_agent_callback=save_to_file,
-)
-root_agent = my_trip_mate_agent
+_root_agent = None
+_build_lock = threading.Lock()
+
+
+def build_root_agent() -> Agent:
+    """
+    Build the agent tree once, on first use. Sub-agent modules (and their tools) are
+    imported here rather than at package import, keeping them off the cold-start path.
+    """
+    global _root_agent
+    with _build_lock:
+        if _root_agent is None:
+            from .sub_agents.brainstormer_agent.agent import travel_brainstormer
+            from .sub_agents.itinerary_agent.agent import itinerary_planner
+
+            setup_cloud_logging(background=True)
+            _root_agent = Agent(
+                model=model_for("my_trip_mate_agent"),
+                name="my_trip_mate_agent",
+                description="Start a user on a Trip Planning.",
+                instruction=prompt.my_trip_mate_agent_prompt,
+                generate_content_config=types.GenerateContentConfig(temperature=0.2,),
+                sub_agents=[travel_brainstormer, itinerary_planner],
+                tools=[resolve_dates],
+                before_agent_callback=load_user,
+                # after_agent_callback=save_to_file,
+            )
+            for agent in _walk(_root_agent):
+                metrics.instrument(agent)
+                history.install(agent)
+                instructions.install(agent)
+                structured.install(agent)
+                streaming.install(agent)
+                tool_results.install(agent)
+            metrics.start_server()
+            tracing.setup_tracing()
+    return _root_agent
+
+
+def __getattr__(name: str):
+    # `root_agent` / `my_trip_mate_agent` are built on first access (e.g. by the ADK loader).
+    if name in ("root_agent", "my_trip_mate_agent"):
+        return build_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _walk(agent) -> List:
+    """Every agent in the tree, including agents wrapped as AgentTools."""
+    seen, stack = {}, [agent]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen[id(current)] = current
+        stack.extend(current.sub_agents or [])
+        stack.extend(t.agent for t in getattr(current, "tools", None) or [] if hasattr(t, "agent"))
+    return list(seen.values())
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Pay the cold-start costs before the first request: build the agent tree, attach
+    Cloud Logging and create each agent's model client. Returns seconds per step.
+    """
+    timings = {}
+    started = time.perf_counter()
+    root = build_root_agent()
+    timings["build"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    setup_cloud_logging()
+    timings["logging"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for agent in _walk(root):
+        llm = getattr(agent, "canonical_model", None)
+        if isinstance(llm, FallbackLlm):
+            llm = llm.resolve(llm.model)
+        try:
+            getattr(llm, "api_client", None)  # Gemini creates its genai client lazily
+        except Exception as e:
+            logging.getLogger(__name__).warning("Could not warm model for %s: %s", agent.name, e)
+    timings["models"] = time.perf_counter() - started
+    return timings
+
 
 if __name__ == "__main__":
-    root_agent.run()
+    build_root_agent().run()
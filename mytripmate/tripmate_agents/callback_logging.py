@@ -1,22 +1,201 @@
+import atexit
+import contextlib
 import logging
+import queue
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
 
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models import LlmResponse, LlmRequest
 
+from .tools.config import (
+    CLOUD_LOGGING, LOG_BATCH_SIZE, LOG_FLUSH_SECONDS, LOG_MAX_CHARS, LOG_QUEUE_SIZE, LOG_REDACT_PII,
+    LOG_SAMPLE_RATE, LOG_SAMPLE_RATES,
+)
+
+_cloud_logging_client = None
+_cloud_logging_lock = threading.Lock()
+
+
+def setup_cloud_logging(background: bool = False):
+    """
+    Create the process-wide Cloud Logging client and attach its handler, once.
+    The client init is network-bound, so callers on the request path pass background=True.
+    """
+    if not CLOUD_LOGGING:
+        return None
+    if background:
+        threading.Thread(target=setup_cloud_logging, name="cloud-logging-setup", daemon=True).start()
+        return None
+    global _cloud_logging_client
+    with _cloud_logging_lock:
+        if _cloud_logging_client is None:
+            try:
+                import google.cloud.logging
+
+                client = google.cloud.logging.Client()
+                client.setup_logging()
+            except Exception as e:  # no credentials/project locally: keep plain stdout logging
+                logging.getLogger(__name__).warning("Cloud Logging unavailable: %s", e)
+                return None
+            _cloud_logging_client = client
+    return _cloud_logging_client
+
+
+# ---- Model traffic ----
+# The callbacks below run on the model-call path, so they only sample and enqueue;
+# truncation, PII redaction and the actual logging (Cloud Logging included) happen on
+# one background thread that drains the queue in batches.
+# Local parts are length-bounded so long words cannot make the scans quadratic.
+_EMAIL = re.compile(r"[\w.+-]{1,64}@[\w-]+(?:\.[\w-]+)+")
+_UPI = re.compile(r"[\w.-]{2,64}@[a-zA-Z][a-zA-Z0-9]+\b")  # after _EMAIL: handles have no dotted domain
+# Phone: optional +CC, then a 10-digit national number written whole, 5+5 or 3-3-4. Without
+# a country code only Indian mobiles (6-9 first) and 3-3-4 groups count, and no match may
+# touch "-", ":", "/" or "." digits, so dates, times, PNRs and fares are left alone.
+_NATIONAL = r"\d{10}|\d{5}[\s-]\d{5}|\(?\d{3}\)?[\s-]?\d{3}[\s-]\d{4}"
+_PHONE = re.compile(rf"(?<![\w+\-:/.])(?:\+\d{{1,3}}[\s-]?(?:{_NATIONAL})|[6-9]\d{{4}}[\s-]?\d{{5}}"
+                    rf"|\(?\d{{3}}\)?[\s-]?\d{{3}}[\s-]\d{{4}})(?![\w\-:/]|\.\d)")
+
+
+def redact(text: str) -> str:
+    """Mask emails, UPI IDs (name@bank) and phone numbers."""
+    if "@" in text:
+        text = _EMAIL.sub("[email]", text)
+        text = _UPI.sub("[upi]", text)
+    return _PHONE.sub("[phone]", text)
+
+
+def truncate(text: str, limit: int = LOG_MAX_CHARS) -> str:
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [+{len(text) - limit} chars]"
+
+
+def _parse_rates(spec: Optional[str]) -> Dict[str, float]:
+    rates = {}
+    for part in (spec or "").split(","):
+        agent, _, value = part.partition("=")
+        try:
+            rates[agent.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+_sample_rates = _parse_rates(LOG_SAMPLE_RATES)
+
+
+def sampled(agent_name: str, invocation_id: str = "") -> bool:
+    """
+    Per-agent sampling decision. Keyed on the invocation so that a query and its
+    response are kept or dropped together.
+    """
+    rate = _sample_rates.get(agent_name, LOG_SAMPLE_RATE)
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    key = f"{agent_name}:{invocation_id}".encode() if invocation_id else str(random.random()).encode()
+    return zlib.crc32(key) / 0xFFFFFFFF < rate
+
+
+class TrafficLogWriter:
+    """Bounded queue of model-traffic entries, written to `logger_name` by a daemon thread."""
+
+    def __init__(self, logger_name: str = "tripmate_agents.traffic", maxsize: int = LOG_QUEUE_SIZE,
+                 batch_size: int = LOG_BATCH_SIZE, flush_seconds: float = LOG_FLUSH_SECONDS):
+        self.logger = logging.getLogger(logger_name)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Tuple[str, str, str]]]" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, agent_name: str, text: str) -> None:
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait((kind, agent_name, text))
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="traffic-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Write whatever is queued and stop the thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        self._thread = None
+
+    def _next_batch(self) -> Tuple[List[Tuple[str, str, str]], bool]:
+        batch: List[Tuple[str, str, str]] = []
+        entry = self._queue.get()
+        deadline = time.monotonic() + self.flush_seconds
+        while entry is not None:
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            try:
+                entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._next_batch()
+            for kind, agent_name, text in batch:
+                try:
+                    if LOG_REDACT_PII:
+                        text = redact(text)
+                    self.logger.info("[%s %s]: %s", kind, agent_name, truncate(text))
+                except Exception:  # never let one bad entry stop the writer
+                    continue
+            if self.dropped:
+                self.logger.warning("Dropped %d model-traffic log entries (queue full)", self.dropped)
+                self.dropped = 0
+            for handler in logging.getLogger().handlers:
+                with contextlib.suppress(Exception):
+                    handler.flush()
+
+
+traffic_log = TrafficLogWriter()
+
 
 def log_query_to_model(callback_context: CallbackContext, llm_request: LlmRequest):
+    if not sampled(callback_context.agent_name, callback_context.invocation_id):
+        return
     if llm_request.contents and llm_request.contents[-1].role == 'user':
         for part in llm_request.contents[-1].parts:
             if part.text:
-                logging.info("[query to %s]: %s", callback_context.agent_name, part.text)
+                traffic_log.submit("query to", callback_context.agent_name, part.text)
 
 def log_model_response(callback_context: CallbackContext, llm_response: LlmResponse):
+    if not sampled(callback_context.agent_name, callback_context.invocation_id):
+        return
     if llm_response.content and llm_response.content.parts:
         for part in llm_response.content.parts:
             if part.text:
-                logging.info("[response from %s]: %s", callback_context.agent_name, part.text)
+                traffic_log.submit("response from", callback_context.agent_name, part.text)
             elif part.function_call:
-                logging.info("[function call from %s]: %s", callback_context.agent_name, part.function_call.name)
+                traffic_log.submit("function call from", callback_context.agent_name, part.function_call.name)
 
 
 
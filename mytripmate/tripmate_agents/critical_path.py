@@ -0,0 +1,88 @@
+# tripmate_agents/critical_path.py
+"""
+Show where a turn's time went, from the JSONL span file written by tracing.py.
+
+    python -m tripmate_agents.critical_path traces.jsonl             # latest turn
+    python -m tripmate_agents.critical_path traces.jsonl --list      # all turns
+    python -m tripmate_agents.critical_path traces.jsonl --trace 7fc2 --tree
+    python -m tripmate_agents.critical_path traces.jsonl --session <id>
+"""
+
+import argparse
+import sys
+from typing import Any, Dict, List, Optional
+
+from .tools.config import TRACE_PATH
+from .tracing import build_tree, critical_path, duration, load_spans, select_trace, self_time, trace_session
+
+
+def _label(span: Dict[str, Any]) -> str:
+    status = (span.get("status") or {}).get("code")
+    return span["name"] + ("  [ERROR]" if status == "ERROR" else "")
+
+
+def render(spans: List[Dict[str, Any]], tree: bool = False, out=sys.stdout) -> None:
+    index = build_tree(spans)
+    children = index["children"]
+    root = max(index["roots"], key=duration)
+    total = duration(root) or 1e-9
+    out.write(f"trace {root['trace_id']}  session {trace_session(spans) or '-'}  "
+              f"{len(spans)} spans  {duration(root):.3f}s\n")
+
+    out.write("\ncritical path (total / self / share of turn):\n")
+    for depth, span in critical_path(root, children):
+        kids = children.get(span["span_id"], [])
+        out.write(f"  {duration(span):8.3f}s {self_time(span, kids):8.3f}s {100 * duration(span) / total:5.1f}%  "
+                  f"{'  ' * depth}{_label(span)}\n")
+
+    if tree:
+        out.write("\ntree (start offset / total / self):\n")
+        start0 = root["start_time_unix_nano"]
+
+        def walk(span, depth):
+            kids = children.get(span["span_id"], [])
+            offset = (span["start_time_unix_nano"] - start0) / 1e9
+            out.write(f"  +{offset:7.3f}s {duration(span):8.3f}s {self_time(span, kids):8.3f}s  "
+                      f"{'  ' * depth}{_label(span)}\n")
+            for kid in kids:
+                walk(kid, depth + 1)
+
+        for top in index["roots"]:
+            walk(top, 0)
+
+
+def list_traces(spans: List[Dict[str, Any]], out=sys.stdout) -> None:
+    by_trace: Dict[str, List[Dict[str, Any]]] = {}
+    for span in sorted(spans, key=lambda s: s["start_time_unix_nano"]):
+        by_trace.setdefault(span["trace_id"], []).append(span)
+    for trace_id, trace_spans in by_trace.items():
+        root = max(build_tree(trace_spans)["roots"], key=duration)
+        out.write(f"{trace_id}  {trace_session(trace_spans) or '-':36}  {duration(root):8.3f}s  "
+                  f"{len(trace_spans):4d} spans\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Critical path of a turn from a JSONL span file.")
+    parser.add_argument("path", nargs="?", default=TRACE_PATH, help="span file (default: TRACE_PATH)")
+    parser.add_argument("--trace", help="trace id or prefix; default: the latest turn")
+    parser.add_argument("--session", help="only turns of this session id")
+    parser.add_argument("--tree", action="store_true", help="also print the full span tree")
+    parser.add_argument("--list", action="store_true", help="list turns (traces) instead")
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("no span file given and TRACE_PATH is not set")
+
+    spans = load_spans(args.path)
+    if args.list:
+        list_traces(spans)
+        return 0
+    selected = select_trace(spans, args.trace, args.session)
+    if not selected:
+        print("no matching spans", file=sys.stderr)
+        return 1
+    render(selected, tree=args.tree)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+# tripmate_agents/history.py
+"""
+Conversation-history window for model calls.
+
+- install(agent) adds a before_model callback that, when enabled (HISTORY_KEEP_TURNS > 0
+  or a token budget; both off by default), keeps the last HISTORY_KEEP_TURNS user turns
+  of llm_request.contents verbatim and replaces everything older with one summary:
+  destination, dates, group, budget, interests and the day plan from
+  state["itinerary"], route and the selected transport/hotel from state["trip_plan"],
+  the earlier user requests in full (their dietary, mobility and other constraints
+  included) and the latest model reply among the summarized turns, so suggestions or a
+  draft that is not saved yet survive.
+- A turn starts at a user message; function calls stay with their responses, and other
+  agents' quoted transcripts ("For context: ...") stay with the turn they belong to.
+- Per-agent token budgets (HISTORY_TOKEN_BUDGETS "planning_agent=12000,...", else
+  HISTORY_TOKEN_BUDGET; 0 = none) drop further old turns into the summary until the
+  estimated history fits, always keeping the current turn.
+- Tokens are estimated at CHARS_PER_TOKEN; the estimate saved per model call lands in
+  metrics (tripmate_history_tokens_saved, tripmate_history_compactions_total).
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.genai import types
+
+from . import metrics
+from .tools import blobs
+from .tools.config import HISTORY_KEEP_TURNS, HISTORY_TOKEN_BUDGET, HISTORY_TOKEN_BUDGETS
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+OTHER_AGENT_PREFIX = "For context:"  # ADK's rendering of another agent's events
+SUMMARY_HEADER = "[Earlier conversation, summarized from the saved trip state]"
+REQUEST_CHARS = 2000  # per earlier user request; constraints are stated there
+REPLY_CHARS = 8000  # latest model reply (e.g. the current draft) kept in the summary
+
+
+def _parse_budgets(spec: Optional[str]) -> Dict[str, int]:
+    budgets = {}
+    for part in (spec or "").split(","):
+        agent, _, value = part.partition("=")
+        try:
+            budgets[agent.strip()] = max(0, int(value))
+        except ValueError:
+            continue
+    return budgets
+
+
+_budgets = _parse_budgets(HISTORY_TOKEN_BUDGETS)
+
+
+def token_budget(agent_name: str) -> int:
+    return _budgets.get(agent_name, HISTORY_TOKEN_BUDGET)
+
+
+# ---- Turns ----
+def _text(content: types.Content) -> str:
+    return " ".join(p.text for p in content.parts or [] if getattr(p, "text", None))
+
+
+def _is_user_turn(content: types.Content) -> bool:
+    if content.role != "user" or any(p.function_response for p in content.parts or []):
+        return False
+    text = _text(content).lstrip()
+    return bool(text) and not text.startswith(OTHER_AGENT_PREFIX)
+
+
+def split_turns(contents: List[types.Content]) -> List[List[types.Content]]:
+    """Group contents into turns, each starting at a user message (a leading partial turn stays whole)."""
+    turns: List[List[types.Content]] = []
+    for content in contents:
+        if not turns or _is_user_turn(content):
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def estimate_tokens(contents: List[types.Content]) -> int:
+    chars = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                chars += len(json.dumps(part.function_response.response or {}, default=str))
+    return chars // CHARS_PER_TOKEN
+
+
+# ---- Summary ----
+def _parsed(value: Any) -> Dict[str, Any]:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _compact(value: Any) -> Any:
+    """Drop nulls and empty containers, recursively."""
+    if isinstance(value, dict):
+        value = {k: _compact(v) for k, v in value.items()}
+        return {k: v for k, v in value.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [v for v in map(_compact, value) if v not in (None, "", [], {})]
+    return value
+
+
+def trip_facts(itinerary: Any, trip_plan: Any) -> Dict[str, Any]:
+    """The structured facts older turns established, from state["itinerary"] / state["trip_plan"]."""
+    itinerary, plan = _parsed(itinerary), _parsed(trip_plan)
+    days = []
+    for day in itinerary.get("itinerary") or []:
+        if isinstance(day, dict):
+            names = [i.get("name") for i in day.get("items") or [] if isinstance(i, dict) and i.get("name")]
+            days.append(f"Day {day.get('day')}: " + "; ".join(names))
+    transport = plan.get("selected_transport") if isinstance(plan.get("selected_transport"), dict) else {}
+    hotel = plan.get("selected_hotel") if isinstance(plan.get("selected_hotel"), dict) else {}
+    return _compact({
+        "origin": plan.get("origin"),
+        "destination": plan.get("destination") or itinerary.get("destination"),
+        "dates": plan.get("dates") or itinerary.get("dates"),
+        "duration_days": itinerary.get("duration_days"),
+        "group": plan.get("headcount") or itinerary.get("group"),
+        "budget": plan.get("budget") or itinerary.get("budget"),
+        "interests": itinerary.get("interests"),
+        "constraints": plan.get("constraints"),
+        "days": days,
+        "transport": {k: transport.get(k) for k in ("mode", "provider", "departure_datetime", "price", "seat_cabin")},
+        "hotel": {k: hotel.get(k) for k in ("name", "check_in", "check_out")},
+    })
+
+
+def _cut(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _latest_reply(turns: List[List[types.Content]]) -> str:
+    """The last model text of `turns` (suggestions, the current draft), if any."""
+    for content in reversed([c for turn in turns for c in turn]):
+        if content.role == "model":
+            text = " ".join(p.text for p in content.parts or [] if p.text and not p.thought).strip()
+            if text:
+                return text
+    return ""
+
+
+def summary_content(facts: Dict[str, Any], turns: List[List[types.Content]]) -> types.Content:
+    requests = []
+    for turn in turns:
+        text = " ".join(_text(turn[0]).split())
+        if _is_user_turn(turn[0]) and text:
+            requests.append("- " + _cut(text, REQUEST_CHARS))
+    reply = _latest_reply(turns)
+    lines = [f"{SUMMARY_HEADER} {len(turns)} earlier turn(s)."]
+    if facts:
+        lines.append("Trip so far: " + json.dumps(facts, ensure_ascii=False, separators=(",", ":")))
+    if requests:
+        lines.append("Earlier user requests:\n" + "\n".join(requests))
+    if reply:
+        lines.append("Latest assistant reply in those turns:\n" + _cut(reply, REPLY_CHARS))
+    return types.Content(role="user", parts=[types.Part(text="\n".join(lines))])
+
+
+def window(contents: List[types.Content], facts: Dict[str, Any], keep_turns: int = HISTORY_KEEP_TURNS,
+           budget: int = 0) -> Tuple[List[types.Content], int]:
+    """(new contents, number of turns summarized) for one model request."""
+    turns = split_turns(contents)
+    cut = max(0, len(turns) - keep_turns) if keep_turns > 0 else 0
+    while True:
+        if cut:
+            windowed = [summary_content(facts, turns[:cut])] + [c for turn in turns[cut:] for c in turn]
+        else:
+            windowed = list(contents)
+        if not budget or cut >= len(turns) - 1 or estimate_tokens(windowed) <= budget:
+            return windowed, cut
+        cut += 1
+
+
+# ---- Callback ----
+async def trim_history(callback_context, llm_request) -> None:
+    """before_model callback: window llm_request.contents in place."""
+    contents = llm_request.contents or []
+    budget = token_budget(callback_context.agent_name)
+    over_turns = HISTORY_KEEP_TURNS > 0 and len(split_turns(contents)) > HISTORY_KEEP_TURNS
+    if not over_turns and (not budget or estimate_tokens(contents) <= budget):
+        return None
+    facts = trip_facts(await blobs.get(callback_context, "itinerary"), await blobs.get(callback_context, "trip_plan"))
+    windowed, summarized = window(contents, facts, budget=budget)
+    if not summarized:
+        return None
+    saved = max(0, estimate_tokens(contents) - estimate_tokens(windowed))
+    llm_request.contents = windowed
+    agent = (("agent", callback_context.agent_name),)
+    metrics.registry.inc("tripmate_history_compactions_total", agent)
+    metrics.registry.inc("tripmate_history_tokens_saved_total", agent, saved)
+    metrics.registry.observe("tripmate_history_tokens_saved", agent, saved)
+    logger.debug("%s: summarized %d turn(s), ~%d tokens saved", callback_context.agent_name, summarized, saved)
+    return None
+
+
+def install(agent) -> None:
+    """Add the history window to one LLM agent (idempotent), after any metrics callback."""
+    if not hasattr(agent, "before_model_callback"):
+        return
+    current = agent.before_model_callback
+    callbacks = list(current) if isinstance(current, list) else [current] if current else []
+    if trim_history not in callbacks:
+        agent.before_model_callback = [*callbacks, trim_history]
@@ -0,0 +1,141 @@
+# tripmate_agents/instructions.py
+"""
+Agent instructions assembled from sections, sent only in the phases that need them.
+
+- SectionedInstruction(agent_name, sections) is an ADK InstructionProvider. Each Section
+  has an optional `when(state)` predicate; a model call gets the sections whose predicate
+  holds, in order, with {state} placeholders filled in as for a plain string instruction.
+  While a section is left out its `fallback` (a one-line pointer) is sent instead.
+- Phases are read from state: the saved "itinerary" / "trip_plan", plus the flags that
+  mark_phase (an after_tool callback) sets when a phase's tool succeeds (PHASE_FLAGS) or
+  when a tool refuses a call (REJECTED_FLAGS, e.g. a save_to_state that did not fit).
+- Sections are counted in tokens (CHARS_PER_TOKEN estimate, as in history.py). Every call
+  records the instruction size per agent (tripmate_prompt_tokens) and the tokens left out
+  (tripmate_prompt_tokens_skipped_total). `python -m tripmate_agents.instructions`
+  prints the per-section table.
+"""
+
+import logging
+import sys
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from google.adk.utils.instructions_utils import inject_session_state
+
+from . import metrics
+from .history import CHARS_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# Tool -> state flag set once it succeeds; the flag marks the phase as reached.
+PHASE_FLAGS = {
+    "check_itinerary_budget": "_itinerary_drafted",
+    "rank_transport_options": "_plan_transport_ranked",
+    "allocate_seats": "_plan_seats_chosen",
+    "optimize_rooms": "_plan_rooms_chosen",
+    "hotel_search_agent": "_plan_hotel_searched",
+    "hotel_room_selection_agent": "_plan_rooms_chosen",
+}
+
+# Tool -> state flag set when the tool returns an error.
+REJECTED_FLAGS = {
+    "save_to_state": "_save_rejected",
+}
+
+_instructions: List["SectionedInstruction"] = []
+
+
+def count_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN
+
+
+# ---- Phases ----
+def reached(*keys: str) -> Callable[[Mapping[str, Any]], bool]:
+    """Predicate: any of the state keys/flags is set."""
+    return lambda state: any(state.get(key) for key in keys)
+
+
+def before(*keys: str) -> Callable[[Mapping[str, Any]], bool]:
+    """Predicate: none of the state keys/flags is set yet."""
+    return lambda state: not any(state.get(key) for key in keys)
+
+
+def mark_phase(tool, args, tool_context, tool_response):
+    """after_tool callback: set the PHASE_FLAGS flag of a tool that succeeded (REJECTED_FLAGS if it failed)."""
+    failed = isinstance(tool_response, dict) and tool_response.get("status") == "error"
+    flag = (REJECTED_FLAGS if failed else PHASE_FLAGS).get(tool.name)
+    if flag and not tool_context.state.get(flag):
+        tool_context.state[flag] = True
+    return None
+
+
+# ---- Sections ----
+class Section(NamedTuple):
+    name: str
+    text: str
+    when: Optional[Callable[[Mapping[str, Any]], bool]] = None  # None = always
+    fallback: str = ""
+
+
+class SectionedInstruction:
+    """InstructionProvider that sends only the sections the current phase needs."""
+
+    def __init__(self, agent_name: str, sections: List[Section]):
+        self.agent_name = agent_name
+        self.sections = list(sections)
+        self.tokens = {s.name: count_tokens(s.text) for s in self.sections}
+        _instructions.append(self)
+
+    @property
+    def full_text(self) -> str:
+        return "".join(s.text for s in self.sections)
+
+    def render(self, state: Mapping[str, Any]) -> Tuple[str, List[str]]:
+        """(instruction text, names of the sections left out) for this state."""
+        parts, skipped = [], []
+        for section in self.sections:
+            if section.when is None or section.when(state):
+                parts.append(section.text)
+            else:
+                skipped.append(section.name)
+                if section.fallback:
+                    parts.append(section.fallback)
+        return "".join(parts), skipped
+
+    async def __call__(self, readonly_context) -> str:
+        text, skipped = self.render(readonly_context.state)
+        agent = (("agent", self.agent_name),)
+        sent = count_tokens(text)
+        metrics.registry.observe("tripmate_prompt_tokens", agent, sent)
+        metrics.registry.inc("tripmate_prompt_tokens_skipped_total", agent, max(0, count_tokens(self.full_text) - sent))
+        logger.debug("%s instruction: ~%d tokens, skipped %s", self.agent_name, sent, skipped)
+        return await inject_session_state(text, readonly_context)
+
+    def report(self) -> List[Dict[str, Any]]:
+        return [{"agent": self.agent_name, "section": s.name, "tokens": self.tokens[s.name],
+                 "phase": "always" if s.when is None else "conditional"} for s in self.sections]
+
+
+def install(agent) -> None:
+    """Add mark_phase to an LLM agent's after_tool callbacks (idempotent)."""
+    if not hasattr(agent, "after_tool_callback"):
+        return
+    current = agent.after_tool_callback
+    callbacks = list(current) if isinstance(current, list) else [current] if current else []
+    if mark_phase not in callbacks:
+        agent.after_tool_callback = [*callbacks, mark_phase]
+
+
+def main() -> int:
+    # Under `python -m` this file runs as __main__; the agents register with the package module.
+    from tripmate_agents import instructions
+    from tripmate_agents.sub_agents.itinerary_agent import agent  # noqa: F401 (builds both instructions)
+
+    for instruction in instructions._instructions:
+        print(f"{instruction.agent_name}: ~{count_tokens(instruction.full_text)} tokens in full")
+        for row in instruction.report():
+            print(f"  {row['section']:<14} {row['tokens']:>6}  {row['phase']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+# tripmate_agents/metrics.py
+"""
+Per-agent latency, token and tool-call metrics.
+
+- instrument(agent) adds before/after callbacks to an agent for its own run, each model
+  call and each tool call. build_root_agent() instruments the whole tree.
+- Everything lands in `registry`: counters plus bucketed histograms labelled by agent
+  (and tool), so percentiles and tails are visible, not just averages.
+- registry.prometheus() is the Prometheus text format. It is served on METRICS_PORT
+  (/metrics, plus /metrics.json) next to `adk web` once start_server() runs.
+- With LOOP_LAG_INTERVAL set, the first agent run on an event loop starts a probe task
+  that records how late the loop wakes it (tripmate_event_loop_lag_seconds): blocking
+  work on the server's loop shows up there before it shows up as slow turns.
+- registry.summary() is a JSON-ready digest with count/mean/p50/p95/p99/max per series.
+  It is written to METRICS_JSON_PATH on exit when that is set.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import threading
+import time
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .tools.config import LOOP_LAG_INTERVAL, METRICS_JSON_PATH, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+# ---- Metric types ----
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help, self.kind = name, help_text, "counter"
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def lines(self) -> List[str]:
+        return [f"{self.name}{_fmt_labels(labels)} {_num(v)}" for labels, v in sorted(self.values.items())]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        return [{**dict(labels), "value": v} for labels, v in sorted(self.values.items())]
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name, self.help, self.kind = name, help_text, "histogram"
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (non-cumulative, last is +Inf), sum, count, max]
+        self.series: Dict[Labels, List[Any]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0, value]
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+        series[3] = max(series[3], value)
+
+    def quantile(self, labels: Labels, q: float) -> Optional[float]:
+        """Estimate from the buckets by linear interpolation (as Prometheus' histogram_quantile)."""
+        counts, _, total, peak = self.series[labels]
+        if not total:
+            return None
+        rank, seen, lower = q * total, 0, 0.0
+        for i, count in enumerate(counts):
+            upper = self.buckets[i] if i < len(self.buckets) else peak
+            if count and seen + count >= rank:
+                return min(peak, lower + (upper - lower) * (rank - seen) / count)
+            seen += count
+            lower = upper
+        return peak
+
+    def lines(self) -> List[str]:
+        out = []
+        for labels, (counts, total, count, _) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, n in zip((*self.buckets, "+Inf"), counts):
+                cumulative += n
+                out.append(f"{self.name}_bucket{_fmt_labels(labels + (('le', str(bound)),))} {cumulative}")
+            out.append(f"{self.name}_sum{_fmt_labels(labels)} {_num(total)}")
+            out.append(f"{self.name}_count{_fmt_labels(labels)} {count}")
+        return out
+
+    def summary(self) -> List[Dict[str, Any]]:
+        out = []
+        for labels, (_, total, count, peak) in sorted(self.series.items()):
+            out.append({
+                **dict(labels), "count": count, "sum": round(total, 6), "mean": round(total / count, 6),
+                "p50": _round(self.quantile(labels, 0.5)), "p95": _round(self.quantile(labels, 0.95)),
+                "p99": _round(self.quantile(labels, 0.99)), "max": round(peak, 6),
+            })
+        return out
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 6) if value is not None else None
+
+
+# ---- Registry ----
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float]) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def inc(self, name: str, labels: Labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self.metrics[name].inc(labels, amount)
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            self.metrics[name].observe(labels, value)
+
+    def mean(self, name: str, labels: Labels) -> Optional[float]:
+        """Mean of one histogram series, or None before its first observation."""
+        with self._lock:
+            series = self.metrics[name].series.get(labels)
+            return series[1] / series[2] if series and series[2] else None
+
+    def prometheus(self) -> str:
+        with self._lock:
+            out = []
+            for metric in self.metrics.values():
+                out.append(f"# HELP {metric.name} {metric.help}")
+                out.append(f"# TYPE {metric.name} {metric.kind}")
+                out.extend(metric.lines())
+        return "\n".join(out) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {name: metric.summary() for name, metric in self.metrics.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            for metric in self.metrics.values():
+                getattr(metric, "values", getattr(metric, "series", {})).clear()
+
+
+registry = Registry()
+registry.histogram("tripmate_agent_duration_seconds", "Wall time of one agent run.", LATENCY_BUCKETS)
+registry.histogram("tripmate_model_duration_seconds", "Wall time of one model call.", LATENCY_BUCKETS)
+registry.histogram("tripmate_model_tokens", "Tokens per model call by direction.", TOKEN_BUCKETS)
+registry.counter("tripmate_model_calls_total", "Model calls.")
+registry.counter("tripmate_model_errors_total", "Model calls that raised or returned an error.")
+registry.counter("tripmate_tokens_total", "Tokens by direction (input, output).")
+registry.histogram("tripmate_tool_duration_seconds", "Wall time of one tool call.", LATENCY_BUCKETS)
+registry.counter("tripmate_tool_calls_total", "Tool calls.")
+registry.counter("tripmate_tool_errors_total", "Tool calls that raised or returned status=error.")
+registry.histogram("tripmate_event_loop_lag_seconds", "Delay of the event loop in waking a timer.", LAG_BUCKETS)
+registry.histogram("tripmate_history_tokens_saved", "Estimated input tokens saved per windowed model call.", TOKEN_BUCKETS)
+registry.counter("tripmate_history_tokens_saved_total", "Estimated input tokens saved by the history window.")
+registry.counter("tripmate_history_compactions_total", "Model calls whose older turns were summarized.")
+registry.histogram("tripmate_prompt_tokens", "Estimated instruction tokens per model call.", TOKEN_BUCKETS)
+registry.counter("tripmate_prompt_tokens_skipped_total", "Estimated instruction tokens left out by phase.")
+registry.counter("tripmate_tool_result_bytes_saved_total", "Tool-result bytes kept out of the model context.")
+registry.counter("tripmate_structured_outputs_total", "Structured outputs checked, by schema and outcome.")
+registry.counter("tripmate_json_repair_seconds_saved_total", "Estimated model seconds saved by local JSON repair.")
+registry.histogram("tripmate_itinerary_first_day_seconds", "Model-call start to the first finished itinerary day.",
+                   LATENCY_BUCKETS)
+registry.counter("tripmate_itinerary_days_streamed_total", "Itinerary days put in state as they finished.")
+
+
+# ---- Callbacks ----
+# Start times keyed by invocation/agent (model calls of one agent run one at a time)
+# or by function call id (parallel tool calls).
+_started: Dict[Tuple[str, ...], float] = {}
+
+
+def _elapsed(key: Tuple[str, ...]) -> Optional[float]:
+    started = _started.pop(key, None)
+    return time.perf_counter() - started if started is not None else None
+
+
+def before_agent(callback_context):
+    watch_event_loop()
+    _started[("agent", callback_context.invocation_id, callback_context.agent_name)] = time.perf_counter()
+
+
+def after_agent(callback_context):
+    elapsed = _elapsed(("agent", callback_context.invocation_id, callback_context.agent_name))
+    if elapsed is not None:
+        registry.observe("tripmate_agent_duration_seconds", (("agent", callback_context.agent_name),), elapsed)
+
+
+def before_model(callback_context, llm_request):
+    _started[("model", callback_context.invocation_id, callback_context.agent_name)] = time.perf_counter()
+
+
+def after_model(callback_context, llm_response):
+    if llm_response.partial:  # streamed chunk; the final response carries the totals
+        return
+    agent = (("agent", callback_context.agent_name),)
+    elapsed = _elapsed(("model", callback_context.invocation_id, callback_context.agent_name))
+    if elapsed is not None:
+        registry.observe("tripmate_model_duration_seconds", agent, elapsed)
+    registry.inc("tripmate_model_calls_total", agent)
+    if llm_response.error_code:
+        registry.inc("tripmate_model_errors_total", agent)
+    usage = llm_response.usage_metadata
+    for direction, count in (("input", getattr(usage, "prompt_token_count", None)),
+                             ("output", getattr(usage, "candidates_token_count", None))):
+        if count:
+            registry.inc("tripmate_tokens_total", agent + (("direction", direction),), count)
+            registry.observe("tripmate_model_tokens", agent + (("direction", direction),), count)
+
+
+def on_model_error(callback_context, llm_request, error):
+    agent = (("agent", callback_context.agent_name),)
+    elapsed = _elapsed(("model", callback_context.invocation_id, callback_context.agent_name))
+    if elapsed is not None:
+        registry.observe("tripmate_model_duration_seconds", agent, elapsed)
+    registry.inc("tripmate_model_calls_total", agent)
+    registry.inc("tripmate_model_errors_total", agent)
+
+
+def before_tool(tool, args, tool_context):
+    _started[("tool", tool_context.function_call_id or "", tool.name)] = time.perf_counter()
+
+
+def _record_tool(tool, tool_context, failed: bool) -> None:
+    labels = (("agent", tool_context.agent_name), ("tool", tool.name))
+    elapsed = _elapsed(("tool", tool_context.function_call_id or "", tool.name))
+    if elapsed is not None:
+        registry.observe("tripmate_tool_duration_seconds", labels, elapsed)
+    registry.inc("tripmate_tool_calls_total", labels)
+    if failed:
+        registry.inc("tripmate_tool_errors_total", labels)
+
+
+def after_tool(tool, args, tool_context, tool_response):
+    failed = isinstance(tool_response, dict) and tool_response.get("status") == "error"
+    _record_tool(tool, tool_context, failed)
+
+
+def on_tool_error(tool, args, tool_context, error):
+    _record_tool(tool, tool_context, True)
+
+
+def _prepend(agent, field: str, callback) -> None:
+    current = getattr(agent, field, None)
+    callbacks = list(current) if isinstance(current, list) else [current] if current else []
+    if callback not in callbacks:
+        # First in the list: a later callback that short-circuits must not skip the timing.
+        setattr(agent, field, [callback, *callbacks])
+
+
+def instrument(agent) -> None:
+    """Add the metrics callbacks to one agent (idempotent)."""
+    _prepend(agent, "before_agent_callback", before_agent)
+    _prepend(agent, "after_agent_callback", after_agent)
+    if hasattr(agent, "before_model_callback"):
+        _prepend(agent, "before_model_callback", before_model)
+        _prepend(agent, "after_model_callback", after_model)
+        _prepend(agent, "on_model_error_callback", on_model_error)
+        _prepend(agent, "before_tool_callback", before_tool)
+        _prepend(agent, "after_tool_callback", after_tool)
+        _prepend(agent, "on_tool_error_callback", on_tool_error)
+
+
+# ---- Event loop ----
+_lag_probes: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]" = weakref.WeakKeyDictionary()
+
+
+async def _probe_lag(interval: float) -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        registry.observe("tripmate_event_loop_lag_seconds", (), max(0.0, time.perf_counter() - started - interval))
+
+
+def watch_event_loop(interval: float = LOOP_LAG_INTERVAL) -> None:
+    """Start the lag probe on the running event loop (once per loop; no-op when off)."""
+    if not interval:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if loop not in _lag_probes:
+        _lag_probes[loop] = loop.create_task(_probe_lag(interval), name="tripmate-loop-lag")
+
+
+# ---- Export ----
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body, content_type = json.dumps(registry.summary()).encode(), "application/json"
+        elif self.path.startswith("/metrics"):
+            body, content_type = registry.prometheus().encode(), "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # keep scrapes out of the app log
+        return
+
+
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_server(port: Optional[int] = METRICS_PORT, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics and /metrics.json on a daemon thread (no-op without a port, or if running)."""
+    global _server
+    if _server is not None or not port:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((host, int(port)), _MetricsHandler)
+    except OSError as e:  # e.g. a second worker on the same port
+        logger.warning("Metrics endpoint not started on port %s: %s", port, e)
+        return None
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("Metrics on http://%s:%s/metrics", host, port)
+    return _server
+
+
+def write_summary(path: Optional[str] = METRICS_JSON_PATH) -> Optional[str]:
+    """Write registry.summary() as JSON to `path`."""
+    if not path:
+        return None
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(registry.summary(), f, indent=2)
+    return path
+
+
+if METRICS_JSON_PATH:
+    atexit.register(write_summary)
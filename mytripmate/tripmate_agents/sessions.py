@@ -0,0 +1,144 @@
+# tripmate_agents/sessions.py
+"""
+Session storage for the production server (server.py), shared by all of its workers.
+
+- SESSION_DB_URL picks the backend: a server database (postgresql+asyncpg://...,
+  mysql+aiomysql://...; ADK's DatabaseSessionService on a SQLAlchemy connection pool
+  sized by SESSION_DB_POOL_SIZE / SESSION_DB_MAX_OVERFLOW), "memory://" (per worker,
+  tests only), or unset for the local file fallback: SQLite at SESSION_DB_PATH.
+- The SQLite fallback is ADK's SqliteSessionService on a per-worker pool of
+  connections in WAL mode with a busy timeout, instead of a new connection per call
+  in rollback-journal mode: workers read while another writes, and wait for a lock
+  rather than fail with "database is locked". Sessions survive a worker or server
+  restart; they survive an instance replacement only on a server database.
+- PooledSqliteSessionService overrides private parts of ADK's SqliteSessionService
+  (_get_db_connection, _db_connect_path/_db_connect_uri, _schema_ready), so
+  requirements.txt pins google-adk to the version it was written against.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlparse
+
+import aiosqlite
+from google.adk.sessions.sqlite_session_service import (
+    CREATE_SCHEMA_SQL, PRAGMA_FOREIGN_KEYS, SqliteSessionService,
+)
+
+from .tools.config import (
+    SESSION_DB_BUSY_TIMEOUT_MS, SESSION_DB_MAX_OVERFLOW, SESSION_DB_PATH, SESSION_DB_POOL_RECYCLE,
+    SESSION_DB_POOL_SIZE, SESSION_DB_URL,
+)
+
+logger = logging.getLogger(__name__)
+
+_services: List["PooledSqliteSessionService"] = []
+
+
+class PooledSqliteSessionService(SqliteSessionService):
+    """SqliteSessionService that reuses up to `pool_size` WAL-mode connections per event loop."""
+
+    def __init__(self, db_path: str, pool_size: int = SESSION_DB_POOL_SIZE,
+                 busy_timeout_ms: int = SESSION_DB_BUSY_TIMEOUT_MS):
+        if os.path.dirname(db_path) and not db_path.startswith(("file:", ":memory:")):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        super().__init__(db_path=db_path)
+        self._pool_size = max(1, pool_size)
+        self._busy_timeout_ms = busy_timeout_ms
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Optional["asyncio.Queue[aiosqlite.Connection]"] = None
+        self._opened = 0
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self._db_connect_path, uri=self._db_connect_uri,
+                                     timeout=self._busy_timeout_ms / 1000)
+        db.row_factory = aiosqlite.Row
+        await db.execute(PRAGMA_FOREIGN_KEYS)
+        await db.execute(f"PRAGMA busy_timeout = {int(self._busy_timeout_ms)}")
+        await db.execute("PRAGMA journal_mode = WAL")
+        await db.execute("PRAGMA synchronous = NORMAL")  # safe with WAL; fsync at checkpoints only
+        if not self._schema_ready:
+            await db.executescript(CREATE_SCHEMA_SQL)
+            self._schema_ready = True
+        return db
+
+    @asynccontextmanager
+    async def _get_db_connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:  # connections belong to the loop that opened them
+            self._loop, self._idle, self._opened = loop, asyncio.Queue(), 0
+        idle = self._idle
+        if idle.empty() and self._opened < self._pool_size:
+            self._opened += 1
+            try:
+                db = await self._connect()
+            except BaseException:
+                self._opened -= 1
+                raise
+        else:
+            db = await idle.get()
+        try:
+            yield db
+        except BaseException:
+            # Never hand the next caller a connection inside a half-done transaction.
+            with suppress(Exception):
+                await db.rollback()
+            raise
+        finally:
+            idle.put_nowait(db)
+
+    async def close(self) -> None:
+        """Close the idle connections of the current event loop's pool."""
+        if self._idle is None or self._loop is not asyncio.get_running_loop():
+            return
+        while not self._idle.empty():
+            db = self._idle.get_nowait()
+            self._opened -= 1
+            with suppress(Exception):
+                await db.close()
+
+
+# ---- ADK wiring ----
+def service_uri(url: Optional[str] = SESSION_DB_URL, path: str = SESSION_DB_PATH) -> str:
+    """The session_service_uri for get_fast_api_app: SESSION_DB_URL, else the SQLite file."""
+    if url:
+        return url
+    return f"sqlite:///{path}"  # ADK reads sqlite:///relative and sqlite:////absolute
+
+
+def db_kwargs(url: Optional[str] = SESSION_DB_URL) -> Dict[str, Any]:
+    """SQLAlchemy engine pool settings for a server database (none for SQLite/memory)."""
+    scheme = urlparse(url or "").scheme
+    if not scheme or scheme in ("sqlite", "memory") or scheme.startswith("sqlite+"):
+        return {}
+    return {
+        "pool_size": SESSION_DB_POOL_SIZE,
+        "max_overflow": SESSION_DB_MAX_OVERFLOW,
+        "pool_recycle": SESSION_DB_POOL_RECYCLE,
+        "pool_pre_ping": True,  # drop connections the database closed while idle
+    }
+
+
+def _sqlite_factory(uri: str, **kwargs: Any) -> PooledSqliteSessionService:
+    path = urlparse(uri).path
+    path = path[1:] if path.startswith("/") else path
+    service = PooledSqliteSessionService(path or ":memory:")
+    _services.append(service)
+    logger.info("Sessions in %s (WAL, pool of %d per worker)", path or ":memory:", SESSION_DB_POOL_SIZE)
+    return service
+
+
+def register() -> None:
+    """Serve sqlite:// session URIs from PooledSqliteSessionService (idempotent)."""
+    from google.adk.cli.service_registry import get_service_registry
+
+    get_service_registry().register_session_service("sqlite", _sqlite_factory)
+
+
+async def close() -> None:
+    """Close pooled connections on shutdown (server.py lifespan)."""
+    for service in _services:
+        await service.close()
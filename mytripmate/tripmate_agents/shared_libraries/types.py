@@ -0,0 +1,343 @@
+"""Common data schemas and types for MyTripMate agents."""
+
+import re
+from typing import Annotated, Any, Dict, List, Optional, Union
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field
+
+
+class TransportSearchRequest(BaseModel):
+    """Input for the flight/train/bus/ship search agents."""
+
+    origin: str = Field(description="Departure city, airport, station or port")
+    destination: str = Field(description="Arrival city, airport, station or port")
+    departure_date: str = Field(description="Outbound date, YYYY-MM-DD")
+    return_date: Optional[str] = Field(default=None, description="Return date, YYYY-MM-DD, if round trip")
+    adults: int = Field(default=1, description="Number of adult travellers (seniors included)")
+    children: int = Field(default=0, description="Number of children")
+    infants: int = Field(default=0, description="Number of infants")
+    budget: Optional[str] = Field(default=None, description="Transport budget with currency, e.g. '8000 INR'")
+    preferences: Optional[str] = Field(default=None, description="Timing/comfort/baggage constraints in short text")
+
+
+class HotelSearchRequest(BaseModel):
+    """Input for the hotel search agent."""
+
+    destination: str = Field(description="City or area to stay in")
+    check_in: str = Field(description="Check-in date, YYYY-MM-DD")
+    check_out: str = Field(description="Check-out date, YYYY-MM-DD")
+    adults: int = Field(default=1, description="Number of adult guests (seniors included)")
+    children: int = Field(default=0, description="Number of children")
+    infants: int = Field(default=0, description="Number of infants")
+    budget: Optional[str] = Field(default=None, description="Stay budget with currency, e.g. '12000 INR total'")
+    preferences: Optional[str] = Field(default=None, description="Location/amenity/refundability preferences")
+
+
+# ---- Coercion ----
+# Model output says "₹6,500", "1.2 lakh", "non-stop" or true where the schemas want
+# numbers and yes/no; these validators normalize such values. Anything ambiguous
+# (ranges, "2 x 3500", "12-15k") is left as is, so validation reports it.
+_AMOUNT = re.compile(
+    r"^(?:(?:rs\.?|[a-z]{3})\s*)?"  # leading currency code: INR, USD, Rs.
+    r"([-+]?\d+(?:\.\d+)?)\s*"
+    r"(k|thousand|l|lacs?|lakhs?|cr|crores?|m|mn|million)?\.?\s*"
+    r"(?:[a-z]{3})?$"  # trailing currency code
+)
+_CURRENCY_SYMBOLS = re.compile(r"[₹$€£¥]")
+MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "l": 1e5, "lac": 1e5, "lacs": 1e5, "lakh": 1e5, "lakhs": 1e5,
+    "cr": 1e7, "crore": 1e7, "crores": 1e7,
+    "m": 1e6, "mn": 1e6, "million": 1e6,
+}
+
+
+def _as_number(value: float) -> Union[int, float]:
+    value = round(value, 6)
+    return int(value) if float(value).is_integer() else value
+
+
+def _to_number(value: Any) -> Any:
+    """'₹6,500' -> 6500, '1.2 lakh' -> 120000, '1.5k' -> 1500, 'free' -> 0; else unchanged."""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return value
+    if not isinstance(value, str):
+        return _as_number(value)
+    text = _CURRENCY_SYMBOLS.sub("", value.replace(",", "")).strip().lower()
+    match = _AMOUNT.match(text)
+    if match:
+        return _as_number(float(match.group(1)) * MULTIPLIERS.get(match.group(2) or "", 1))
+    if text in ("free", "included"):
+        return 0
+    return None if not text or text in ("n/a", "na", "unknown", "null", "none") else value
+
+
+def _to_count(value: Any) -> Any:
+    """'non-stop' / 'direct' -> 0, '1 stop' -> 1."""
+    if isinstance(value, str):
+        text = value.lower()
+        if "non" in text or "direct" in text:
+            return 0
+        match = re.search(r"\d+", text)
+        return int(match.group()) if match else (None if not text.strip() else value)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _to_yes_no(value: Any) -> Any:
+    if isinstance(value, bool):
+        return "yes" if value else "no"
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in ("y", "yes", "true", "refundable", "fully refundable"):
+            return "yes"
+        if text in ("n", "no", "false", "non-refundable", "nonrefundable", "non refundable"):
+            return "no"
+    return value
+
+
+def _to_str_list(value: Any) -> Any:
+    if isinstance(value, str):
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return value
+
+
+Number = Annotated[Optional[Union[int, float]], BeforeValidator(_to_number)]
+Count = Annotated[Optional[int], BeforeValidator(_to_count)]
+YesNo = Annotated[Optional[str], BeforeValidator(_to_yes_no)]
+StrList = Annotated[Optional[List[str]], BeforeValidator(_to_str_list)]
+
+
+class _Schema(BaseModel):
+    """Lenient base for model output: every field optional, unknown keys kept."""
+
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True, populate_by_name=True)
+
+
+class Money(_Schema):
+    amount: Number = None
+    currency: Optional[str] = None
+    notes: Optional[str] = None
+
+
+# ---- Itinerary (itinerary_agent -> save_to_state("itinerary")) ----
+class ItineraryItem(_Schema):
+    time_block: Optional[str] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    expected_time_window: Optional[str] = None
+    cost_estimate: Optional[Money] = None
+    notes: Optional[str] = None
+
+
+class ItineraryDay(_Schema):
+    day: Count = None
+    date: Optional[str] = None
+    items: Optional[List[ItineraryItem]] = None
+    mobility_tips: Optional[str] = None
+    food_picks: StrList = None
+    notes: Optional[str] = None
+
+
+class ItineraryDates(_Schema):
+    start: Optional[str] = None
+    end: Optional[str] = None
+
+
+class ItineraryGroup(_Schema):
+    adults: Count = None
+    children: Count = None
+    seniors: Count = None
+
+
+class ItinerarySaveSchema(_Schema):
+    """The itinerary agent's BACKEND JSON SHAPE."""
+
+    destination: Optional[str] = None
+    duration_days: Count = None
+    budget: Optional[Money] = None
+    dates: Optional[ItineraryDates] = None
+    group: Optional[ItineraryGroup] = None
+    interests: StrList = None
+    itinerary: Optional[List[ItineraryDay]] = None
+    total_estimated_cost: Optional[Money] = None
+
+
+# ---- Trip plan (planning_agent -> save_to_state("trip_plan")) ----
+class TravelDates(_Schema):
+    departure: Optional[str] = None
+    return_: Optional[str] = Field(default=None, alias="return")
+
+
+class Headcount(_Schema):
+    adults: Count = None
+    children: Count = None
+    infants: Count = None
+
+
+class Constraints(_Schema):
+    timing: Optional[str] = None
+    comfort: Optional[str] = None
+    baggage: Optional[str] = None
+    accessibility: Optional[str] = None
+    other: Optional[str] = None
+
+
+class Baggage(_Schema):
+    cabin: Optional[str] = None
+    check_in: Optional[str] = None
+    notes: Optional[str] = None
+
+
+class SelectedTransport(_Schema):
+    mode: Optional[str] = None
+    provider: Optional[str] = None
+    departure_datetime: Optional[str] = None
+    arrival_datetime: Optional[str] = None
+    duration: Optional[str] = None
+    price: Optional[Money] = None
+    baggage: Optional[Baggage] = None
+    stops: Count = None
+    refundability: Optional[str] = None
+    seat_cabin: Optional[str] = None
+    booking_reference: Optional[str] = None
+
+
+class SelectedRoom(_Schema):
+    type: Optional[str] = None
+    bed: Optional[str] = None
+    occupancy: Count = None
+    price_per_night: Optional[Money] = None
+    total_price: Optional[Money] = None
+
+
+class SelectedHotel(_Schema):
+    name: Optional[str] = None
+    location: Optional[str] = None
+    check_in: Optional[str] = None
+    check_out: Optional[str] = None
+    room: Optional[SelectedRoom] = None
+    amenities: StrList = None
+    booking_reference: Optional[str] = None
+
+
+class TripPlan(_Schema):
+    """The planning agent's OUTPUT SCHEMA."""
+
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    dates: Optional[TravelDates] = None
+    headcount: Optional[Headcount] = None
+    budget: Optional[Money] = None
+    constraints: Optional[Constraints] = None
+    selected_transport: Optional[SelectedTransport] = None
+    selected_hotel: Optional[SelectedHotel] = None
+    in_place_movement_cost: Optional[Money] = None
+    total_estimated_cost: Optional[Money] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+# ---- Search results (one option each; the agents answer with a list of them) ----
+Duration = Optional[Union[int, float, str]]  # "2h 15m" or minutes
+
+
+class FlightOption(_Schema):
+    airline_name: Optional[str] = None
+    flight_number: Optional[str] = None
+    departure_airport: Optional[str] = None
+    departure_time_local: Optional[str] = None
+    arrival_airport: Optional[str] = None
+    arrival_time_local: Optional[str] = None
+    duration: Duration = None
+    number_of_stops: Count = None
+    baggage_allowance: Any = None
+    refundable: YesNo = None
+    price_total: Optional[Money] = None
+
+
+class TrainOption(_Schema):
+    train_name: Optional[str] = None
+    train_number: Optional[str] = None
+    departure_station: Optional[str] = None
+    departure_time_local: Optional[str] = None
+    arrival_station: Optional[str] = None
+    arrival_time_local: Optional[str] = None
+    duration: Duration = None
+    class_availability: StrList = None
+    refundable: YesNo = None
+    price_total: Optional[Money] = None
+
+
+class BusOption(_Schema):
+    operator_name: Optional[str] = None
+    bus_type: Optional[str] = None
+    departure_point: Optional[str] = None
+    departure_time_local: Optional[str] = None
+    arrival_point: Optional[str] = None
+    arrival_time_local: Optional[str] = None
+    duration: Duration = None
+    amenities: StrList = None
+    refundable: YesNo = None
+    price_total: Optional[Money] = None
+
+
+class ShipOption(_Schema):
+    operator_name: Optional[str] = None
+    vessel_name: Optional[str] = None
+    departure_port: Optional[str] = None
+    departure_time_local: Optional[str] = None
+    arrival_port: Optional[str] = None
+    arrival_time_local: Optional[str] = None
+    duration: Duration = None
+    cabin_types_available: StrList = None
+    refundable: YesNo = None
+    price_total: Optional[Money] = None
+
+
+class RoomOption(_Schema):
+    room_type: Optional[str] = None
+    occupancy_limit: Count = None
+    available: Count = None
+    bed_type: Optional[str] = None
+    refundable: YesNo = None
+    amenities: StrList = None
+    price_per_night: Optional[Money] = None
+    total_price: Optional[Money] = None
+
+
+class HotelOption(_Schema):
+    hotel_name: Optional[str] = None
+    location: Optional[str] = None
+    star_rating: Number = None
+    amenities: StrList = None
+    refundable: YesNo = None
+    price_per_night: Optional[Money] = None
+    total_price: Optional[Money] = None
+    distance_from_city_center: Any = None
+    rooms: Optional[List[RoomOption]] = None
+
+
+class FlightsSelection(_Schema):
+    options: List[FlightOption] = Field(default_factory=list)
+
+
+class TrainsSelection(_Schema):
+    options: List[TrainOption] = Field(default_factory=list)
+
+
+class BusesSelection(_Schema):
+    options: List[BusOption] = Field(default_factory=list)
+
+
+class ShipsSelection(_Schema):
+    options: List[ShipOption] = Field(default_factory=list)
+
+
+class HotelsSelection(_Schema):
+    options: List[HotelOption] = Field(default_factory=list)
+
+
+class RoomsSelection(_Schema):
+    options: List[RoomOption] = Field(default_factory=list)
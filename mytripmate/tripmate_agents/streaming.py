@@ -0,0 +1,243 @@
+# tripmate_agents/streaming.py
+"""
+Day-by-day delivery of the itinerary while the model is still writing it.
+
+- With SSE streaming (/run_sse with "streaming": true, or the web UI's streaming
+  toggle) ADK runs after_model callbacks on every partial chunk. install(agent) adds
+  one that follows the readable plan ("Day X (Weekday, DD Mon YYYY)" blocks, see
+  ITINERARY_FORMAT_INSTR). As soon as the next day starts, the previous day is parsed
+  (day, date, city, items) and written to state["itinerary_days"]. The chunk that
+  completed it carries that as a stateDelta, so clients can render the day and act on
+  it before the later days exist. The final response completes the last day.
+- Each finished day is enriched in the background: its weather (weather_batch, the
+  cached core of get_weather_batch) and up to ITINERARY_DAY_PLACES Places matches for
+  its items (map_url, lat/lng; cached in tools/places.py). Results land in the same state entry with the
+  next chunk. Lookups start only once partial chunks have been seen, and not for the day
+  finished by the final response, since nothing would merge their results. Lookups
+  still running when the response ends are not awaited (they are held in _tasks until
+  done); they only warm the caches.
+- A day's city comes from the (city, date) pairs of this invocation's get_weather_batch
+  call, else the destination already saved in state.
+- Without streaming there is a single final response: the days still land in state,
+  without enrichment, so a plain /run starts no Places or weather lookups.
+- Time to the first finished day is recorded in tripmate_itinerary_first_day_seconds;
+  compare it with tripmate_model_duration_seconds for the same agent.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import metrics
+from .history import trip_facts
+from .tools import blobs
+from .tools.config import GOOGLE_PLACES_API_KEY, ITINERARY_DAY_PLACES, ITINERARY_STREAM_DAYS
+from .tools.places import lookup_place
+from .tools.weather import weather_batch
+
+logger = logging.getLogger(__name__)
+
+STREAM_AGENTS = ("itinerary_planner",)
+STATE_KEY = "itinerary_days"
+MAX_TRACKED = 256  # in-flight model calls / invocations remembered per process
+
+_DAY_HEADER = re.compile(r"^[\s#>*_-]*Day\s+(\d{1,2})\b(.*)$", re.I | re.M)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.+)$")
+_TIME_BLOCK = re.compile(r"^(morning|afternoon|evening|night|late night|lunch|dinner|breakfast)\b\s*[—–:-]*\s*", re.I)
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_TEXT_DATE = re.compile(r"(\d{1,2})\s+([A-Za-z]{3,9})\.?,?\s+(\d{4})")
+
+
+class _Stream:
+    """Text and days of one model call."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.streaming = False  # a partial chunk has been seen
+        self.text = ""
+        self.days: List[Dict[str, Any]] = []
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self.merged: set = set()
+
+
+_streams: "OrderedDict[Tuple[str, str], _Stream]" = OrderedDict()
+_cities: "OrderedDict[str, Dict[str, str]]" = OrderedDict()  # invocation -> {date: city}
+_tasks: set = set()  # enrichment in flight; the loop only keeps weak references to tasks
+
+
+def _remember(table: OrderedDict, key: Any, value: Any) -> Any:
+    table[key] = value
+    table.move_to_end(key)
+    while len(table) > MAX_TRACKED:
+        table.popitem(last=False)
+    return value
+
+
+# ---- Parsing ----
+def _date(header: str) -> Optional[str]:
+    iso = _ISO_DATE.search(header)
+    if iso:
+        return iso.group()
+    match = _TEXT_DATE.search(header)
+    if match:
+        for fmt in ("%d %b %Y", "%d %B %Y"):
+            try:
+                return datetime.strptime(" ".join(match.groups()), fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                continue
+    return None
+
+
+def _item_name(line: str) -> str:
+    text = _TIME_BLOCK.sub("", line.replace("**", "").replace("__", "").strip())
+    name = re.split(r"\s+[—–-]\s+|:\s|\s\(", text, maxsplit=1)[0]
+    return name.strip(" .*")[:80]
+
+
+def parse_day(block: str) -> Dict[str, Any]:
+    """{"day", "date", "title", "items"} of one "Day X ..." block of the readable plan."""
+    header, _, body = block.partition("\n")
+    match = _DAY_HEADER.match(header)
+    bullets = [m.group(1) for m in map(_BULLET.match, body.splitlines()) if m]
+    timed = [b for b in bullets if _TIME_BLOCK.match(b.replace("**", "").strip())]
+    items = [name for name in map(_item_name, timed or bullets) if name]
+    return {
+        "day": int(match.group(1)) if match else None,
+        "date": _date(header),
+        "title": header.strip(" #*_>-"),
+        "items": items,
+    }
+
+
+def finished_days(text: str, final: bool) -> List[Dict[str, Any]]:
+    """Days of `text` that are complete: all but the last one, or all when the text is final."""
+    starts = [m.start() for m in _DAY_HEADER.finditer(text)]
+    ends = starts[1:] + ([len(text)] if final else [])
+    return [parse_day(text[start:end].strip()) for start, end in zip(starts, ends)]
+
+
+# ---- Enrichment ----
+def enrich_day(day: Dict[str, Any], city: Optional[str]) -> Dict[str, Any]:
+    """Weather and Places matches for one day (blocking; run in a worker thread)."""
+    out: Dict[str, Any] = {}
+    if city and day.get("date"):
+        forecast = (weather_batch([{"city": city, "date": day["date"]}]).get("forecasts") or [{}])[0]
+        out["weather"] = {k: forecast.get(k) for k in
+                          ("status", "summary", "temp_min_c", "temp_max_c", "precip_probability", "alerts")}
+    if city and ITINERARY_DAY_PLACES > 0 and GOOGLE_PLACES_API_KEY:
+        places = []
+        for name in day.get("items", [])[:ITINERARY_DAY_PLACES]:
+            match = lookup_place(f"{name}, {city}")
+            if match:
+                places.append({"name": name, **match})
+        out["places"] = places
+    return out
+
+
+def _start_enrichment(stream: _Stream, day: Dict[str, Any]) -> None:
+    if not day.get("city"):
+        return
+    task = asyncio.get_running_loop().create_task(asyncio.to_thread(enrich_day, dict(day), day["city"]))
+    _tasks.add(task)
+    task.add_done_callback(_task_done)
+    stream.tasks[day["day"]] = task
+
+
+def _task_done(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.warning("Enriching an itinerary day failed: %s", task.exception())
+
+
+def _merge_enrichment(stream: _Stream) -> bool:
+    """Copy finished enrichment into the day entries; True if anything changed."""
+    changed = False
+    for number, task in stream.tasks.items():
+        if number in stream.merged or not task.done() or task.cancelled() or task.exception():
+            continue
+        for day in stream.days:
+            if day["day"] == number:
+                day.update(task.result())
+        stream.merged.add(number)
+        changed = True
+    return changed
+
+
+# ---- Callbacks ----
+def remember_cities(tool, args, tool_context, tool_response):
+    """after_tool callback: the (date -> city) pairs of the invocation's weather lookups."""
+    if tool.name == "get_weather_batch":
+        cities = _cities.get(tool_context.invocation_id) or _remember(_cities, tool_context.invocation_id, {})
+        for loc in args.get("locations") or []:
+            if isinstance(loc, dict) and loc.get("city"):
+                cities[str(loc.get("date") or "")] = loc["city"]
+    return None
+
+
+def start_stream(callback_context, llm_request):
+    """before_model callback: a fresh text buffer for this model call."""
+    if ITINERARY_STREAM_DAYS:
+        _remember(_streams, (callback_context.invocation_id, callback_context.agent_name), _Stream())
+    return None
+
+
+async def _city(callback_context, date: Optional[str]) -> Optional[str]:
+    cities = _cities.get(callback_context.invocation_id) or {}
+    if date in cities:
+        return cities[date]
+    if cities:
+        return next(iter(cities.values()))
+    facts = trip_facts(await blobs.get(callback_context, "itinerary"), await blobs.get(callback_context, "trip_plan"))
+    destination = facts.get("destination")
+    return destination if isinstance(destination, str) else None
+
+
+async def stream_days(callback_context, llm_response):
+    """after_model callback: put each finished day (and its enrichment) in state as it streams."""
+    key = (callback_context.invocation_id, callback_context.agent_name)
+    stream = _streams.get(key)
+    content = llm_response.content
+    if stream is None:
+        return None
+    final = not llm_response.partial
+    stream.streaming = stream.streaming or not final
+    if content and content.parts:
+        text = "".join(p.text for p in content.parts if p.text and not p.thought)
+        # After partial chunks, the final response repeats the whole text.
+        stream.text = text if final and len(text) >= len(stream.text) else stream.text + text
+
+    changed = _merge_enrichment(stream)
+    for day in finished_days(stream.text, final)[len(stream.days):]:
+        if day["day"] is None or any(d["day"] == day["day"] for d in stream.days):
+            continue
+        day["city"] = await _city(callback_context, day["date"])
+        stream.days.append(day)
+        if stream.streaming and not final:
+            _start_enrichment(stream, day)
+        changed = True
+        metrics.registry.inc("tripmate_itinerary_days_streamed_total", (("agent", key[1]),))
+        if len(stream.days) == 1:
+            elapsed = time.perf_counter() - stream.started
+            metrics.registry.observe("tripmate_itinerary_first_day_seconds", (("agent", key[1]),), elapsed)
+            logger.info("%s: day %s ready after %.2fs", key[1], day["day"], elapsed)
+    if changed:
+        callback_context.state[STATE_KEY] = [dict(d) for d in stream.days]
+    if final:
+        _streams.pop(key, None)
+    return None
+
+
+def install(agent) -> None:
+    """Add day streaming to the itinerary agent (idempotent); other agents are left alone."""
+    if getattr(agent, "name", None) not in STREAM_AGENTS or not hasattr(agent, "after_model_callback"):
+        return
+    for field, callback in (("before_model_callback", start_stream), ("after_model_callback", stream_days),
+                            ("after_tool_callback", remember_cities)):
+        current = getattr(agent, field)
+        callbacks = list(current) if isinstance(current, list) else [current] if current else []
+        if callback not in callbacks:
+            setattr(agent, field, [*callbacks, callback])
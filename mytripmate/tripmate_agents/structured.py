@@ -0,0 +1,209 @@
+# tripmate_agents/structured.py
+"""
+Schema checks for the JSON the agents produce, repaired locally before anything is
+sent back to the model.
+
+- save_to_state("itinerary" | "trip_plan", value): a before_tool callback validates the
+  value against STATE_SCHEMAS. Fixable JSON (tools/json_repair.py) and fixable types
+  (the coercing fields of shared_libraries/types.py) are saved normalized; only a value
+  that still does not fit is returned to the agent as an error listing the bad fields.
+- The search agents (AGENT_SCHEMAS) answer with a list of options: an after_model
+  callback repairs and normalizes that answer in place and drops options that cannot
+  be validated, so the planning agent does not have to ask again.
+- Outcomes are counted per agent and schema in tripmate_structured_outputs_total
+  (valid / repaired / coerced / invalid). Each repaired or coerced output is credited
+  with the agent's mean model-call time in tripmate_json_repair_seconds_saved_total:
+  an estimate of the re-prompt it avoided, not a measurement.
+"""
+
+import json
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from google.genai import types as genai_types
+from pydantic import BaseModel, ValidationError
+
+from . import metrics
+from .shared_libraries import types
+from .tools import json_repair
+from .tools.config import STRUCTURED_OUTPUT_CHECKS
+
+logger = logging.getLogger(__name__)
+
+STATE_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "itinerary": types.ItinerarySaveSchema,
+    "trip_plan": types.TripPlan,
+}
+
+AGENT_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "flight_search_agent": types.FlightsSelection,
+    "train_search_agent": types.TrainsSelection,
+    "bus_search_agent": types.BusesSelection,
+    "ship_search_agent": types.ShipsSelection,
+    "hotel_search_agent": types.HotelsSelection,
+    "hotel_room_selection_agent": types.RoomsSelection,
+}
+
+MAX_ERRORS = 5
+
+
+class Outcome(NamedTuple):
+    status: str  # valid | repaired | coerced | invalid
+    value: Any  # normalized value (the input as parsed when invalid)
+    fixes: List[str]  # JSON repairs applied
+    errors: List[str]  # validation errors, "path: message"
+
+
+# ---- Validation ----
+def _errors(error: ValidationError, prefix: str = "") -> List[str]:
+    out = []
+    for e in error.errors():
+        path = ".".join(str(p) for p in e["loc"])
+        out.append(f"{prefix}{'.' if prefix and path else ''}{path}: {e['msg']}")
+    return out
+
+
+def _dump(model: BaseModel) -> Dict[str, Any]:
+    return model.model_dump(exclude_unset=True, by_alias=True)
+
+
+def _option_model(schema: Type[BaseModel]) -> Optional[Type[BaseModel]]:
+    """The element model of a *Selection schema, or None for a plain object schema."""
+    field = schema.model_fields.get("options")
+    args = getattr(field.annotation, "__args__", None) if field else None
+    return args[0] if args else None
+
+
+def _options(data: Any) -> Tuple[Optional[list], Optional[str]]:
+    """(option list, wrapper key or None when the answer is the list itself)."""
+    if isinstance(data, list):
+        return data, None
+    if isinstance(data, dict):
+        if isinstance(data.get("options"), list):
+            return data["options"], "options"
+        lists = [k for k, v in data.items() if isinstance(v, list)]
+        if len(lists) == 1:
+            return data[lists[0]], lists[0]
+    return None, None
+
+
+def _validate_options(data: Any, option_model: Type[BaseModel]) -> Tuple[Optional[Any], List[str]]:
+    options, key = _options(data)
+    if options is None:
+        return None, ["expected a list of options"]
+    kept, errors = [], []
+    for i, option in enumerate(options):
+        try:
+            kept.append(_dump(option_model.model_validate(option)))
+        except ValidationError as e:
+            errors.extend(_errors(e, prefix=f"[{i}]"))
+    if options and not kept:
+        return None, errors
+    return (kept if key is None else {**data, key: kept}), errors
+
+
+def check(value: Any, schema: Type[BaseModel]) -> Outcome:
+    """Parse (repairing if needed), validate and normalize one structured output."""
+    fixes: List[str] = []
+    data = value
+    if isinstance(value, str):
+        try:
+            data, fixes = json_repair.repair(value)
+        except ValueError as e:
+            return Outcome("invalid", value, [], [str(e)])
+
+    option_model = _option_model(schema)
+    if option_model is not None:
+        normalized, errors = _validate_options(data, option_model)
+        if normalized is None:
+            return Outcome("invalid", data, fixes, errors)
+    elif not isinstance(data, dict):
+        return Outcome("invalid", data, fixes, [f"expected a JSON object, got {type(data).__name__}"])
+    else:
+        try:
+            normalized, errors = _dump(schema.model_validate(data)), []
+        except ValidationError as e:
+            return Outcome("invalid", data, fixes, _errors(e))
+
+    if fixes:
+        return Outcome("repaired", normalized, fixes, errors)
+    return Outcome("coerced" if normalized != data else "valid", normalized, fixes, errors)
+
+
+def is_answer(value: Any, schema: Type[BaseModel]) -> bool:
+    """True if `value` parses as `schema` with at least one option (nothing is recorded)."""
+    outcome = check(value, schema)
+    if outcome.status == "invalid":
+        return False
+    if _option_model(schema) is None:
+        return bool(outcome.value)
+    options, _ = _options(outcome.value)
+    return bool(options)
+
+
+def _record(agent_name: str, schema: Type[BaseModel], outcome: Outcome) -> None:
+    agent = (("agent", agent_name),)
+    labels = agent + (("schema", schema.__name__), ("outcome", outcome.status))
+    metrics.registry.inc("tripmate_structured_outputs_total", labels)
+    if outcome.status in ("repaired", "coerced"):
+        saved = metrics.registry.mean("tripmate_model_duration_seconds", agent)
+        if saved:
+            metrics.registry.inc("tripmate_json_repair_seconds_saved_total", agent, saved)
+        logger.info("%s: %s output %s (%s)", agent_name, schema.__name__, outcome.status,
+                    ", ".join(outcome.fixes or outcome.errors) or "types normalized")
+    elif outcome.status == "invalid":
+        logger.warning("%s: %s output invalid: %s", agent_name, schema.__name__, outcome.errors[:MAX_ERRORS])
+
+
+# ---- Callbacks ----
+def validate_save_payload(tool, args, tool_context):
+    """before_tool callback: normalize save_to_state payloads, or refuse ones that do not fit."""
+    if not STRUCTURED_OUTPUT_CHECKS or tool.name != "save_to_state":
+        return None
+    key = args.get("key")
+    schema = STATE_SCHEMAS.get(key)
+    if schema is None or args.get("value") is None:
+        return None
+    outcome = check(args["value"], schema)
+    _record(tool_context.agent_name, schema, outcome)
+    if outcome.status == "invalid":
+        return {
+            "status": "error",
+            "error": f'"{key}" does not match the expected JSON shape; fix these fields and save again',
+            "details": outcome.errors[:MAX_ERRORS],
+        }
+    if outcome.status != "valid":
+        args["value"] = json.dumps(outcome.value, ensure_ascii=False)
+    return None
+
+
+def repair_json_output(callback_context, llm_response):
+    """after_model callback: the search agent's answer, repaired and normalized; None if unchanged."""
+    schema = AGENT_SCHEMAS.get(callback_context.agent_name)
+    content = llm_response.content
+    if not STRUCTURED_OUTPUT_CHECKS or schema is None or llm_response.partial or not content or not content.parts:
+        return None
+    if any(p.function_call for p in content.parts):
+        return None
+    text = "".join(p.text for p in content.parts if p.text and not p.thought)
+    if not text.strip():
+        return None
+    outcome = check(text, schema)
+    _record(callback_context.agent_name, schema, outcome)
+    if outcome.status in ("valid", "invalid"):
+        return None
+    llm_response.content = genai_types.Content(
+        role=content.role, parts=[genai_types.Part(text=json.dumps(outcome.value, ensure_ascii=False))])
+    return llm_response
+
+
+def install(agent) -> None:
+    """Add the structured-output checks to one LLM agent (idempotent)."""
+    if not hasattr(agent, "before_tool_callback"):
+        return
+    for field, callback, wanted in (("before_tool_callback", validate_save_payload, True),
+                                    ("after_model_callback", repair_json_output, agent.name in AGENT_SCHEMAS)):
+        current = getattr(agent, field)
+        callbacks = list(current) if isinstance(current, list) else [current] if current else []
+        if wanted and callback not in callbacks:
+            setattr(agent, field, [*callbacks, callback])
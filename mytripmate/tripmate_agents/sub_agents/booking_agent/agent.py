@@ -9,12 +9,13 @@ from tripmate_agents.tools.bookings import (
     book_flight, book_train, book_bus, book_hotel, generate_booking_confirmation
 )
 from tripmate_agents.tools.memory import save_to_file
-from tripmate_agents.tools.config import MODEL
+from tripmate_agents.tools.currency import convert_currency
+from tripmate_agents.tools.models import model_for
 
 json_cfg = GenerateContentConfig(response_mime_type="application/json")
 
 booking_orchestrator = Agent(
-    model=MODEL,
+    model=model_for("booking_orchestrator"),
     name="booking_orchestrator",
     description="Converts the finalized plan into EMT-style bookings (mocked).",
     instruction=booking_orchestrator_prompt,
@@ -28,7 +29,8 @@ booking_orchestrator = Agent(
         book_train,
         book_bus,
         book_hotel,
-        generate_booking_confirmation
+        generate_booking_confirmation,
+        convert_currency,
     ],
     # You can keep text output for chat + store JSON to state
     generate_content_config=GenerateContentConfig(temperature=0.1, top_p=0.5),
@@ -23,6 +23,7 @@ FLOW
 
 RULES
 - Never fabricate numbers. Use the cart’s prices; discounts come only from coupon tool and offers table.
+- If any cart item is priced in another currency, convert it to INR with convert_currency (one call per source currency, all amounts at once) before computing the subtotal.
 - Keep chat concise: show final “You’re booked!” summary + references.
 - Always return a compact JSON (BookingConfirmation) to state as `booking_confirmation` AFTER you show the human-readable receipt.
 """
@@ -4,10 +4,12 @@ from google.adk.tools import google_search  # The Google Search tool
 import sys
 sys.path.append("..")
 from tripmate_agents.callback_logging import log_query_to_model, log_model_response
+from tripmate_agents.tools.search_cache import CachedSearchAgentTool
+from tripmate_agents.tools.models import model_for
 from . import prompt
 
 search_agent = Agent(
-    model='gemini-2.5-flash',
+    model=model_for('google_search_agent'),
     name='google_search_agent',
     description='A helpful assistant for user questions.',
     instruction=prompt.search_agent_prompt,
@@ -15,3 +17,6 @@ search_agent = Agent(
     after_model_callback=log_model_response,
     tools=[google_search]
 )
+
+# Shared, cached AgentTool for every agent that consults google_search_agent
+search_agent_tool = CachedSearchAgentTool(agent=search_agent)
@@ -1,7 +1,6 @@
 import logging
 
 from google.adk.agents.llm_agent import LlmAgent
-import google.cloud.logging
 from typing import Optional, List, Dict
 
 from google.adk.tools.tool_context import ToolContext
@@ -9,32 +8,46 @@ from google.adk.tools.agent_tool import AgentTool
 
 from tripmate_agents.callback_logging import log_query_to_model, log_model_response
 
-from .prompt import itinerary_planner_prompt
+from . import prompt
+from tripmate_agents.instructions import Section, SectionedInstruction, before, reached
 # from tripmate_agents.tools.places import map_tool
 from tripmate_agents.sub_agents.planing_agent.agent import planing_agent
 from tripmate_agents.sub_agents.safety_check_agent.agent import weather_agent
-from tripmate_agents.tools.config import MODEL
+from tripmate_agents.tools.models import model_for
 from tripmate_agents.tools.memory import save_to_state
-from tripmate_agents.sub_agents.google_search_agent.agent import search_agent
-# from tripmate_agents.shared_libraries.itinerary_model import ItinerarySaveSchema
+from tripmate_agents.tools.weather import get_weather_batch
+from tripmate_agents.tools.costs import check_itinerary_budget
+from tripmate_agents.tools.currency import convert_currency
+from tripmate_agents.sub_agents.google_search_agent.agent import search_agent_tool
 
 
-cloud_logging_client = google.cloud.logging.Client()
-cloud_logging_client.setup_logging()
+# Phase-dependent prompt: the missing-info handshake until a first draft, the save and
+# change follow-ups after it.
+itinerary_instruction = SectionedInstruction("itinerary_planner", [
+    Section("role", prompt.ITINERARY_ROLE_INSTR),
+    Section("missing_info", prompt.ITINERARY_MISSING_INFO_INSTR, before("_itinerary_drafted", "itinerary")),
+    Section("format", prompt.ITINERARY_FORMAT_INSTR),
+    Section("next_step", prompt.ITINERARY_NEXT_STEP_INSTR, reached("_itinerary_drafted", "itinerary")),
+    Section("handoff", prompt.ITINERARY_HANDOFF_INSTR),
+    Section("change", prompt.ITINERARY_CHANGE_INSTR, reached("_itinerary_drafted", "itinerary")),
+])
 
 itinerary_planner = LlmAgent(
     name="itinerary_planner",
-    model=MODEL,
+    model=model_for("itinerary_planner"),
     description="Build a list of attractions to visit in a country.",
-    instruction=itinerary_planner_prompt,
+    instruction=itinerary_instruction,
     before_model_callback=log_query_to_model,
     after_model_callback=log_model_response,
     # When instructed to do so, paste the tools parameter below this line
     sub_agents=[planing_agent],
     tools=[
+        get_weather_batch,
         AgentTool(agent=weather_agent),
-        AgentTool(agent=search_agent),
+        search_agent_tool,
         # map_tool, 
+        check_itinerary_budget,
+        convert_currency,
         save_to_state,
     ],
 )
@@ -4,9 +4,18 @@ from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 from google.genai.types import GenerateContentConfig
 from . import prompt
-from tripmate_agents.tools.config import MODEL
-from tripmate_agents.sub_agents.google_search_agent.agent import search_agent
+from tripmate_agents.instructions import Section, SectionedInstruction, before, reached
+from tripmate_agents.tools.config import PLANNING_FANOUT
+from tripmate_agents.tools.models import model_for
+from tripmate_agents.sub_agents.google_search_agent.agent import search_agent_tool
 from tripmate_agents.tools.memory import save_to_state, save_to_file
+from tripmate_agents.tools.seats import allocate_seats
+from tripmate_agents.tools.rooms import optimize_rooms
+from tripmate_agents.tools.ranking import rank_transport_options
+from tripmate_agents.tools.currency import convert_currency
+from tripmate_agents.tools.search_cache import CachedAgentTool
+from tripmate_agents.tools.fanout import make_fanout_tool
+from tripmate_agents.shared_libraries.types import TransportSearchRequest, HotelSearchRequest
 from tripmate_agents.sub_agents.booking_agent.agent import booking_orchestrator
 
 
@@ -16,7 +25,7 @@ json_response_config = GenerateContentConfig(
 
 
 hotel_room_selection_agent = Agent(
-    model=MODEL,
+    model=model_for("hotel_room_selection_agent"),
     name="hotel_room_selection_agent",
     description="Help users with the room choices for a hotel",
     instruction=prompt.HOTEL_ROOM_SELECTION_INSTR,
@@ -27,128 +36,119 @@ hotel_room_selection_agent = Agent(
 )
 
 hotel_search_agent = Agent(
-    model=MODEL,
+    model=model_for("hotel_search_agent"),
     name="hotel_search_agent",
     description="Help users find hotel around a specific geographic area",
     instruction=prompt.HOTEL_SEARCH_INSTR,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
     generate_content_config=json_response_config,
+    input_schema=HotelSearchRequest,
     # tools = [AgentTool(agent=search_agent)]
 )
 
-flight_seat_selection_agent = Agent(
-    model=MODEL,
-    name="flight_seat_selection_agent",
-    description="Help users with the seat choices",
-    instruction=prompt.FLIGHT_SEAT_SELECTION_INSTR,
-    disallow_transfer_to_parent=True,
-    disallow_transfer_to_peers=True,
-    generate_content_config=json_response_config,
-)
 
 flight_search_agent = Agent(
-    model=MODEL,
+    model=model_for("flight_search_agent"),
     name="flight_search_agent",
     description="Help users find best flight deals",
     instruction=prompt.FLIGHT_SEARCH_INSTR,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
     generate_content_config=json_response_config,
+    input_schema=TransportSearchRequest,
     # tools = [AgentTool(agent=search_agent)]
 )
 
 train_search_agent = Agent(
-    model=MODEL,
+    model=model_for("train_search_agent"),
     name="train_search_agent",
     description="Help users find the best train options within budget and timing constraints",
     instruction=prompt.TRAIN_SEARCH_INSTR,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
     generate_content_config=json_response_config,
+    input_schema=TransportSearchRequest,
     # tools = [AgentTool(agent=search_agent)]
 )
 
-train_seat_selection_agent = Agent(
-    model=MODEL,
-    name="train_seat_selection_agent",
-    description="Help users choose train class/berth and seats based on preference",
-    instruction=prompt.TRAIN_SEAT_SELECTION_INSTR,
-    disallow_transfer_to_parent=True,
-    disallow_transfer_to_peers=True,
-    generate_content_config=json_response_config,
-)
 
 bus_search_agent = Agent(
-    model=MODEL,
+    model=model_for("bus_search_agent"),
     name="bus_search_agent",
     description="Help users find the best intercity bus options within budget and timing constraints",
     instruction=prompt.BUS_SEARCH_INSTR,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
     generate_content_config=json_response_config,
+    input_schema=TransportSearchRequest,
     # tools = [AgentTool(agent=search_agent)]
 )
 
-bus_seat_selection_agent = Agent(
-    model=MODEL,
-    name="bus_seat_selection_agent",
-    description="Help users pick bus seat/berth and AC/non-AC based on preference",
-    instruction=prompt.BUS_SEAT_SELECTION_INSTR,
-    disallow_transfer_to_parent=True,
-    disallow_transfer_to_peers=True,
-    generate_content_config=json_response_config,
-)
 
 ship_search_agent = Agent(
-    model=MODEL,
+    model=model_for("ship_search_agent"),
     name="ship_search_agent",
     description="Help users find ship/ferry routes when a water connection is available, respecting budget & schedule",
     instruction=prompt.SHIP_SEARCH_INSTR,
     disallow_transfer_to_parent=True,
     disallow_transfer_to_peers=True,
     generate_content_config=json_response_config,
+    input_schema=TransportSearchRequest,
 )
 
-ship_cabin_selection_agent = Agent(
-    model=MODEL,
-    name="ship_cabin_selection_agent",
-    description="Help users pick ship/ferry cabin/class",
-    instruction=prompt.SHIP_CABIN_SELECTION_INSTR,
-    disallow_transfer_to_parent=True,
-    disallow_transfer_to_peers=True,
-    generate_content_config=json_response_config,
-)
+
+transport_search_tools = {
+    "flight": CachedAgentTool(agent=flight_search_agent, namespace="flight"),
+    "train": CachedAgentTool(agent=train_search_agent, namespace="train"),
+    "bus": CachedAgentTool(agent=bus_search_agent, namespace="bus"),
+    "ship": CachedAgentTool(agent=ship_search_agent, namespace="ship"),
+}
+
+# Opt-in: one concurrent feasibility call across all modes (PLANNING_FANOUT=true)
+fanout_tools = [make_fanout_tool(transport_search_tools)] if PLANNING_FANOUT else []
+
+# Phase-dependent prompt: the save schema once a hotel is searched or rooms are chosen, after a
+# refused save_to_state, or once a plan is saved; save_to_state cannot be called validly without it.
+planning_instruction = SectionedInstruction("planning_agent", [
+    Section("role", prompt.PLANNING_ROLE_INSTR),
+    Section("start", prompt.PLANNING_START_INSTR, before("_plan_transport_ranked", "trip_plan")),
+    Section("search", prompt.PLANNING_SEARCH_INSTR),
+    Section("date_rules", prompt.PLANNING_DATE_RULES_INSTR, before("_plan_seats_chosen", "trip_plan")),
+    Section("rules", prompt.PLANNING_RULES_INSTR),
+    Section("save", prompt.PLANNING_SAVE_INSTR,
+            reached("_plan_hotel_searched", "_plan_rooms_chosen", "_save_rejected", "trip_plan"),
+            fallback=prompt.PLANNING_SAVE_PENDING_INSTR),
+    *([Section("fanout", prompt.PLANNING_FANOUT_INSTR)] if PLANNING_FANOUT else []),
+])
 
 # --- Orchestrator: Planning Agent ---
 planing_agent = Agent(
-    model=MODEL,
+    model=model_for("planning_agent"),
     name="planning_agent",
     description=(
         "Helps users with travel planning, completing a full itinerary for their vacation. "
         "Supports flights, trains, buses, and ships. Finds best deals, filters by budget, "
         "confirms preferred mode, gathers seat/cabin choices, then hotel, and produces a final itinerary."
     ),
-    instruction=prompt.PLANNING_AGENT_INSTR,
+    instruction=planning_instruction,
     tools=[
         # Transport discovery (all modes)
-        AgentTool(agent=flight_search_agent),
-        AgentTool(agent=train_search_agent),
-        AgentTool(agent=bus_search_agent),
-        AgentTool(agent=ship_search_agent),
+        *transport_search_tools.values(),
+        *fanout_tools,
+        rank_transport_options,
 
-        # Seat/cabin selection per mode
-        AgentTool(agent=flight_seat_selection_agent),
-        AgentTool(agent=train_seat_selection_agent),
-        AgentTool(agent=bus_seat_selection_agent),
-        AgentTool(agent=ship_cabin_selection_agent),
+        # Seat/cabin selection per mode (local seat-map engine)
+        allocate_seats,
 
         # Stay 
-        AgentTool(agent=hotel_search_agent),
+        CachedAgentTool(agent=hotel_search_agent, namespace="hotel"),
         AgentTool(agent=hotel_room_selection_agent),
+        optimize_rooms,
+
+        search_agent_tool,
+        convert_currency,
 
-        AgentTool(agent=search_agent),
-        
         # Memory tool
         save_to_state,
     ],
@@ -0,0 +1,195 @@
+# tripmate_agents/tool_results.py
+"""
+Shrinks tool results before they go back into the model's context.
+
+- install(agent) adds reduce_result as the last after_tool callback (after metrics and
+  phase flags have seen the full result). It returns a reduced copy; the tool's own
+  return value, and anything the tool stored in state, are left untouched.
+- Projections keep only the fields an agent uses: PROJECTIONS maps "tool" (or
+  "agent:tool", which wins) to {path: [fields]}. Path "" is the result itself; any other
+  path names a key whose list elements, dict-of-dict values or dict are projected.
+  TOOL_RESULT_PROJECTIONS (inline JSON or a JSON file) replaces the table.
+- Strings longer than TOOL_RESULT_MAX_CHARS are cut. JSON text (e.g. a search agent's
+  answer, also when fenced or wrapped in prose; parsed with tools/json_repair.py as in
+  structured.py) is reduced as JSON and re-serialized compactly, so only its free-text
+  fields are cut. JSON that cannot be parsed whole is passed on as is, never cut mid-list.
+- Lists longer than TOOL_RESULT_MAX_ITEMS become {"count", "state_key", "first"}: the full
+  list goes to state (out of line when large, tools/blobs.py) and the model sees the first
+  TOOL_RESULT_KEEP_ITEMS elements. Nothing reads that list back, so this only applies to
+  display-only results (COLLAPSE_LIST_TOOLS, or TOOL_RESULT_COLLAPSE_TOOLS); results the
+  agent acts on in full (seats, rooms, bookings, weather, search options) keep their lists.
+- Bytes saved are logged per tool and counted in tripmate_tool_result_bytes_saved_total.
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import metrics
+from .tools import blobs, json_repair
+from .tools.config import (
+    TOOL_RESULT_COLLAPSE_TOOLS, TOOL_RESULT_KEEP_ITEMS, TOOL_RESULT_MAX_CHARS, TOOL_RESULT_MAX_ITEMS,
+    TOOL_RESULT_PROJECTIONS, TOOL_RESULT_REDUCER,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fields the booking agent reads back from a booked item for the receipt.
+BOOKED_ITEM_FIELDS = [
+    "type", "mode", "name", "title", "provider", "operator_name", "airline_name", "train_name", "hotel_name",
+    "flight_number", "train_number", "date", "departure_datetime", "check_in", "check_out",
+    "price", "amount", "currency", "pnr", "booking_id",
+]
+
+PROJECTIONS: Dict[str, Dict[str, List[str]]] = {
+    # The planner only links and names the places; coordinates and ids stay in state[key].
+    "map_tool": {"places": ["place_name", "name", "address", "map_url"]},
+    "book_flight": {"": BOOKED_ITEM_FIELDS},
+    "book_train": {"": BOOKED_ITEM_FIELDS},
+    "book_bus": {"": BOOKED_ITEM_FIELDS},
+    "book_hotel": {"": BOOKED_ITEM_FIELDS},
+    "generate_booking_confirmation": {"items": BOOKED_ITEM_FIELDS},
+}
+
+
+# Tools (or "agent:tool") whose long lists are only shown to the user, never acted on item by item.
+COLLAPSE_LIST_TOOLS = frozenset({"map_tool"})
+
+
+def _load_projections(spec: Optional[str]) -> Dict[str, Dict[str, List[str]]]:
+    if not spec:
+        return PROJECTIONS
+    try:
+        if os.path.exists(spec):
+            with open(spec, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return json.loads(spec)
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring TOOL_RESULT_PROJECTIONS (%s); using the built-in table", e)
+        return PROJECTIONS
+
+
+_projections = _load_projections(TOOL_RESULT_PROJECTIONS)
+_collapse_tools = (frozenset(t.strip() for t in TOOL_RESULT_COLLAPSE_TOOLS.split(",") if t.strip())
+                   if TOOL_RESULT_COLLAPSE_TOOLS is not None else COLLAPSE_LIST_TOOLS)
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+# ---- Reduction ----
+def _pick(value: Any, fields: List[str]) -> Any:
+    if not isinstance(value, dict):
+        return value
+    return {k: value[k] for k in fields if k in value}
+
+
+def project(result: Any, spec: Dict[str, List[str]]) -> Any:
+    """Keep only the listed fields (see the module docstring for paths)."""
+    if not isinstance(result, dict):
+        return result
+    out = _pick(result, spec[""] + [p for p in spec if p]) if "" in spec else dict(result)
+    for path, fields in spec.items():
+        value = out.get(path) if path else None
+        if isinstance(value, list):
+            out[path] = [_pick(v, fields) for v in value]
+        elif isinstance(value, dict) and value and all(isinstance(v, dict) for v in value.values()):
+            out[path] = {k: _pick(v, fields) for k, v in value.items()}
+        elif isinstance(value, dict):
+            out[path] = _pick(value, fields)
+    return out
+
+
+def _state_key(tool_name: str, path: str) -> str:
+    return "_result_" + "_".join(filter(None, re.split(r"[^A-Za-z0-9]+", f"{tool_name}.{path}")))
+
+
+def shrink(value: Any, tool_name: str, lists: List[Tuple[str, list]], path: str = "",
+           max_chars: int = TOOL_RESULT_MAX_CHARS, max_items: int = TOOL_RESULT_MAX_ITEMS) -> Any:
+    """
+    Cut long strings and replace long lists with {"count", "state_key", "first"}; each list
+    set aside is appended to `lists` as (state key, full list) for the caller to store.
+    """
+    if isinstance(value, str):
+        if max_chars > 0 and len(value) > max_chars:
+            return f"{value[:max_chars]}... [+{len(value) - max_chars} chars]"
+        return value
+    if isinstance(value, dict):
+        return {k: shrink(v, tool_name, lists, f"{path}.{k}" if path else str(k), max_chars, max_items)
+                for k, v in value.items()}
+    if isinstance(value, list):
+        if max_items > 0 and len(value) > max_items:
+            key = _state_key(tool_name, path or "result")
+            lists.append((key, value))
+            first = [shrink(v, tool_name, lists, f"{path}[{i}]", max_chars, max_items)
+                     for i, v in enumerate(value[:TOOL_RESULT_KEEP_ITEMS])]
+            return {"count": len(value), "state_key": key, "first": first}
+        return [shrink(v, tool_name, lists, f"{path}[{i}]", max_chars, max_items) for i, v in enumerate(value)]
+    return value
+
+
+# A code fence, or an object/array holding strings or objects: text that carries a JSON payload.
+_JSON_PAYLOAD = re.compile(r"```|[\[{]\s*[\"'{\[]")
+
+
+def _parse_json_text(value: Any) -> Tuple[Any, bool]:
+    if not isinstance(value, str) or not _JSON_PAYLOAD.search(value):
+        return value, False
+    try:
+        data, _ = json_repair.repair(value)
+    except ValueError:
+        return value, False
+    if not isinstance(data, (dict, list)) or not data:
+        return value, False
+    # Repair keeps the first complete value; if objects were left behind, use the text as is.
+    if value.count("{") > json.dumps(data, ensure_ascii=False).count("{"):
+        return value, False
+    return data, True
+
+
+def reduce(agent_name: str, tool_name: str, result: Any) -> Tuple[Any, List[Tuple[str, list]]]:
+    """(reduced copy of `result`, [(state key, full list)] set aside for state)."""
+    data, was_json = _parse_json_text(result)
+    spec = _projections.get(f"{agent_name}:{tool_name}") or _projections.get(tool_name)
+    if spec:
+        data = project(data, spec)
+    lists: List[Tuple[str, list]] = []
+    collapse = tool_name in _collapse_tools or f"{agent_name}:{tool_name}" in _collapse_tools
+    # a payload that would not parse is still not cut: the agent needs all of its options
+    max_chars = 0 if isinstance(data, str) and _JSON_PAYLOAD.search(data) else TOOL_RESULT_MAX_CHARS
+    data = shrink(data, tool_name, lists, max_chars=max_chars, max_items=TOOL_RESULT_MAX_ITEMS if collapse else 0)
+    if was_json:
+        data = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    return data, lists
+
+
+# ---- Callback ----
+async def reduce_result(tool, args, tool_context, tool_response):
+    """after_tool callback: the reduced result, or None when nothing shrank."""
+    if not TOOL_RESULT_REDUCER or tool_response is None:
+        return None
+    reduced, lists = reduce(tool_context.agent_name, tool.name, tool_response)
+    for key, full in lists:
+        await blobs.put(tool_context, key, full)
+    before, after = _size(tool_response), _size(reduced)
+    if after >= before:
+        return None
+    labels = (("agent", tool_context.agent_name), ("tool", tool.name))
+    metrics.registry.inc("tripmate_tool_result_bytes_saved_total", labels, before - after)
+    logger.info("Tool %s result: %d -> %d bytes (%d saved)", tool.name, before, after, before - after)
+    return reduced
+
+
+def install(agent) -> None:
+    """Add reduce_result as the LLM agent's last after_tool callback (idempotent)."""
+    if not hasattr(agent, "after_tool_callback"):
+        return
+    current = agent.after_tool_callback
+    callbacks = list(current) if isinstance(current, list) else [current] if current else []
+    if reduce_result not in callbacks:
+        agent.after_tool_callback = [*callbacks, reduce_result]
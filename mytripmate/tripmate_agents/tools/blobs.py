@@ -0,0 +1,128 @@
+# tripmate_agents/tools/blobs.py
+"""
+Out-of-line storage for large session-state values.
+
+- put(ctx, key, value) stores values whose JSON is longer than STATE_BLOB_THRESHOLD
+  characters as a session artifact ("state_<key>.json", one version per change) and
+  leaves a small reference in state: {"$blob": filename, "version", "chars", "sha256"}.
+  Smaller values, and every value when no artifact service is configured, stay inline.
+- get(ctx, key) returns the value itself, loading a referenced artifact lazily. Loaded
+  blobs are kept in a small per-process LRU, so repeated reads in a turn cost nothing.
+- Session events, the persisted session row and state templating only ever see the
+  reference; the artifact service (local .adk/artifacts, gs://... via
+  ARTIFACT_SERVICE_URI) holds the payload once per version.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from google.genai import types
+
+from .config import STATE_BLOB_CACHE_SIZE, STATE_BLOB_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+REF = "$blob"
+MIME_TYPE = "application/json"
+
+_cache: "OrderedDict[Tuple[str, str, int], Any]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+# ---- References ----
+def is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get(REF), str)
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _sha(blob: str) -> str:
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def _session_id(ctx) -> str:
+    session = getattr(ctx, "session", None)
+    return getattr(session, "id", None) or ""
+
+
+def _remember(key: Tuple[str, str, int], value: Any) -> None:
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > max(0, STATE_BLOB_CACHE_SIZE):
+            _cache.popitem(last=False)
+
+
+# ---- Store / load ----
+async def put(ctx, key: str, value: Any, threshold: int = STATE_BLOB_THRESHOLD) -> Dict[str, Any]:
+    """
+    Set state[key] to `value`, out of line when it is larger than `threshold` chars.
+
+    Returns:
+        {"key", "chars", "inline": bool, "version"?}
+    """
+    blob = _encode(value)
+    if threshold <= 0 or len(blob) <= threshold:
+        ctx.state[key] = value
+        return {"key": key, "chars": len(blob), "inline": True}
+
+    sha = _sha(blob)
+    current = ctx.state.get(key)
+    if is_ref(current) and current.get("sha256") == sha:  # unchanged: no new version
+        return {"key": key, "chars": len(blob), "inline": False, "version": current.get("version")}
+
+    filename = f"state_{key}.json"
+    try:
+        version = await ctx.save_artifact(filename, types.Part.from_bytes(data=blob.encode("utf-8"),
+                                                                          mime_type=MIME_TYPE))
+    except ValueError as e:  # no artifact service in this runner
+        logger.debug("Keeping state[%s] inline: %s", key, e)
+        ctx.state[key] = value
+        return {"key": key, "chars": len(blob), "inline": True}
+
+    ctx.state[key] = {REF: filename, "version": version, "chars": len(blob), "sha256": sha}
+    _remember((_session_id(ctx), filename, version), value)
+    logger.info("state[%s]: %d chars stored as %s v%s", key, len(blob), filename, version)
+    return {"key": key, "chars": len(blob), "inline": False, "version": version}
+
+
+async def load(ctx, ref: Dict[str, Any], default: Any = None) -> Any:
+    """The value behind a reference from put(), or `default` if the artifact is gone."""
+    filename, version = ref[REF], ref.get("version")
+    cache_key = (_session_id(ctx), filename, version)
+    with _cache_lock:
+        if cache_key in _cache:
+            _cache.move_to_end(cache_key)
+            return _cache[cache_key]
+    try:
+        part = await ctx.load_artifact(filename, version=version)
+    except ValueError as e:
+        logger.warning("Cannot load %s v%s: %s", filename, version, e)
+        return default
+    data = getattr(getattr(part, "inline_data", None), "data", None) if part else None
+    if data is None:
+        data = getattr(part, "text", None) if part else None
+    if data is None:
+        logger.warning("Artifact %s v%s is missing", filename, version)
+        return default
+    try:
+        value = json.loads(data.decode("utf-8") if isinstance(data, bytes) else data)
+    except ValueError as e:
+        logger.warning("Artifact %s v%s is not JSON: %s", filename, version, e)
+        return default
+    _remember(cache_key, value)
+    return value
+
+
+async def get(ctx, key: str, default: Any = None) -> Any:
+    """state[key], materialized if it was stored out of line."""
+    value = ctx.state.get(key, default)
+    if is_ref(value):
+        return await load(ctx, value, default)
+    return value
@@ -0,0 +1,161 @@
+# tripmate_agents/tools/cache.py
+"""
+Small TTL cache with pluggable local backends, shared by all sessions of a process.
+
+- MemoryBackend: in-process LRU dict (default).
+- SQLiteBackend: file-backed, shared by every worker/process on the same disk.
+
+TTLCache.lookup(...) answers "fresh", "stale" (past TTL but inside the
+stale-while-revalidate window) or a miss, so callers can serve stale values
+while refreshing them in the background.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+# ---- Backends ----
+class MemoryBackend:
+    """Thread-safe in-memory LRU store of key -> (value, stored_at)."""
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, stored_at: float) -> None:
+        with self._lock:
+            self._data[key] = (value, stored_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteBackend:
+    """SQLite store; values are kept as JSON text."""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, stored_at FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), row[1]
+        except ValueError:
+            return None
+
+    def set(self, key: str, value: Any, stored_at: float) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, stored_at) VALUES (?, ?, ?)", (key, payload, stored_at)
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+
+def make_backend(kind: str = "memory", path: Optional[str] = None):
+    """Build a backend by name: 'memory' or 'sqlite' (path required for sqlite)."""
+    kind = (kind or "memory").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(path or "tripmate_agents/cache/cache.sqlite3")
+    if kind != "memory":
+        logger.warning("Unknown cache backend '%s', falling back to memory", kind)
+    return MemoryBackend()
+
+
+# ---- Cache ----
+class TTLCache:
+    """
+    TTL cache with per-namespace lifetimes and a stale-while-revalidate window.
+
+    Keys are namespaced ("flight", "hotel", ...) so each namespace gets its own TTL.
+    """
+
+    def __init__(self, backend=None, ttl: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 3600.0, stale_ttl: float = 0.0):
+        self.backend = backend or MemoryBackend()
+        self.ttl = dict(ttl or {})
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{namespace}:{key}"
+
+    def ttl_for(self, namespace: str) -> float:
+        return self.ttl.get(namespace, self.default_ttl)
+
+    def lookup(self, namespace: str, key: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Return (value, FRESH|STALE) or (None, None) on a miss/expired entry."""
+        entry = self.backend.get(self._key(namespace, key))
+        if entry is None:
+            self.misses += 1
+            return None, None
+        value, stored_at = entry
+        age = time.time() - stored_at
+        ttl = self.ttl_for(namespace)
+        if age <= ttl:
+            self.hits += 1
+            return value, FRESH
+        if age <= ttl + self.stale_ttl:
+            self.stale_hits += 1
+            return value, STALE
+        self.backend.delete(self._key(namespace, key))
+        self.misses += 1
+        return None, None
+
+    def store(self, namespace: str, key: str, value: Any) -> None:
+        self.backend.set(self._key(namespace, key), value, time.time())
+
+    def invalidate(self, namespace: str, key: str) -> None:
+        self.backend.delete(self._key(namespace, key))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
@@ -11,3 +11,94 @@ GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 GOOGLE_PROJECT_ID = os.environ.get("GOOGLE_PROJECT_ID")
 GOOGLE_LOCATION = os.environ.get("GOOGLE_LOCATION")
 GOOGLE_REGION = os.environ.get("GOOGLE_REGION")
+
+# Shared search-result cache (tools/search_cache.py): "memory" or "sqlite"
+SEARCH_CACHE_BACKEND = os.environ.get("SEARCH_CACHE_BACKEND", "memory")
+SEARCH_CACHE_PATH = os.environ.get("SEARCH_CACHE_PATH", "tripmate_agents/cache/search_cache.sqlite3")
+SEARCH_CACHE_TTL = os.environ.get("SEARCH_CACHE_TTL")  # e.g. "flight=600,hotel=86400"
+SEARCH_CACHE_STALE_SECONDS = float(os.environ.get("SEARCH_CACHE_STALE_SECONDS", "1800"))
+
+# Planning fan-out (tools/fanout.py): query all transport modes at once with a shared deadline
+PLANNING_FANOUT = os.environ.get("PLANNING_FANOUT", "false").lower() in ("1", "true", "yes")
+FANOUT_DEADLINE_SECONDS = float(os.environ.get("FANOUT_DEADLINE_SECONDS", "25"))
+# google_search_agent cache: MinHash similarity needed to reuse a near-duplicate answer; 0 = exact matches only
+SEARCH_SIMILARITY_THRESHOLD = float(os.environ.get("SEARCH_SIMILARITY_THRESHOLD", "0"))  # e.g. 0.9
+
+# Weather provider for tools/weather.py: "open-meteo" (live) or "fixture" (offline stand-in)
+WEATHER_PROVIDER = os.environ.get("WEATHER_PROVIDER", "open-meteo").lower()
+WEATHER_FIXTURE_PATH = os.environ.get("WEATHER_FIXTURE_PATH", "tripmate_agents/weather/forecast_fixture.json")
+
+# Currency rate table for tools/currency.py (INR per unit), reloaded when the file changes
+FX_RATES_PATH = os.environ.get("FX_RATES_PATH", "tripmate_agents/currency/rates.json")
+FX_REFRESH_SECONDS = float(os.environ.get("FX_REFRESH_SECONDS", "3600"))
+
+# Per-agent model tiers (tools/models.py). MODEL is the orchestrator tier.
+MODEL_FAST = os.environ.get("MODEL_FAST")  # cheap structured agents, default gemini-2.5-flash-lite
+MODEL_SEARCH = os.environ.get("MODEL_SEARCH")  # search agents, default MODEL
+AGENT_MODELS = os.environ.get("AGENT_MODELS")  # e.g. "planning_agent=gemini-2.5-pro,weather_agent=stub"
+MODEL_FALLBACKS = os.environ.get("MODEL_FALLBACKS")  # comma list, or "none"; default: other tiers by latency
+MODEL_TIMEOUT_SECONDS = float(os.environ.get("MODEL_TIMEOUT_SECONDS", "60"))
+MODEL_STUB = os.environ.get("MODEL_STUB", "false").lower() in ("1", "true", "yes")  # every agent -> StubLlm
+MODEL_STUB_SCRIPT = os.environ.get("MODEL_STUB_SCRIPT")  # scenario JSON file(s), comma-separated, queued for StubLlm
+
+# Cold start: build the agent tree + clients on a background thread as soon as the package is imported
+WARMUP_ON_IMPORT = os.environ.get("WARMUP_ON_IMPORT", "false").lower() in ("1", "true", "yes")
+
+# Conversation-history window (history.py): older turns become a summary built from state
+HISTORY_KEEP_TURNS = int(os.environ.get("HISTORY_KEEP_TURNS", "0"))  # user turns kept verbatim; 0 = keep all, e.g. 6
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "0"))  # est. history tokens per call; 0 = no budget
+HISTORY_TOKEN_BUDGETS = os.environ.get("HISTORY_TOKEN_BUDGETS")  # per agent, e.g. "planning_agent=12000"
+
+# Tool-result reducer (tool_results.py): projected, truncated results go back to the model
+TOOL_RESULT_REDUCER = os.environ.get("TOOL_RESULT_REDUCER", "true").lower() in ("1", "true", "yes")
+TOOL_RESULT_MAX_CHARS = int(os.environ.get("TOOL_RESULT_MAX_CHARS", "4000"))  # per string; 0 = no limit
+TOOL_RESULT_MAX_ITEMS = int(os.environ.get("TOOL_RESULT_MAX_ITEMS", "25"))  # longer lists move to state; 0 = never
+TOOL_RESULT_KEEP_ITEMS = int(os.environ.get("TOOL_RESULT_KEEP_ITEMS", "5"))  # elements of a moved list still shown
+TOOL_RESULT_PROJECTIONS = os.environ.get("TOOL_RESULT_PROJECTIONS")  # JSON or JSON file; replaces the built-in table
+TOOL_RESULT_COLLAPSE_TOOLS = os.environ.get("TOOL_RESULT_COLLAPSE_TOOLS")  # comma list of display-only tools; default map_tool
+
+# Structured outputs (structured.py): schema check and local JSON repair before any re-prompt
+STRUCTURED_OUTPUT_CHECKS = os.environ.get("STRUCTURED_OUTPUT_CHECKS", "true").lower() in ("1", "true", "yes")
+
+# Streamed itinerary days (streaming.py): each finished day lands in state and is enriched right away
+ITINERARY_STREAM_DAYS = os.environ.get("ITINERARY_STREAM_DAYS", "true").lower() in ("1", "true", "yes")
+ITINERARY_DAY_PLACES = int(os.environ.get("ITINERARY_DAY_PLACES", "6"))  # Places lookups per day; 0 = weather only
+PLACES_CACHE_TTL = float(os.environ.get("PLACES_CACHE_TTL", str(24 * 60 * 60)))  # seconds a Places match is reused
+
+# Model-traffic logging (callback_logging.py): queued, batched, truncated, sampled, PII-redacted
+LOG_MAX_CHARS = int(os.environ.get("LOG_MAX_CHARS", "2000"))  # per text part; 0 = no limit
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "1.0"))  # share of invocations logged
+LOG_SAMPLE_RATES = os.environ.get("LOG_SAMPLE_RATES")  # per agent, e.g. "google_search_agent=0.1"
+LOG_REDACT_PII = os.environ.get("LOG_REDACT_PII", "true").lower() in ("1", "true", "yes")
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))  # entries beyond this are dropped
+LOG_BATCH_SIZE = int(os.environ.get("LOG_BATCH_SIZE", "100"))
+LOG_FLUSH_SECONDS = float(os.environ.get("LOG_FLUSH_SECONDS", "1.0"))
+
+# Metrics (metrics.py): Prometheus text on this port (/metrics, /metrics.json); unset = no endpoint
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0")) or None  # e.g. 9464
+METRICS_JSON_PATH = os.environ.get("METRICS_JSON_PATH")  # JSON summary written on exit
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", "0"))  # event-loop lag probe period (s); 0 = off
+
+# Tracing (tracing.py): JSONL file for every agent/model/tool span; unset = no export
+TRACE_PATH = os.environ.get("TRACE_PATH")  # e.g. "traces.jsonl"
+TRACE_MAX_ATTR_CHARS = int(os.environ.get("TRACE_MAX_ATTR_CHARS", "1000"))  # 0 = keep span attributes whole
+
+# Cloud Logging client (callback_logging.setup_cloud_logging); false keeps logs on stdout only
+CLOUD_LOGGING = os.environ.get("CLOUD_LOGGING", "true").lower() in ("1", "true", "yes")
+
+# Record/replay of model and Places traffic (tools/replay.py): "off", "record" or "replay"
+TRAFFIC_MODE = os.environ.get("TRAFFIC_MODE", "off").lower()
+TRAFFIC_FIXTURE = os.environ.get("TRAFFIC_FIXTURE", "tripmate_agents/fixtures/traffic.jsonl.gz")
+
+# Session storage for the production server (server.py, sessions.py)
+SESSION_DB_URL = os.environ.get("SESSION_DB_URL")  # e.g. postgresql+asyncpg://user:pw@host/db; unset = SQLite file
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", "tripmate_agents/.adk/session.db")  # local file fallback
+SESSION_DB_POOL_SIZE = int(os.environ.get("SESSION_DB_POOL_SIZE", "5"))  # connections per worker
+SESSION_DB_MAX_OVERFLOW = int(os.environ.get("SESSION_DB_MAX_OVERFLOW", "10"))  # extra server-DB connections at peak
+SESSION_DB_POOL_RECYCLE = int(os.environ.get("SESSION_DB_POOL_RECYCLE", "1800"))  # seconds before a connection is renewed
+SESSION_DB_BUSY_TIMEOUT_MS = int(os.environ.get("SESSION_DB_BUSY_TIMEOUT_MS", "10000"))  # SQLite wait for a lock
+
+# Large session-state values (tools/blobs.py): kept as artifacts, with a reference in state
+STATE_BLOB_THRESHOLD = int(os.environ.get("STATE_BLOB_THRESHOLD", "2048"))  # JSON chars; 0 = always inline
+STATE_BLOB_CACHE_SIZE = int(os.environ.get("STATE_BLOB_CACHE_SIZE", "256"))  # loaded blobs kept per process
+ARTIFACT_SERVICE_URI = os.environ.get("ARTIFACT_SERVICE_URI")  # e.g. gs://bucket; unset = tripmate_agents/.adk/artifacts
@@ -0,0 +1,193 @@
+# tripmate_agents/tools/costs.py
+"""
+Local cost rollup and budget check for an itinerary.
+
+- rollup_costs(itinerary) walks the itinerary JSON (the save_to_state shape), sums
+  cost_estimate amounts per day, per category and overall in one currency, and flags
+  days/items that break the budget. Pure Python, no I/O, so it is cheap enough to run
+  after every edit.
+- check_itinerary_budget(...) is the tool wrapper; it reads state["itinerary"] (loading
+  it from its artifact when stored out of line, tools/blobs.py) unless a draft is passed in.
+
+Currencies are converted through the shared local rate table (tools/currency.py).
+"""
+
+import json
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+from google.adk.tools.tool_context import ToolContext
+
+from . import blobs
+from .currency import DEFAULT_CURRENCY, normalize_currency, rates
+from .memory import _safe_parse_json_str
+
+logger = logging.getLogger(__name__)
+
+# First matching keyword wins; an explicit item "category" takes precedence.
+CATEGORY_KEYWORDS = (
+    ("stay", ("hotel", "homestay", "resort", "hostel", "stay", "check-in", "check in", "lodge")),
+    ("transport", ("jeep", "taxi", "cab", "bus", "train", "flight", "ferry", "auto", "transfer",
+                   "drive", "bike rental", "car rental", "fuel")),
+    ("food", ("breakfast", "lunch", "dinner", "cafe", "café", "food", "restaurant", "meal", "snack",
+              "coffee", "dine", "dining")),
+    ("entry", ("ticket", "entry", "entrance", "admission", "permit", "pass")),
+)
+
+
+# ---- Helpers ----
+def _amount(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(",", "").strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def _category(item: Dict[str, Any]) -> str:
+    explicit = item.get("category")
+    if isinstance(explicit, str) and explicit.strip():
+        return explicit.strip().lower()
+    cost = item.get("cost_estimate") if isinstance(item.get("cost_estimate"), dict) else {}
+    text = " ".join(str(v or "") for v in (item.get("name"), item.get("description"),
+                                          item.get("notes"), cost.get("notes"))).lower()
+    for category, words in CATEGORY_KEYWORDS:
+        if any(w in text for w in words):
+            return category
+    return "activity"
+
+
+def _round(value: float) -> float:
+    return round(value, 2)
+
+
+# ---- Rollup ----
+def rollup_costs(itinerary: Dict[str, Any], currency: Optional[str] = None,
+                 per_day_budget: Optional[float] = None) -> Dict[str, Any]:
+    """Sum itinerary costs per day/category/overall and check them against the budget."""
+    budget = itinerary.get("budget") if isinstance(itinerary.get("budget"), dict) else {}
+    target = normalize_currency(currency or budget.get("currency"), DEFAULT_CURRENCY)
+    days = [d for d in itinerary.get("itinerary") or [] if isinstance(d, dict)]
+
+    def convert(amount: float, ccy: str) -> Tuple[Optional[float], Optional[str]]:
+        rate = rates.rate(ccy, target)
+        return (amount * float(rate), None) if rate is not None else (None, ccy)
+
+    budget_total = _amount(budget.get("amount"))
+    if budget_total is not None:
+        budget_total, _ = convert(budget_total, normalize_currency(budget.get("currency"), target))
+    if per_day_budget is None and budget_total is not None and days:
+        per_day_budget = budget_total / len(days)
+
+    total, by_category, by_day, flags, unconverted = 0.0, {}, [], [], set()
+    priced = unpriced = 0
+    for index, day in enumerate(days, start=1):
+        day_no = day.get("day") or index
+        day_total, day_priced, day_unpriced = 0.0, 0, 0
+        for item in day.get("items") or []:
+            if not isinstance(item, dict):
+                continue
+            cost = item.get("cost_estimate") if isinstance(item.get("cost_estimate"), dict) else {}
+            amount = _amount(cost.get("amount"))
+            if amount is None:
+                day_unpriced += 1
+                continue
+            value, missing = convert(amount, normalize_currency(cost.get("currency"), target))
+            if value is None:
+                unconverted.add(missing)
+                day_unpriced += 1
+                continue
+            day_priced += 1
+            day_total += value
+            category = _category(item)
+            by_category[category] = by_category.get(category, 0.0) + value
+            if per_day_budget is not None and value > per_day_budget:
+                flags.append({
+                    "type": "item_over_day_budget", "day": day_no, "item": item.get("name"),
+                    "amount": _round(value), "per_day_budget": _round(per_day_budget),
+                })
+        over = per_day_budget is not None and day_total > per_day_budget
+        if over:
+            flags.append({
+                "type": "day_over_budget", "day": day_no, "amount": _round(day_total),
+                "per_day_budget": _round(per_day_budget), "excess": _round(day_total - per_day_budget),
+            })
+        by_day.append({
+            "day": day_no, "date": day.get("date"), "total": _round(day_total),
+            "items_priced": day_priced, "items_unpriced": day_unpriced, "over_budget": over,
+        })
+        total += day_total
+        priced += day_priced
+        unpriced += day_unpriced
+
+    budget_report = None
+    if budget_total is not None:
+        budget_report = {
+            "amount": _round(budget_total),
+            "per_day": _round(per_day_budget) if per_day_budget is not None else None,
+            "remaining": _round(budget_total - total),
+            "used_pct": _round(100.0 * total / budget_total) if budget_total else None,
+            "over_budget": total > budget_total,
+        }
+        if total > budget_total:
+            flags.append({"type": "trip_over_budget", "amount": _round(total),
+                          "budget": _round(budget_total), "excess": _round(total - budget_total)})
+
+    # Catch a model-written total that disagrees with the items.
+    stated = itinerary.get("total_estimated_cost") if isinstance(itinerary.get("total_estimated_cost"), dict) else {}
+    stated_amount = _amount(stated.get("amount"))
+    if stated_amount is not None:
+        stated_value, _ = convert(stated_amount, normalize_currency(stated.get("currency"), target))
+        if stated_value is not None and abs(stated_value - total) > max(1.0, 0.01 * total):
+            flags.append({"type": "stated_total_mismatch", "stated": _round(stated_value), "computed": _round(total)})
+
+    return {
+        "status": "ok",
+        "currency": target,
+        "total": _round(total),
+        "by_day": by_day,
+        "by_category": {k: _round(v) for k, v in sorted(by_category.items(), key=lambda kv: -kv[1])},
+        "budget": budget_report,
+        "items_priced": priced,
+        "items_unpriced": unpriced,
+        "unconverted_currencies": sorted(unconverted),
+        "flags": flags,
+    }
+
+
+# ---- Tool ----
+async def check_itinerary_budget(
+    tool_context: ToolContext,
+    itinerary: Optional[str] = None,
+    currency: Optional[str] = None,
+    per_day_budget: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Compute itinerary cost totals (per day, per category, overall) and budget breaches.
+
+    Args:
+        itinerary: Optional draft itinerary JSON (the save_to_state shape). Defaults to the
+                   saved state["itinerary"].
+        currency: Report currency (defaults to the itinerary budget currency, then INR).
+        per_day_budget: Optional daily cap; defaults to budget.amount / number of days.
+
+    Returns:
+        {"status", "currency", "total", "by_day", "by_category", "budget", "flags", ...}
+    """
+    data = _safe_parse_json_str(itinerary if itinerary is not None else await blobs.get(tool_context, "itinerary"))
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            return {"status": "error", "error": "itinerary is not valid JSON"}
+    if not isinstance(data, dict):
+        return {"status": "error", "error": "no itinerary to check"}
+    if currency is None:
+        profile = tool_context.state.get("user_profile") or {}
+        budget = data.get("budget") if isinstance(data.get("budget"), dict) else {}
+        if not budget.get("currency") and isinstance(profile, dict):
+            currency = profile.get("preferred_currency")
+    return rollup_costs(data, currency=currency, per_day_budget=per_day_budget)
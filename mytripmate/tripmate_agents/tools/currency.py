@@ -0,0 +1,248 @@
+# tripmate_agents/tools/currency.py
+"""
+Currency conversion from a local rate table, shared by the pricing, booking and
+itinerary tools.
+
+- RateTable loads FX_RATES_PATH (units of the base currency per 1 unit of each
+  currency, stored as strings so Decimal stays exact) and caches cross rates. The file
+  is re-read when it changes: checked on access every FX_REFRESH_SECONDS, or on a
+  fixed schedule once start_refresher() is called.
+- convert(...) converts one amount with Decimal math, rounded to the currency's minor unit.
+- convert_many(...) converts a whole list with one rate lookup per source currency.
+- convert_prices(...) converts every {"amount", "currency"} block inside an itinerary or
+  option list (cost_estimate, price_total, price_per_night, budget, ...) in one pass.
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+from google.adk.tools.tool_context import ToolContext
+
+from .config import FX_RATES_PATH, FX_REFRESH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CURRENCY = "INR"
+
+ALIASES = {
+    "RS": "INR", "RS.": "INR", "RUPEE": "INR", "RUPEES": "INR", "₹": "INR",
+    "$": "USD", "US$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "DIRHAM": "AED",
+}
+
+# Digits after the decimal point; everything else uses 2.
+MINOR_UNITS = {"JPY": 0, "KRW": 0, "VND": 0, "IDR": 0, "KWD": 3, "BHD": 3, "OMR": 3}
+
+
+# ---- Helpers ----
+def normalize_currency(code: Any, fallback: Optional[str] = None) -> Optional[str]:
+    text = str(code or "").strip().upper()
+    if not text:
+        return fallback
+    return ALIASES.get(text, text)
+
+
+def to_decimal(value: Any) -> Optional[Decimal]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, Decimal):
+        return value
+    try:
+        return Decimal(str(value).replace(",", "").strip())
+    except InvalidOperation:
+        return None
+
+
+def quantize(amount: Decimal, currency: str) -> Decimal:
+    exponent = Decimal(1).scaleb(-MINOR_UNITS.get(currency, 2))
+    return amount.quantize(exponent, rounding=ROUND_HALF_UP)
+
+
+# ---- Rate table ----
+class RateTable:
+    """In-memory rate table backed by a JSON file, reloaded when the file changes."""
+
+    def __init__(self, path: str = FX_RATES_PATH, refresh_seconds: float = FX_REFRESH_SECONDS):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.base = DEFAULT_CURRENCY
+        self.as_of: Optional[str] = None
+        self._rates: Dict[str, Decimal] = {}
+        self._cross: Dict[Tuple[str, str], Optional[Decimal]] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self.reload()
+
+    def reload(self) -> bool:
+        """Re-read the rate file if it changed. Returns True when new rates were loaded."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            logger.warning("Rate file %s unavailable: %s", self.path, e)
+            return False
+        if mtime == self._mtime:
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            rates = {normalize_currency(k): to_decimal(v) for k, v in (data.get("rates") or {}).items()}
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load rates from %s, keeping previous table: %s", self.path, e)
+            return False
+        rates = {k: v for k, v in rates.items() if v is not None and v > 0}
+        with self._lock:
+            self.base = normalize_currency(data.get("base"), DEFAULT_CURRENCY)
+            self.as_of = data.get("as_of")
+            self._rates = rates
+            self._cross = {}
+            self._mtime = mtime
+        logger.info("Loaded %d currency rates (as of %s)", len(rates), self.as_of)
+        return True
+
+    def _maybe_refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at >= self.refresh_seconds:
+            self._checked_at = now
+            self.reload()
+
+    def start_refresher(self, interval: Optional[float] = None) -> None:
+        """Reload the rate file every `interval` seconds on a daemon thread."""
+        if self._refresher is not None:
+            return
+        interval = interval or self.refresh_seconds
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                self.reload()
+
+        self._refresher = threading.Thread(target=loop, name="fx-rate-refresher", daemon=True)
+        self._refresher.start()
+
+    def currencies(self) -> List[str]:
+        return sorted(self._rates)
+
+    def rate(self, from_ccy: str, to_ccy: str) -> Optional[Decimal]:
+        """Multiplier from from_ccy to to_ccy, or None if either currency is unknown."""
+        self._maybe_refresh()
+        if from_ccy == to_ccy:
+            return Decimal(1)
+        key = (from_ccy, to_ccy)
+        if key not in self._cross:
+            src, dst = self._rates.get(from_ccy), self._rates.get(to_ccy)
+            self._cross[key] = src / dst if src is not None and dst is not None else None
+        return self._cross[key]
+
+
+rates = RateTable()
+
+
+# ---- Conversion API ----
+def convert(amount: Any, from_currency: Any, to_currency: Any) -> Optional[Decimal]:
+    """Convert one amount; None if the amount or either currency is unknown."""
+    value = to_decimal(amount)
+    src, dst = normalize_currency(from_currency), normalize_currency(to_currency)
+    if value is None or not src or not dst:
+        return None
+    rate = rates.rate(src, dst)
+    return quantize(value * rate, dst) if rate is not None else None
+
+
+def convert_many(amounts: Sequence[Any], from_currency: Union[str, Sequence[Any]],
+                 to_currency: str) -> List[Optional[Decimal]]:
+    """
+    Convert a list of amounts to one currency. `from_currency` is a single code or one
+    code per amount; each distinct source currency is looked up once.
+    """
+    dst = normalize_currency(to_currency)
+    sources = [from_currency] * len(amounts) if isinstance(from_currency, str) else list(from_currency)
+    if len(sources) != len(amounts):
+        raise ValueError("from_currency must be a single code or one code per amount")
+    lookup: Dict[Optional[str], Optional[Decimal]] = {}
+    out: List[Optional[Decimal]] = []
+    for amount, source in zip(amounts, sources):
+        src = normalize_currency(source, dst)
+        if src not in lookup:
+            lookup[src] = rates.rate(src, dst)
+        value, rate = to_decimal(amount), lookup[src]
+        out.append(quantize(value * rate, dst) if value is not None and rate is not None else None)
+    return out
+
+
+def convert_prices(data: Any, to_currency: str, default_currency: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Convert every {"amount", "currency"} block found anywhere in `data` (a copy is returned).
+    Converted blocks keep the source figures under "original"; blocks in unknown
+    currencies are left as they are and listed in "unconverted".
+    """
+    dst = normalize_currency(to_currency)
+    result = copy.deepcopy(data)
+    blocks: List[Dict[str, Any]] = []
+    stack = [result]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "amount" in node and "currency" in node:
+                blocks.append(node)
+            stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+
+    priced = [b for b in blocks if to_decimal(b.get("amount")) is not None]
+    sources = [normalize_currency(b.get("currency"), default_currency or dst) for b in priced]
+    converted = convert_many([b["amount"] for b in priced], sources, dst)
+    unconverted = set()
+    for block, source, value in zip(priced, sources, converted):
+        if value is None:
+            unconverted.add(source)
+            continue
+        if source != dst:
+            block["original"] = {"amount": block["amount"], "currency": block.get("currency")}
+        block["amount"] = float(value)
+        block["currency"] = dst
+    return {"data": result, "converted": len(priced) - len(unconverted), "unconverted": sorted(unconverted)}
+
+
+# ---- Tool ----
+def convert_currency(
+    amounts: List[float],
+    from_currency: str,
+    tool_context: ToolContext,
+    to_currency: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Convert one or more amounts between currencies using the local rate table.
+
+    Args:
+        amounts: amounts to convert, e.g. [1200, 350.5].
+        from_currency: ISO code of the amounts (e.g. "USD"); symbols like "$" or "₹" work too.
+        to_currency: target ISO code; defaults to user_profile.preferred_currency, then INR.
+
+    Returns:
+        {"status", "from", "to", "rate", "amounts": [converted...], "as_of"}
+    """
+    if to_currency is None:
+        profile = tool_context.state.get("user_profile") or {}
+        to_currency = profile.get("preferred_currency") if isinstance(profile, dict) else None
+    src = normalize_currency(from_currency)
+    dst = normalize_currency(to_currency, DEFAULT_CURRENCY)
+    rate = rates.rate(src, dst) if src else None
+    if rate is None:
+        return {"status": "error", "error": f"no rate for {from_currency} -> {dst}",
+                "supported": rates.currencies()}
+    converted = convert_many(list(amounts or []), src, dst)
+    return {
+        "status": "ok",
+        "from": src,
+        "to": dst,
+        "rate": float(rate),
+        "amounts": [float(v) if v is not None else None for v in converted],
+        "as_of": rates.as_of,
+    }
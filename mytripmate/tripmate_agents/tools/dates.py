@@ -0,0 +1,372 @@
+# tripmate_agents/tools/dates.py
+"""
+Deterministic relative-date resolution for the root agent.
+
+- resolve_dates(text) turns phrases like "next weekend", "this Friday", "in 2 weeks",
+  "15 Nov for 4 days", "agle hafte", "अगले शनिवार" or "२ हफ्ते बाद" into ISO
+  start/end dates, anchored on the session's {_time} in user_profile.timezone.
+- normalize_relative_dates(text, today) is the pure parser behind it.
+
+Confidence: "high" for unambiguous phrases, "medium" when a common interpretation was
+picked (e.g. "next weekend", Hindi "kal"), "low" when the result looks inconsistent.
+"""
+
+import logging
+import re
+from calendar import monthrange
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from google.adk.tools.tool_context import ToolContext
+
+logger = logging.getLogger(__name__)
+
+HIGH, MEDIUM, LOW = "high", "medium", "low"
+_RANK = {HIGH: 2, MEDIUM: 1, LOW: 0}
+
+DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "couple of": 2, "few": 3,
+    "ek": 1, "do": 2, "teen": 3, "char": 4, "chaar": 4, "paanch": 5, "panch": 5, "chhe": 6, "che": 6,
+    "saat": 7, "aath": 8, "nau": 9, "das": 10,
+    "एक": 1, "दो": 2, "तीन": 3, "चार": 4, "पांच": 5, "पाँच": 5, "छह": 6, "छः": 6, "सात": 7,
+    "आठ": 8, "नौ": 9, "दस": 10,
+}
+
+WEEKDAYS = {
+    0: ("monday", "mon", "somvar", "somwar", "सोमवार"),
+    1: ("tuesday", "tue", "tues", "mangalvar", "mangalwar", "मंगलवार"),
+    2: ("wednesday", "wed", "budhvar", "budhwar", "बुधवार"),
+    3: ("thursday", "thu", "thurs", "guruvar", "guruwar", "brihaspativar", "गुरुवार", "बृहस्पतिवार"),
+    4: ("friday", "fri", "shukravar", "shukrawar", "शुक्रवार"),
+    5: ("saturday", "shanivar", "shaniwar", "शनिवार"),
+    6: ("sunday", "ravivar", "raviwar", "itvaar", "itwar", "रविवार", "इतवार"),
+}
+
+MONTHS = {
+    1: ("january", "jan", "जनवरी"),
+    2: ("february", "feb", "फरवरी", "फ़रवरी"),
+    3: ("march", "mar", "मार्च"),
+    4: ("april", "apr", "अप्रैल"),
+    5: ("may", "मई"),
+    6: ("june", "jun", "जून"),
+    7: ("july", "jul", "जुलाई"),
+    8: ("august", "aug", "अगस्त"),
+    9: ("september", "sept", "sep", "सितंबर", "सितम्बर"),
+    10: ("october", "oct", "अक्टूबर"),
+    11: ("november", "nov", "नवंबर", "नवम्बर"),
+    12: ("december", "dec", "दिसंबर", "दिसम्बर"),
+}
+
+
+def _alt(words) -> str:
+    return "(?:" + "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True)) + ")"
+
+
+def _lookup(table: Dict[int, tuple], word: str) -> int:
+    return next(k for k, names in table.items() if word in names)
+
+
+# Word boundaries that also work for Devanagari (vowel signs are not \w in Python's re).
+_L, _R = r"(?<![\wऀ-ॿ])", r"(?![\wऀ-ॿ])"
+
+NUM = _alt(NUMBER_WORDS) + r"|\d{1,3}"
+WEEKDAY = _alt(w for names in WEEKDAYS.values() for w in names)
+MONTH = _alt(w for names in MONTHS.values() for w in names)
+NEXT = _alt(("next", "coming", "upcoming", "agle", "agla", "agli", "अगले", "अगला", "अगली", "आने वाले"))
+THIS = _alt(("this", "is", "iss", "इस"))
+WEEKEND = _alt(("weekend", "week-end", "week end", "वीकेंड", "सप्ताहांत"))
+WEEK = _alt(("week", "hafte", "hafta", "हफ्ते", "हफ़्ते", "हफ्ता", "सप्ताह"))
+MONTH_WORD = _alt(("month", "mahine", "mahina", "महीने", "महीना"))
+UNIT_DAY = _alt(("days", "day", "din", "दिन"))
+UNIT_WEEK = _alt(("weeks", "week", "hafte", "hafton", "हफ्ते", "हफ़्ते", "हफ्तों", "सप्ताह"))
+UNIT_MONTH = _alt(("months", "month", "mahine", "महीने"))
+UNIT = f"(?:{UNIT_DAY}|{UNIT_WEEK}|{UNIT_MONTH})"
+LATER = _alt(("later", "from now", "from today", "baad", "bad", "बाद", "में", "mein", "me"))
+# "I may 2 travel": a subject right before "may" makes it the verb, not the month.
+MODAL_SUBJECT = re.compile(r"(?:^|\s)(?:i|we|you|they|he|she|it|who|which|that|one|kids|parents|friends)\s$")
+
+
+# ---- Helpers ----
+def _to_int(word: str) -> int:
+    word = word.strip()
+    return int(word) if word.isdigit() else NUMBER_WORDS[word]
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, monthrange(year, month)[1]))
+
+
+def _month_bounds(year: int, month: int) -> Tuple[date, date]:
+    return date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+
+def _upcoming(base: date, weekday: int) -> date:
+    """First `weekday` on or after base."""
+    return base + timedelta(days=(weekday - base.weekday()) % 7)
+
+
+def _weekend(today: date, following: bool) -> Tuple[date, date]:
+    if today.weekday() == 6 and not following:
+        return today, today
+    saturday = today if today.weekday() == 5 else _upcoming(today, 5)
+    if following and today.weekday() >= 4:
+        saturday += timedelta(days=7)
+    return saturday, saturday + timedelta(days=1)
+
+
+def _unit_days(unit: str, count: int, today: date) -> date:
+    if re.fullmatch(UNIT_DAY, unit):
+        return today + timedelta(days=count)
+    if re.fullmatch(UNIT_WEEK, unit):
+        return today + timedelta(weeks=count)
+    return _add_months(today, count)
+
+
+def _absolute(day: int, month: int, year: Optional[str], base: date) -> Optional[date]:
+    try:
+        if year:
+            return date(int(year), month, day)
+        candidate = date(base.year, month, day)
+        return candidate if candidate >= base else date(base.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+# ---- Rules: (pattern, handler(match, today, base) -> (start, end, confidence) or None) ----
+def _r_iso(m, today, base):
+    try:
+        d = date.fromisoformat(m.group(0))
+    except ValueError:
+        return None
+    return d, d, HIGH
+
+
+def _r_day_month(m, today, base):
+    if m.group("m") == "may" and MODAL_SUBJECT.search(m.string[:m.start()]):
+        return None
+    d = _absolute(int(m.group("d")), _lookup(MONTHS, m.group("m")), m.group("y"), base)
+    return (d, d, HIGH) if d else None
+
+
+def _r_weekday_date(m, today, base):
+    """"Mon 5 Oct" is one date; the weekday only confirms it (low confidence if it does not)."""
+    result = _r_day_month(m, today, base)
+    if result is None:
+        return None
+    d = result[0]
+    return d, d, HIGH if d.weekday() == _lookup(WEEKDAYS, m.group("wd")) else LOW
+
+
+def _r_month_only(m, today, base):
+    month = _lookup(MONTHS, m.group("m"))
+    year = base.year if month >= base.month else base.year + 1
+    start, end = _month_bounds(year, month)
+    return max(start, today), end, MEDIUM
+
+
+def _r_offset(days: int, confidence: str = HIGH):
+    def handler(m, today, base):
+        d = today + timedelta(days=days)
+        return d, d, confidence
+    return handler
+
+
+def _r_weekend(m, today, base):
+    following = bool(re.fullmatch(NEXT, m.group("mod") or ""))
+    if today.weekday() == 6 and not m.group("mod"):
+        # a bare "weekend" asked on a Sunday is the coming one, not what is left of today
+        saturday = today + timedelta(days=6)
+        return saturday, saturday + timedelta(days=1), MEDIUM
+    start, end = _weekend(today, following)
+    # "next weekend" on a weekday is read as the coming one; some users mean the one after.
+    confidence = MEDIUM if following or not m.group("mod") else HIGH
+    return start, end, confidence
+
+
+def _r_long_weekend(m, today, base):
+    saturday, sunday = _weekend(today, False)
+    return saturday - timedelta(days=1), sunday, MEDIUM
+
+
+def _r_week(m, today, base):
+    monday = today - timedelta(days=today.weekday())
+    if re.fullmatch(NEXT, m.group("mod")):
+        return monday + timedelta(days=7), monday + timedelta(days=13), HIGH
+    return today, monday + timedelta(days=6), HIGH
+
+
+def _r_month(m, today, base):
+    if re.fullmatch(NEXT, m.group("mod")):
+        nxt = _add_months(today.replace(day=1), 1)
+        start, end = _month_bounds(nxt.year, nxt.month)
+        return start, end, HIGH
+    return today, _month_bounds(today.year, today.month)[1], HIGH
+
+
+def _r_in_n(m, today, base):
+    d = _unit_days(m.group("u"), _to_int(m.group("n")), today)
+    return d, d, HIGH
+
+
+def _r_weekday(m, today, base):
+    weekday = _lookup(WEEKDAYS, m.group("wd"))
+    d = _upcoming(base, weekday)
+    mod = m.group("mod") or ""
+    if re.fullmatch(NEXT, mod):
+        # "next Friday" = Friday of next week.
+        monday_next = today - timedelta(days=today.weekday()) + timedelta(days=7)
+        return monday_next + timedelta(days=weekday), monday_next + timedelta(days=weekday), MEDIUM
+    return d, d, HIGH
+
+
+_DAY_MONTH = rf"(?P<d>\d{{1,2}})(?:st|nd|rd|th)?\s+(?:of\s+)?(?P<m>{MONTH})\.?(?:,?\s+(?P<y>\d{{4}}))?"
+_MONTH_DAY = rf"(?P<m>{MONTH})\.?\s+(?P<d>\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(?P<y>\d{{4}}))?"
+_ON_WEEKDAY = rf"(?:(?:on|this|coming|next)\s+)?(?P<wd>{WEEKDAY})\.?,?\s+"
+
+RULES = [
+    (r"\d{4}-\d{2}-\d{2}", _r_iso),
+    (_ON_WEEKDAY + _DAY_MONTH, _r_weekday_date),
+    (_ON_WEEKDAY + _MONTH_DAY, _r_weekday_date),
+    (_DAY_MONTH + rf",?\s+\(?(?P<wd>{WEEKDAY})\)?", _r_weekday_date),
+    (_DAY_MONTH, _r_day_month),
+    (_MONTH_DAY, _r_day_month),
+    (r"day after tomorrow|parson|parso|परसों", _r_offset(2)),
+    (r"today|tonight|aaj|आज", _r_offset(0)),
+    (r"tomorrow|tmrw", _r_offset(1)),
+    (r"kal|कल", _r_offset(1, MEDIUM)),  # kal is also "yesterday"; trips are in the future
+    (rf"long\s+{WEEKEND}", _r_long_weekend),
+    (rf"(?:(?P<mod>{NEXT}|{THIS})\s+)?{WEEKEND}", _r_weekend),
+    (rf"(?P<mod>{NEXT}|{THIS})\s+{WEEK}", _r_week),
+    (rf"(?P<mod>{NEXT}|{THIS})\s+{MONTH_WORD}", _r_month),
+    (rf"(?:in|after|within)\s+(?P<n>{NUM})\s+(?P<u>{UNIT})", _r_in_n),
+    (rf"(?P<n>{NUM})\s+(?P<u>{UNIT})\s+{LATER}", _r_in_n),
+    (rf"(?:(?P<mod>{NEXT}|{THIS}|on|coming)\s+)?(?P<wd>{WEEKDAY})", _r_weekday),
+    (rf"(?:in|during)\s+(?P<m>{MONTH})", _r_month_only),
+    (rf"(?P<m>{MONTH})\s+(?:में|mein|me)", _r_month_only),
+]
+
+DURATION = [
+    rf"for\s+(?P<n>{NUM})\s+(?P<u>days?|nights?)",
+    rf"(?P<n>{NUM})\s*-?\s*(?P<u>days?|nights?|din|raat|दिन|रात)\s+(?:trip|getaway|vacation|holiday|ka|ki|ke|का|की|के)",
+    rf"(?P<n>{NUM})-(?P<u>day|night)",
+    rf"(?P<n>{NUM})\s+(?P<u>nights?|raat|रात)",
+]
+
+_COMPILED = [(re.compile(_L + pattern + _R, re.IGNORECASE), handler) for pattern, handler in RULES]
+_DURATION = [re.compile(_L + pattern + _R, re.IGNORECASE) for pattern in DURATION]
+
+
+def _duration(text: str) -> Tuple[Optional[int], Optional[Tuple[int, int]]]:
+    for pattern in _DURATION:
+        m = pattern.search(text)
+        if m:
+            n = _to_int(m.group("n").lower())
+            nights = m.group("u").lower().startswith(("night", "raat", "रात"))
+            return (n + 1 if nights else n), m.span()
+    return None, None
+
+
+def normalize_relative_dates(text: str, today: date) -> Dict[str, Any]:
+    """Resolve the date phrase(s) in `text` against `today`. Pure function, no I/O."""
+    text = re.sub(r"\s+", " ", str(text or "").translate(DEVANAGARI_DIGITS)).strip().lower()
+    trip_days, duration_span = _duration(text)
+
+    # Collect non-overlapping matches, earliest first (longer wins on ties).
+    found = []
+    for pattern, handler in _COMPILED:
+        for m in pattern.finditer(text):
+            if duration_span and m.start() < duration_span[1] and m.end() > duration_span[0]:
+                continue
+            found.append((m.start(), -(m.end() - m.start()), m, handler))
+    found.sort(key=lambda f: (f[0], f[1]))
+    anchors, last_end = [], -1
+    for start, _, m, handler in found:
+        if start >= last_end:
+            anchors.append((m, handler))
+            last_end = m.end()
+
+    resolved: List[Tuple[date, date, str, str]] = []
+    base = today
+    for m, handler in anchors:
+        result = handler(m, today, base)
+        if result is None:
+            continue
+        start, end, confidence = result
+        resolved.append((start, end, confidence, m.group(0)))
+        base = start  # a second weekday/date in "Friday to Monday" counts from the first
+        if len(resolved) == 2:
+            break
+
+    if not resolved:
+        return {
+            "status": "partial" if trip_days else "no_match",
+            "start_date": None, "end_date": None, "trip_days": trip_days,
+            "confidence": LOW if trip_days else None, "matched": [],
+            "needs_trip_length": False,
+        }
+
+    start, end = resolved[0][0], resolved[-1][1]
+    confidence = min((r[2] for r in resolved), key=_RANK.get)
+    if trip_days:
+        end = start + timedelta(days=trip_days - 1)
+    if end < start:
+        end, confidence = start, LOW
+    return {
+        "status": "ok",
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "trip_days": (end - start).days + 1,
+        "confidence": confidence,
+        "matched": [r[3] for r in resolved],
+        "needs_trip_length": len(resolved) == 1 and start == end and not trip_days,
+    }
+
+
+def _reference_date(state: Dict[str, Any]) -> Tuple[date, Optional[str]]:
+    profile = state.get("user_profile") or {}
+    tz_name = profile.get("timezone") if isinstance(profile, dict) else None
+    try:
+        tz = ZoneInfo(tz_name) if tz_name else None
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning("Unknown timezone '%s', using server time", tz_name)
+        tz = None
+    try:
+        now = datetime.fromisoformat(str(state.get("_time")))
+    except ValueError:
+        now = datetime.now()
+    # A naive _time is server-local; astimezone() converts it to the user's zone.
+    return (now.astimezone(tz) if tz else now).date(), tz_name
+
+
+# ---- Tool ----
+def resolve_dates(text: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """
+    Resolve relative or absolute travel dates in the user's message (English or Hindi)
+    to ISO dates, counted from the session time in the user's timezone.
+
+    Args:
+        text: The user's message or just its date phrase, e.g. "next weekend",
+              "this Friday for 3 days", "in 2 weeks", "agle hafte", "२ हफ्ते बाद".
+
+    Returns:
+        {"status": "ok"|"partial"|"no_match", "start_date", "end_date", "trip_days",
+         "confidence": "high"|"medium"|"low", "matched", "needs_trip_length",
+         "reference_date", "timezone", "note"}
+    """
+    if not str(text or "").strip():
+        return {"status": "error", "error": "text is required"}
+    today, tz_name = _reference_date(tool_context.state)
+    result = normalize_relative_dates(text, today)
+    result.update({"reference_date": today.isoformat(), "timezone": tz_name})
+    if result["status"] == "ok":
+        phrase = " ... ".join(result["matched"])
+        span = result["start_date"] if result["start_date"] == result["end_date"] \
+            else f"{result['start_date']} to {result['end_date']}"
+        result["note"] = f"Interpreting '{phrase}' as {span}"
+    return result
@@ -0,0 +1,140 @@
+# tripmate_agents/tools/fanout.py
+"""
+Concurrent feasibility fan-out across transport modes for the planning_agent.
+
+make_fanout_tool(...) builds compare_transport_modes, an async tool that queries the
+flight, train, bus and ship search tools at the same time under one shared deadline
+and merges whatever returned in time into a single comparison table. Cached search
+tools run on detached sessions (CachedAgentTool.run_detached), not on the turn's
+tool_context, so a search that misses the deadline keeps running in the background
+(held in _late until done) and its result lands in the shared search cache for the
+next call. Other tools are cancelled at the deadline: they would write into the
+tool_context of a turn that has already answered.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from .config import FANOUT_DEADLINE_SECONDS
+from .ranking import option_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _options(result: Any) -> List[Dict[str, Any]]:
+    """Pull the option list out of a search agent's JSON answer (list or {"<key>": [...]})."""
+    if isinstance(result, str):
+        try:
+            result = json.loads(result)
+        except ValueError:
+            return []
+    if isinstance(result, list):
+        return [o for o in result if isinstance(o, dict)]
+    if isinstance(result, dict):
+        for value in result.values():
+            if isinstance(value, list) and value and isinstance(value[0], dict):
+                return value
+    return []
+
+
+def _summarize(mode: str, options: List[Dict[str, Any]]) -> Dict[str, Any]:
+    metrics = [option_metrics(o) for o in options]
+    prices = [m["price"] for m in metrics if m["price"] is not None]
+    durations = [m for m in metrics if m["duration_minutes"] is not None]
+    cheapest = min((m for m in metrics if m["price"] is not None), key=lambda m: m["price"], default=None)
+    fastest = min(durations, key=lambda m: m["duration_minutes"], default=None)
+    currency = next(((o.get("price_total") or {}).get("currency") for o in options
+                     if isinstance(o.get("price_total"), dict)), None)
+    return {
+        "mode": mode,
+        "status": "ok" if options else "no_options",
+        "options": len(options),
+        "price_range": {"min": min(prices), "max": max(prices), "currency": currency} if prices else None,
+        "fastest_minutes": fastest["duration_minutes"] if fastest else None,
+        "cheapest": cheapest["label"] if cheapest else None,
+        "fastest": fastest["label"] if fastest else None,
+    }
+
+
+# Searches still running after the deadline; the loop only keeps weak references to tasks.
+_late: set = set()
+
+
+def _late_done(task: "asyncio.Future") -> None:
+    _late.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Late fan-out search failed: %s", task.exception())
+
+
+def make_fanout_tool(search_tools: Dict[str, Any], deadline: Optional[float] = None) -> Callable:
+    """
+    Build the compare_transport_modes tool over {mode: search tool} (AgentTool-like;
+    CachedAgentTool.run_detached when available, so hits are instant and late searches
+    can finish after the turn).
+    """
+    deadline = deadline or FANOUT_DEADLINE_SECONDS
+
+    async def compare_transport_modes(
+        origin: str,
+        destination: str,
+        departure_date: str,
+        tool_context: ToolContext,
+        return_date: Optional[str] = None,
+        adults: int = 1,
+        children: int = 0,
+        infants: int = 0,
+        budget: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Search every transport mode (flight, train, bus, ship) at once and return one
+        comparison table: per mode the number of options, price range, fastest duration,
+        cheapest and fastest option, plus the raw options for each mode that answered
+        before the shared deadline.
+        """
+        args = {
+            "origin": origin, "destination": destination, "departure_date": departure_date,
+            "return_date": return_date, "adults": adults, "children": children,
+            "infants": infants, "budget": budget,
+        }
+        args = {k: v for k, v in args.items() if v is not None}
+        started = time.perf_counter()
+        tasks, detached = {}, set()
+        for mode, tool in search_tools.items():
+            if hasattr(tool, "run_detached"):
+                task = asyncio.ensure_future(tool.run_detached(dict(args)))
+                detached.add(task)
+            else:
+                task = asyncio.ensure_future(tool.run_async(args=dict(args), tool_context=tool_context))
+            tasks[task] = mode
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            if task in detached:
+                _late.add(task)  # left running to warm the shared search cache
+                task.add_done_callback(_late_done)
+            else:
+                task.cancel()
+
+        table, options = [], {}
+        for task, mode in tasks.items():
+            if task in pending:
+                table.append({"mode": mode, "status": "timeout"})
+                continue
+            if task.exception() is not None:
+                logger.warning("%s search failed in fan-out: %s", mode, task.exception())
+                table.append({"mode": mode, "status": "error", "error": str(task.exception())})
+                continue
+            found = _options(task.result())
+            options[mode] = found
+            table.append(_summarize(mode, found))
+
+        elapsed = round(time.perf_counter() - started, 2)
+        logger.info("Fan-out over %d modes finished in %.2fs (%d timed out)", len(tasks), elapsed, len(pending))
+        return {"comparison": table, "options": options, "elapsed_seconds": elapsed,
+                "timed_out": [tasks[t] for t in pending]}
+
+    return compare_transport_modes
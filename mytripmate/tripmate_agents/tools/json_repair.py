@@ -0,0 +1,202 @@
+# tripmate_agents/tools/json_repair.py
+"""
+Local repair of almost-JSON model output, so a small syntax slip does not cost another
+model round trip.
+
+repair(text) re-tokenizes the text in one pass and fixes, in order of how often models
+get them wrong:
+  - code fences and prose around the JSON,
+  - trailing and doubled commas,
+  - unquoted keys and bare string values, single-quoted strings, raw newlines in strings,
+  - Python literals (True/False/None), numbers like +1, .5, 1. or 007, // comments,
+  - truncated output: unterminated strings, dangling keys/colons, unclosed brackets;
+    if closing is not enough, the incomplete last element is dropped.
+It returns (value, fixes) and raises ValueError when the text cannot be repaired.
+Type coercion against the schemas is left to pydantic (shared_libraries/types.py).
+"""
+
+import json
+import logging
+import re
+from typing import Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSERS = {"{": "}", "[": "]"}
+LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null"}
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.S)
+_WORD = re.compile(r"[A-Za-z_$][\w$\-]*")
+_BARE_VALUE = re.compile(r"[^,}\]\n]*")
+_NUMBER = re.compile(r"[-+]?(?:\d[\d_]*)?(?:\.\d*)?(?:[eE][-+]?\d+)?")
+_WS = " \t\r\n"
+
+
+# ---- Scanner ----
+def _strip(text: str) -> str:
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON object or array found")
+    return text[min(starts):]
+
+
+def _string(text: str, i: int, fixes: set) -> Tuple[str, int]:
+    quote, j, buf = text[i], i + 1, []
+    while j < len(text) and text[j] != quote:
+        ch = text[j]
+        if ch == "\\" and j + 1 < len(text):
+            escaped = text[j:j + 2]
+            buf.append("'" if escaped == "\\'" else escaped)
+            j += 2
+            continue
+        if ch in "\n\r\t":
+            buf.append({"\n": "\\n", "\r": "\\r", "\t": "\\t"}[ch])
+            fixes.add("control character in string")
+        elif ch == '"':  # only inside a single-quoted string
+            buf.append('\\"')
+        else:
+            buf.append(ch)
+        j += 1
+    if quote == "'":
+        fixes.add("single-quoted string")
+    if j >= len(text):
+        fixes.add("unterminated string")
+    return '"' + "".join(buf) + '"', j + 1
+
+
+def _number(token: str) -> str:
+    cleaned = token.lstrip("+").replace("_", "")
+    try:
+        if any(c in cleaned for c in ".eE"):
+            return json.dumps(float(cleaned))
+        return json.dumps(int(cleaned))
+    except ValueError:
+        return json.dumps(token)
+
+
+def _drop_comma(out: List[str], fixes: set) -> None:
+    if out and out[-1] == ",":
+        out.pop()
+        fixes.add("trailing comma")
+
+
+def _expects_key(out: List[str], stack: List[str]) -> bool:
+    return bool(stack) and stack[-1] == "{" and bool(out) and out[-1] in ("{", ",")
+
+
+def _scan(text: str, fixes: set) -> Tuple[List[str], List[str], List[Tuple[int, List[str]]]]:
+    """Tokens of the normalized text, the brackets still open, and (token index, open brackets) at each comma."""
+    out: List[str] = []
+    stack: List[str] = []
+    cuts: List[Tuple[int, List[str]]] = []
+    i, n = 0, len(text)
+    while i < n:
+        c = text[i]
+        if c in _WS:
+            i += 1
+        elif c in "\"'":
+            token, i = _string(text, i, fixes)
+            out.append(token)
+        elif c in "{[":
+            stack.append(c)
+            out.append(c)
+            i += 1
+        elif c in "}]":
+            _drop_comma(out, fixes)
+            if stack and CLOSERS[stack[-1]] == c:
+                out.append(CLOSERS[stack.pop()])
+            elif stack:
+                out.append(CLOSERS[stack.pop()])
+                fixes.add("mismatched bracket")
+            else:
+                fixes.add("extra bracket")
+            i += 1
+            if not stack:
+                if text[i:].strip():
+                    fixes.add("trailing text")
+                break
+        elif c == ",":
+            if out and out[-1] in (",", "[", "{"):
+                fixes.add("extra comma")
+            else:
+                cuts.append((len(out), list(stack)))
+                out.append(",")
+            i += 1
+        elif c == ":":
+            out.append(":")
+            i += 1
+        elif c == "/" and text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+            fixes.add("comment")
+        elif c.isalpha() or c in "_$":
+            word = _WORD.match(text, i).group()
+            if _expects_key(out, stack):
+                out.append(json.dumps(word))
+                i += len(word)
+                fixes.add("unquoted key")
+            elif word in LITERALS:
+                out.append(LITERALS[word])
+                i += len(word)
+                if word != LITERALS[word]:
+                    fixes.add("Python literal")
+            else:
+                value = _BARE_VALUE.match(text, i).group()
+                out.append(json.dumps(value.strip()))
+                i += len(value)
+                fixes.add("unquoted string")
+        elif c in "-+.0123456789":
+            token = _NUMBER.match(text, i).group() or c
+            normalized = _number(token)
+            if normalized != token:
+                fixes.add("number format")
+            out.append(normalized)
+            i += len(token)
+        else:
+            fixes.add("stray character")
+            i += 1
+    return out, stack, cuts
+
+
+def _close(out: List[str], stack: List[str]) -> str:
+    out = list(out)
+    while out and out[-1] == ",":
+        out.pop()
+    if out and out[-1] == ":":
+        out.append("null")
+    elif len(out) >= 2 and stack and stack[-1] == "{" and out[-1].startswith('"') and out[-2] in ("{", ","):
+        out.extend([":", "null"])  # a key whose value was cut off
+    return "".join(out) + "".join(CLOSERS[b] for b in reversed(stack))
+
+
+# ---- Public API ----
+def repair(text: str) -> Tuple[Any, List[str]]:
+    """(parsed value, fixes applied) for almost-JSON text; raises ValueError if unrepairable."""
+    if not isinstance(text, str):
+        raise ValueError("not text")
+    try:
+        return json.loads(text), []
+    except ValueError:
+        pass
+    fixes: set = set()
+    stripped = _strip(text)
+    if stripped.strip() != text.strip():
+        fixes.add("text around JSON")
+    out, stack, cuts = _scan(stripped, fixes)
+    if stack:
+        fixes.add("unclosed brackets")
+    try:
+        return json.loads(_close(out, stack)), sorted(fixes)
+    except ValueError as e:
+        error = e
+    for index, open_brackets in reversed(cuts[-20:]):
+        try:
+            value = json.loads(_close(out[:index], open_brackets))
+        except ValueError:
+            continue
+        fixes.add("dropped truncated element")
+        return value, sorted(fixes)
+    raise ValueError(f"unrepairable JSON: {error}")
@@ -8,17 +8,24 @@ from google.adk.agents.callback_context import CallbackContext
 from google.adk.sessions.state import State
 from google.adk.tools import ToolContext
 
+from . import blobs, json_repair
+
 # from travel_concierge.shared_libraries import constants
 
 user_profile_path = os.getenv(
     "user_profile_path", "tripmate_agents/profiles/user_0001.json"
 )
+# Where save_to_file appends each user's itinerary history
+itinerary_dir = os.getenv("itinerary_dir", "tripmate_agents/itinerary")
 
 SYSTEM_TIME = "_time"
 ITIN_INITIALIZED = "_itin_initialized"
 
 USER_ID = "user_id"
 
+# State keys the agent prompts template in ({user_profile}); never stored out of line.
+PROMPT_STATE_KEYS = ("user_profile",)
+
 
 import json
 from typing import Any
@@ -32,7 +39,12 @@ def _safe_parse_json_str(maybe_json: Any) -> Any:
             try:
                 return json.loads(s)
             except Exception:
-                return maybe_json  # leave as-is if it fails
+                pass
+            try:
+                value, _ = json_repair.repair(s)
+            except ValueError:
+                return maybe_json  # leave as-is if it cannot be repaired
+            return value if isinstance(value, (dict, list)) else maybe_json
     return maybe_json
 
 def _next_itin_id(existing: List[Dict[str, Any]]) -> str:
@@ -51,13 +63,14 @@ def _next_itin_id(existing: List[Dict[str, Any]]) -> str:
                     pass
     return f"itin_{(max_num + 1):04d}"
 
-def save_to_file(callback_context: "CallbackContext") -> dict:
+async def save_to_file(callback_context: "CallbackContext") -> dict:
     """
     Append the current itinerary/trip plan snapshot to a per-user JSON file.
     - File content is ALWAYS a JSON array.
     - Each element has: _time, _itin_initialized, iten_id, itinerary, trip_plan, user_id
     - 'user_profile' is NOT saved.
-    - itinerary/trip_plan are stored as parsed JSON objects when possible (pretty, unescaped).
+    - itinerary/trip_plan are stored as parsed JSON objects when possible (pretty, unescaped),
+      loaded from their artifacts when state only holds a reference (tools/blobs.py).
     """
     state = callback_context.state
 
@@ -70,7 +83,7 @@ def save_to_file(callback_context: "CallbackContext") -> dict:
         return {"status": "error", "error": "missing user_id; cannot determine filename"}
 
     # Prepare output directory and file path
-    out_dir = "tripmate_agents/itinerary"
+    out_dir = itinerary_dir
     os.makedirs(out_dir, exist_ok=True)
     file_path = os.path.join(out_dir, f"{user_id}.json")
 
@@ -92,8 +105,8 @@ def save_to_file(callback_context: "CallbackContext") -> dict:
             existing = []
 
     # Build the new record
-    itinerary_raw = state.get("itinerary")
-    trip_plan_raw = state.get("trip_plan")
+    itinerary_raw = await blobs.get(callback_context, "itinerary")
+    trip_plan_raw = await blobs.get(callback_context, "trip_plan")
 
     record = {
         "_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
@@ -114,13 +127,15 @@ def save_to_file(callback_context: "CallbackContext") -> dict:
 
     return None
 
-def save_to_state(key: str, value: str, tool_context: ToolContext):
+async def save_to_state(key: str, value: str, tool_context: ToolContext):
     """
     Save information pieces into state, one key-value pair at a time.
+    Large values (e.g. the itinerary JSON) are kept as an artifact with a reference in state.
     """
-    mem_dict = tool_context.state
-    mem_dict[key] = value
-    return {"status": f'Stored "{key}": "{value}"'}
+    stored = await blobs.put(tool_context, key, value)
+    if stored["inline"]:
+        return {"status": f'Stored "{key}": "{value}"'}
+    return {"status": f'Stored "{key}" ({stored["chars"]} chars)'}
 
 
 
@@ -140,11 +155,12 @@ def _set_user_states(source: Dict[str, Any], target: State | dict[str, Any]):
 
         target.update(source)
 
-def load_user(callback_context: CallbackContext):
+async def load_user(callback_context: CallbackContext):
     """
     Sets up the initial state.
     Set this as a callback as before_agent_call of the root_agent.
     This gets called before the system instruction is contructed.
+    Keys templated into prompts stay inline; other large keys go out of line (tools/blobs.py).
 
     Args:
         callback_context: The callback context.
@@ -154,4 +170,10 @@ def load_user(callback_context: CallbackContext):
         data = json.load(file)
         print(f"\nLoading Initial State: {data}\n")
 
-    _set_user_states(data, callback_context.state)
\ No newline at end of file
+    state = callback_context.state
+    first_load = ITIN_INITIALIZED not in state
+    _set_user_states({k: v for k, v in data.items() if k in PROMPT_STATE_KEYS}, state)
+    if first_load:
+        for key, value in data.items():
+            if key not in PROMPT_STATE_KEYS:
+                await blobs.put(callback_context, key, value)
\ No newline at end of file
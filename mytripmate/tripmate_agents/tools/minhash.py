@@ -0,0 +1,139 @@
+# tripmate_agents/tools/minhash.py
+"""
+Embedding-free near-duplicate matching for short search questions.
+
+- tokenize(...) turns a question into a normalized token set (lowercase, no
+  punctuation or stopwords), so filler words don't matter; words(...) is the same in
+  order, keeping direction words ("from X to Y" != "from Y to X").
+- place_tokens(...) picks the words that name places: the word after a direction or
+  location word ("to:mysuru", "near:fort") and capitalized words past the first.
+- MinHashIndex keeps a MinHash signature per stored key with LSH banding, and
+  finds a previously seen key whose estimated Jaccard similarity passes the
+  threshold. Numbers (dates, years, counts) and the exact tokens passed with the key
+  (place tokens) must match exactly.
+"""
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import FrozenSet, List, Optional, Tuple
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+# Fixed coefficients keep signatures identical across processes and restarts.
+_COEFFS = [((i * 0x9E3779B97F4A7C15 + 1) % _PRIME, (i * 0xC2B2AE3D27D4EB4F + 7) % _PRIME) for i in range(1, NUM_PERM + 1)]
+
+STOPWORDS = frozenset(
+    "a an the of to in on at for from and or is are was be by with what whats which how when where who "
+    "me my i we our you your it its this that these those please tell give show find about near best top "
+    "there any some do does can could should would will vs versus".split()
+)
+
+
+# Words that give a place its role in the question; kept in word-order keys.
+DIRECTION_WORDS = frozenset("to from via towards between".split())
+PLACE_MARKERS = DIRECTION_WORDS | frozenset("in at near around".split())
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    words = re.findall(r"[a-z0-9]+", str(text or "").lower())
+    return frozenset(w for w in words if w not in STOPWORDS)
+
+
+def words(text: str) -> List[str]:
+    """The question's words in order, without stopwords other than direction words."""
+    return [w for w in re.findall(r"[a-z0-9]+", str(text or "").lower())
+            if w not in STOPWORDS or w in DIRECTION_WORDS]
+
+
+def place_tokens(text: str) -> FrozenSet[str]:
+    raw = re.findall(r"[A-Za-z0-9]+", str(text or ""))
+    out = set()
+    for i, word in enumerate(raw):
+        lower = word.lower()
+        if lower in STOPWORDS:
+            continue
+        previous = raw[i - 1].lower() if i else ""
+        if previous in PLACE_MARKERS:
+            out.add(f"{previous}:{lower}")
+        elif i and word[0].isupper():
+            out.add(lower)
+    return frozenset(out)
+
+
+def _numbers(tokens: FrozenSet[str]) -> FrozenSet[str]:
+    return frozenset(t for t in tokens if any(c.isdigit() for c in t))
+
+
+def signature(tokens: FrozenSet[str]) -> Tuple[int, ...]:
+    hashes = [zlib.crc32(t.encode("utf-8")) for t in tokens] or [0]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _COEFFS)
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+class MinHashIndex:
+    """LSH index from MinHash signatures to cache keys (bounded, thread-safe)."""
+
+    def __init__(self, threshold: float = 0.8, max_entries: int = 4096):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, ...], FrozenSet[str]]]" = OrderedDict()
+        self._buckets: List[dict] = [{} for _ in range(BANDS)]
+        self._lock = threading.Lock()
+
+    def _bands(self, sig: Tuple[int, ...]):
+        for b in range(BANDS):
+            yield b, sig[b * ROWS:(b + 1) * ROWS]
+
+    def add(self, key: str, tokens: FrozenSet[str], exact: FrozenSet[str] = frozenset()) -> None:
+        sig = signature(tokens)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = (sig, _numbers(tokens) | exact)
+            for b, band in self._bands(sig):
+                self._buckets[b].setdefault(band, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old, (old_sig, _) = self._entries.popitem(last=False)
+                self._unlink(old, old_sig)
+
+    def _unlink(self, key: str, sig: Tuple[int, ...]) -> None:
+        for b, band in self._bands(sig):
+            bucket = self._buckets[b].get(band)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[b][band]
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._unlink(key, entry[0])
+
+    def query(self, tokens: FrozenSet[str], exact: FrozenSet[str] = frozenset()) -> Optional[Tuple[str, float]]:
+        """Best stored key with similarity >= threshold (and identical numbers and exact tokens), if any."""
+        if not tokens:
+            return None
+        sig = signature(tokens)
+        numbers = _numbers(tokens) | exact
+        with self._lock:
+            candidates = set()
+            for b, band in self._bands(sig):
+                candidates |= self._buckets[b].get(band, set())
+            best = None
+            for key in candidates:
+                other_sig, other_numbers = self._entries[key]
+                if other_numbers != numbers:
+                    continue
+                score = similarity(sig, other_sig)
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (key, score)
+        return best
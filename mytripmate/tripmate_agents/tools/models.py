@@ -0,0 +1,254 @@
+# tripmate_agents/tools/models.py
+"""
+Per-agent model selection with fallback.
+
+- AGENT_TIERS maps each agent name to a tier ("orchestrator", "search", "fast") and
+  tier_models() maps tiers to model names (MODEL, MODEL_SEARCH, MODEL_FAST).
+  AGENT_MODELS="planning_agent=gemini-2.5-pro,..." overrides single agents.
+- model_for(agent_name) is what every agent passes as `model=`. It returns a
+  FallbackLlm that moves the turn to the next model of a latency-ordered chain when a
+  call fails or the first response misses MODEL_TIMEOUT_SECONDS, or a plain model
+  name when no fallback is configured (MODEL_FALLBACKS=none).
+- TRAFFIC_MODE=record|replay wraps every agent's model in replay.RecordReplayLlm.
+- StubLlm ("stub", "stub-*") answers locally without any API call, for tests and
+  offline runs; MODEL_STUB=true routes every agent to it. MODEL_STUB_SCRIPT queues the
+  model replies of scenario files (benchmarks/scenarios/*.json) at import, for a stubbed
+  server driven from outside the process.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+from collections import deque
+from typing import Any, AsyncGenerator, ClassVar, Dict, List, Optional, Union
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from pydantic import PrivateAttr
+
+from .config import (
+    AGENT_MODELS, MODEL, MODEL_FALLBACKS, MODEL_FAST, MODEL_SEARCH, MODEL_STUB, MODEL_STUB_SCRIPT, MODEL_TIMEOUT_SECONDS,
+    TRAFFIC_MODE,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+STUB_MODEL = "stub"
+
+# Fastest first; used to order fallback chains. Unknown models sort last.
+LATENCY_ORDER = (
+    "gemini-2.5-flash-lite",
+    "gemini-2.0-flash-lite",
+    "gemini-2.0-flash",
+    "gemini-2.5-flash",
+    "gemini-2.5-pro",
+)
+
+AGENT_TIERS = {
+    # Orchestrators: multi-turn dialogue, routing, long prompts.
+    "my_trip_mate_agent": "orchestrator",
+    "travel_brainstormer": "orchestrator",
+    "itinerary_planner": "orchestrator",
+    "planning_agent": "orchestrator",
+    "booking_orchestrator": "orchestrator",
+    # Search agents: grounded lookups returning JSON lists.
+    "google_search_agent": "search",
+    "flight_search_agent": "search",
+    "train_search_agent": "search",
+    "bus_search_agent": "search",
+    "ship_search_agent": "search",
+    "hotel_search_agent": "search",
+    # Cheap structured agents.
+    "hotel_room_selection_agent": "fast",
+    "weather_agent": "fast",
+}
+
+
+# ---- Resolution ----
+def _parse_overrides(spec: Optional[str]) -> Dict[str, str]:
+    overrides = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            agent, model = part.split("=", 1)
+            if agent.strip() and model.strip():
+                overrides[agent.strip()] = model.strip()
+    return overrides
+
+
+def tier_models() -> Dict[str, str]:
+    orchestrator = MODEL or DEFAULT_MODEL
+    return {
+        "orchestrator": orchestrator,
+        "search": MODEL_SEARCH or orchestrator,
+        "fast": MODEL_FAST or "gemini-2.5-flash-lite",
+    }
+
+
+def model_name_for(agent_name: str) -> str:
+    """Model name for an agent: stub switch, then per-agent override, then its tier."""
+    if MODEL_STUB:
+        return STUB_MODEL
+    override = _parse_overrides(AGENT_MODELS).get(agent_name)
+    if override:
+        return override
+    return tier_models()[AGENT_TIERS.get(agent_name, "orchestrator")]
+
+
+def _latency_rank(model: str) -> int:
+    return LATENCY_ORDER.index(model) if model in LATENCY_ORDER else len(LATENCY_ORDER)
+
+
+def fallback_chain(primary: str) -> List[str]:
+    """Models to try after `primary`, fastest first."""
+    if (MODEL_FALLBACKS or "").strip().lower() == "none" or primary.startswith(STUB_MODEL):
+        return []
+    if MODEL_FALLBACKS:
+        candidates = [m.strip() for m in MODEL_FALLBACKS.split(",") if m.strip()]
+    else:
+        candidates = sorted(set(tier_models().values()), key=_latency_rank)
+    return [m for m in dict.fromkeys(candidates) if m != primary]
+
+
+# ---- Models ----
+class FallbackLlm(BaseLlm):
+    """Tries `model`, then each of `fallbacks`, on error or first-response timeout."""
+
+    fallbacks: List[str] = []
+    timeout: float = MODEL_TIMEOUT_SECONDS
+    _llms: Dict[str, BaseLlm] = PrivateAttr(default_factory=dict)
+
+    def resolve(self, name: str) -> BaseLlm:
+        if name not in self._llms:
+            self._llms[name] = LLMRegistry.new_llm(name)
+        return self._llms[name]
+
+    @property
+    def capabilities(self):
+        return self.resolve(self.model).capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        chain = [self.model, *self.fallbacks]
+        for position, name in enumerate(chain):
+            last = position == len(chain) - 1
+            request = llm_request if name == llm_request.model else llm_request.model_copy(update={"model": name})
+            responses = self.resolve(name).generate_content_async(request, stream=stream)
+            try:
+                # Only the first response is timed: once output has started we cannot switch models.
+                first = await asyncio.wait_for(responses.__anext__(), timeout=None if last else self.timeout)
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                if last:
+                    raise
+                reason = "timed out" if isinstance(e, asyncio.TimeoutError) else f"failed: {e}"
+                logger.warning("Model %s %s; falling back to %s", name, reason, chain[position + 1])
+                with contextlib.suppress(Exception):
+                    await responses.aclose()
+                continue
+            yield first
+            async for response in responses:
+                yield response
+            return
+
+    def connect(self, llm_request: LlmRequest):
+        return self.resolve(self.model).connect(llm_request)
+
+
+class StubLlm(BaseLlm):
+    """
+    Local stand-in model. Replies with queued entries (StubLlm.queue(...)) in order, then
+    echoes the last user message (counted in StubLlm.misses). Every request is kept in
+    StubLlm.requests.
+
+    A queued entry is a text, {"text": ...}, a tool call {"call": name, "args": {...}},
+    {"parts": [entry, ...]} for several parts in one response, or a types.Content.
+    """
+
+    model: str = STUB_MODEL
+
+    replies: ClassVar["deque[Any]"] = deque()
+    requests: ClassVar[List[LlmRequest]] = []
+    misses: ClassVar[int] = 0
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r"stub.*"]
+
+    @classmethod
+    def queue(cls, *replies: Any) -> None:
+        cls.replies.extend(replies)
+
+    @classmethod
+    def reset(cls) -> None:
+        cls.replies.clear()
+        cls.requests.clear()
+        cls.misses = 0
+
+    @staticmethod
+    def _parts(entry: Any) -> List[types.Part]:
+        if isinstance(entry, str):
+            return [types.Part(text=entry)]
+        if isinstance(entry, dict) and "parts" in entry:
+            return [part for item in entry["parts"] for part in StubLlm._parts(item)]
+        if isinstance(entry, dict) and "call" in entry:
+            return [types.Part(function_call=types.FunctionCall(name=entry["call"], args=entry.get("args") or {}))]
+        if isinstance(entry, dict) and "text" in entry:
+            return [types.Part(text=entry["text"])]
+        raise ValueError(f"Unsupported stub reply: {entry!r}")
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        StubLlm.requests.append(llm_request)
+        if StubLlm.replies:
+            entry = StubLlm.replies.popleft()
+            content = entry if isinstance(entry, types.Content) else types.Content(role="model", parts=self._parts(entry))
+        else:
+            StubLlm.misses += 1
+            last = next((c for c in reversed(llm_request.contents or []) if c.role == "user"), None)
+            said = " ".join(p.text for p in (last.parts or []) if p.text) if last else ""
+            content = types.Content(role="model", parts=[types.Part(text=f"[stub:{self.model}] {said}".strip())])
+        yield LlmResponse(content=content, partial=False, turn_complete=True)
+
+
+LLMRegistry.register(StubLlm)
+
+
+def queue_stub_script(paths: str) -> int:
+    """Queue the model replies of comma-separated scenario files, turn by turn; returns the count."""
+    queued = 0
+    for path in filter(None, (p.strip() for p in paths.split(","))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                scenario = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load stub script %s: %s", path, e)
+            continue
+        for turn in scenario.get("turns", []):
+            StubLlm.queue(*turn.get("model", []))
+            queued += len(turn.get("model", []))
+    return queued
+
+
+if MODEL_STUB_SCRIPT:
+    queue_stub_script(MODEL_STUB_SCRIPT)
+
+
+# ---- Public ----
+def model_for(agent_name: str) -> Union[str, BaseLlm]:
+    """The `model=` value for an agent (see module docstring)."""
+    primary = model_name_for(agent_name)
+    fallbacks = fallback_chain(primary)
+    model = FallbackLlm(model=primary, fallbacks=fallbacks, timeout=MODEL_TIMEOUT_SECONDS) if fallbacks else primary
+    if TRAFFIC_MODE in ("record", "replay"):
+        from .replay import RecordReplayLlm
+
+        return RecordReplayLlm(model=primary, inner=model)
+    return model
@@ -8,6 +8,8 @@ Provides:
   - For each POI, queries Google Places FindPlaceFromText with "place_name, address"
   - Fills place_id, map_url, lat, lng (as strings) on each POI when available.
   - Returns {"places": updated_list}
+- lookup_place(query) for single lookups (e.g. enriching a streamed itinerary day).
+Successful lookups are cached per process for PLACES_CACHE_TTL seconds.
 """
 
 import os
@@ -16,7 +18,9 @@ from typing import Dict, Any, List
 
 import requests
 from google.adk.tools.tool_context import ToolContext  # matches the import style used elsewhere
-from .config import GOOGLE_PLACES_API_KEY
+from .cache import MemoryBackend, TTLCache
+from .config import GOOGLE_PLACES_API_KEY, PLACES_CACHE_TTL
+from .replay import ReplayMiss, normalize_text, tape
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -24,9 +28,27 @@ logger.setLevel(logging.INFO)
 PLACES_FIND_URL = "https://maps.googleapis.com/maps/api/place/findplacefromtext/json"
 GOOGLE_PHOTO_BASE = "https://maps.googleapis.com/maps/api/place/photo"
 
+place_cache = TTLCache(backend=MemoryBackend(max_entries=4096), default_ttl=PLACES_CACHE_TTL)
+
 
 def _find_place(query: str, api_key: str, timeout: int = 5) -> Dict[str, Any]:
     """Call Find Place From Text and return the first candidate dict or an error dict."""
+    key = normalize_text(query).lower()
+    cached, _ = place_cache.lookup("place", key)
+    if cached is not None:
+        return cached
+    # Recorded / served from the traffic fixture when TRAFFIC_MODE is record / replay.
+    try:
+        result = tape.exchange("places", key, lambda: _find_place_live(query, api_key, timeout))
+    except ReplayMiss as e:
+        logger.warning("Places replay miss for query=%s", query)
+        return {"error": str(e)}
+    if "error" not in result:
+        place_cache.store("place", key, result)
+    return result
+
+
+def _find_place_live(query: str, api_key: str, timeout: int = 5) -> Dict[str, Any]:
     params = {
         "input": query,
         "inputtype": "textquery",
@@ -53,6 +75,23 @@ def _build_map_url(place_id: str) -> str:
     return f"https://www.google.com/maps/place/?q=place_id:{place_id}"
 
 
+def lookup_place(query: str) -> Dict[str, Any]:
+    """{"place_id", "map_url", "lat", "lng", "address"} for a text query; {} if not found or no API key."""
+    if not GOOGLE_PLACES_API_KEY or not query.strip():
+        return {}
+    result = _find_place(query, GOOGLE_PLACES_API_KEY)
+    if "error" in result or not result.get("place_id"):
+        return {}
+    location = (result.get("geometry") or {}).get("location") or {}
+    return {
+        "place_id": result["place_id"],
+        "map_url": _build_map_url(result["place_id"]),
+        "lat": str(location["lat"]) if location.get("lat") is not None else None,
+        "lng": str(location["lng"]) if location.get("lng") is not None else None,
+        "address": result.get("formatted_address"),
+    }
+
+
 def map_tool(key: str, tool_context: ToolContext) -> Dict[str, List[Dict[str, Any]]]:
     """
     Tool to enrich POIs stored under tool_context.state[key]["places"] with verified place
@@ -0,0 +1,340 @@
+# tripmate_agents/tools/ranking.py
+"""
+Local ranking of transport options returned by the mode-specific search agents.
+
+rank_transport_options(...) takes the option lists from flight/train/bus/ship search,
+applies trip_plan.constraints (timing, comfort, baggage, refundability) and an optional
+price cap as hard filters, then computes Pareto fronts over
+  price, duration, stops and departure-time fit
+with vectorized NumPy scoring. The planning agent only presents the short,
+pre-ranked list it gets back.
+"""
+
+import json
+import logging
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from google.adk.tools import ToolContext
+
+from . import blobs
+from .currency import convert, normalize_currency
+
+logger = logging.getLogger(__name__)
+
+# Objective columns (all minimized) and their default weights for ordering inside a front.
+OBJECTIVES = ("price", "duration_minutes", "stops", "departure_fit")
+DEFAULT_WEIGHTS = np.array([0.4, 0.3, 0.15, 0.15])
+
+# Named departure windows as (start_hour, end_hour); end may wrap past midnight.
+TIME_WINDOWS = {
+    "early morning": (4, 8),
+    "morning": (5, 12),
+    "afternoon": (12, 17),
+    "evening": (17, 21),
+    "night": (21, 29),
+    "overnight": (20, 30),
+}
+RED_EYE = (0, 5)
+
+NAME_FIELDS = ("airline_name", "train_name", "operator_name", "vessel_name")
+
+
+# ---- Parsing helpers ----
+def _label(option: Dict[str, Any]) -> str:
+    name = next((option.get(f) for f in NAME_FIELDS if option.get(f)), "option")
+    number = option.get("flight_number") or option.get("train_number") or ""
+    return f"{name} {number}".strip()
+
+
+def _price(option: Dict[str, Any], currency: Optional[str] = None) -> float:
+    """Option price, converted to `currency` when the option is priced in another one."""
+    price = option.get("price_total") or option.get("price") or {}
+    amount = price.get("amount") if isinstance(price, dict) else price
+    source = price.get("currency") if isinstance(price, dict) else None
+    if currency and source and normalize_currency(source) != currency:
+        amount = convert(amount, source, currency)
+    try:
+        return float(amount)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _duration_minutes(value: Any) -> float:
+    """Parse '2h 15m', '2h15m', 'PT2H15M', '02:15', '135 min', '1 day 3 hrs' into minutes."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value or "").strip().lower()
+    if not text:
+        return np.nan
+    m = re.fullmatch(r"(\d{1,2}):(\d{2})", text)
+    if m:
+        return int(m.group(1)) * 60 + int(m.group(2))
+    m = re.fullmatch(r"p(?:(\d+(?:\.\d+)?)d)?(?:t(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m)?(?:\d+(?:\.\d+)?s)?)?", text)
+    if m and any(m.groups()):  # ISO-8601 duration, e.g. PT2H15M or P1DT3H
+        days, hours, minutes = (float(g or 0) for g in m.groups())
+        return days * 1440 + hours * 60 + minutes
+    total = 0.0
+    found = False
+    # (?![a-z]) instead of \b so that "2h15m" reads as 2h + 15m, not just 15m
+    for number, unit in re.findall(r"(\d+(?:\.\d+)?)\s*(days|day|d|hours|hour|hrs|hr|h|minutes|mins|min|m)(?![a-z])", text):
+        found = True
+        n = float(number)
+        total += n * 1440 if unit.startswith("d") else n * 60 if unit.startswith("h") else n
+    return total if found else np.nan
+
+
+def _departure_hour(value: Any) -> float:
+    """Parse '06:30', '6:30 PM', '2025-10-01T18:05' into a fractional hour."""
+    text = str(value or "").strip().lower()
+    m = re.search(r"(\d{1,2}):(\d{2})\s*(am|pm)?", text)
+    if not m:
+        return np.nan
+    hour = int(m.group(1)) % 24
+    if m.group(3) == "pm" and hour < 12:
+        hour += 12
+    if m.group(3) == "am" and hour == 12:
+        hour = 0
+    return hour + int(m.group(2)) / 60
+
+
+def _stops(option: Dict[str, Any]) -> float:
+    stops = option.get("number_of_stops", option.get("stops"))
+    if stops is None:
+        return 0.0  # trains/buses/ferries are quoted as direct services
+    if isinstance(stops, str):
+        if "non" in stops.lower() or "direct" in stops.lower():
+            return 0.0
+        m = re.search(r"\d+", stops)
+        return float(m.group()) if m else np.nan
+    return float(stops)
+
+
+def _parse_hour(text: str) -> Optional[float]:
+    m = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?", text.strip())
+    if not m:
+        return None
+    hour = int(m.group(1)) % 24
+    if m.group(3) == "pm" and hour < 12:
+        hour += 12
+    if m.group(3) == "am" and hour == 12:
+        hour = 0
+    return hour + int(m.group(2) or 0) / 60
+
+
+def _timing_window(timing: str) -> Optional[Tuple[float, float]]:
+    """Turn a free-text timing constraint into a departure window in hours."""
+    text = timing.lower()
+    m = re.search(r"between\s+([\d:]+\s*(?:am|pm)?)\s+(?:and|-|to)\s+([\d:]+\s*(?:am|pm)?)", text)
+    if m:
+        start, end = _parse_hour(m.group(1)), _parse_hour(m.group(2))
+        if start is not None and end is not None:
+            return start, end if end > start else end + 24
+    m = re.search(r"(before|by|after|from)\s+([\d:]+\s*(?:am|pm)?)", text)
+    if m:
+        hour = _parse_hour(m.group(2))
+        if hour is not None:
+            return (0, hour) if m.group(1) in ("before", "by") else (hour, 24)
+    for name in sorted(TIME_WINDOWS, key=len, reverse=True):
+        if name in text:
+            return TIME_WINDOWS[name]
+    return None
+
+
+def _window_distance(hours: np.ndarray, window: Optional[Tuple[float, float]]) -> np.ndarray:
+    """Hours between each departure and the preferred window (0 inside it)."""
+    if window is None:
+        start, end = RED_EYE
+        return np.where((hours >= start) & (hours < end), 0.5, 0.0)
+    start, end = window
+    shifted = np.where(hours < start, hours + 24, hours) if end > 24 else hours
+    before = np.clip(start - shifted, 0, None)
+    after = np.clip(shifted - end, 0, None)
+    return before + after
+
+
+def _constraint_text(constraints: Dict[str, Any]) -> str:
+    return " ".join(str(v) for v in constraints.values() if v).lower()
+
+
+def option_metrics(option: Dict[str, Any]) -> Dict[str, Any]:
+    """Comparable numbers for one option: label, price, duration_minutes, stops, departure_hour."""
+    values = {
+        "price": _price(option),
+        "duration_minutes": _duration_minutes(option.get("duration")),
+        "stops": _stops(option),
+        "departure_hour": _departure_hour(option.get("departure_time_local") or option.get("departure_datetime")),
+    }
+    return {"label": _label(option), **{k: None if np.isnan(v) else float(v) for k, v in values.items()}}
+
+
+def _hard_filter(option: Dict[str, Any], text: str, max_price: Optional[float],
+                 max_minutes: Optional[float], window: Optional[Tuple[float, float]],
+                 price: float, minutes: float, stops: float, hour: float) -> Optional[str]:
+    """Return the reason an option breaks a hard constraint, or None."""
+    if max_price is not None and not np.isnan(price) and price > max_price:
+        return f"price {price:.0f} above cap {max_price:.0f}"
+    if max_minutes is not None and not np.isnan(minutes) and minutes > max_minutes:
+        return "longer than allowed duration"
+    if re.search(r"non[- ]?stop|direct", text) and stops > 0:
+        return "not non-stop"
+    if "refundable" in text and "non-refundable" not in text and str(option.get("refundable", "")).lower() != "yes":
+        return "not refundable"
+    if window is not None and not np.isnan(hour) and _window_distance(np.array([hour]), window)[0] > 0:
+        return "departure outside preferred time"
+    bus_type = str(option.get("bus_type") or "").lower()
+    if bus_type:
+        if re.search(r"\bnon[- ]?ac\b", bus_type) and re.search(r"(?<!non[- ])\bac\b", text):
+            return "not AC"
+        if "sleeper" in text and "sleeper" not in bus_type:
+            return "not a sleeper"
+    classes = [str(c).upper() for c in option.get("class_availability") or []]
+    wanted = [c for c in ("1A", "2A", "3A", "SL", "CC") if re.search(rf"\b{c.lower()}\b", text)]
+    if classes and wanted and not set(wanted) & set(classes):
+        return f"class {'/'.join(wanted)} not available"
+    m = re.search(r"(\d+)\s*kg", text)
+    if m:
+        allowance = str(option.get("baggage_allowance") or "")
+        kgs = [int(k) for k in re.findall(r"(\d+)\s*kg", allowance.lower())]
+        if kgs and max(kgs) < int(m.group(1)):
+            return "baggage allowance too small"
+    return None
+
+
+# ---- Pareto machinery ----
+def pareto_ranks(matrix: np.ndarray) -> np.ndarray:
+    """Non-dominated sorting: front index per row (0 = Pareto front), all columns minimized."""
+    n = matrix.shape[0]
+    le = (matrix[None, :, :] <= matrix[:, None, :]).all(axis=2)
+    lt = (matrix[None, :, :] < matrix[:, None, :]).any(axis=2)
+    dominated_by = le & lt  # dominated_by[i, j]: option j dominates option i
+    ranks = np.full(n, -1)
+    remaining = np.ones(n, dtype=bool)
+    front = 0
+    while remaining.any():
+        current = remaining & ~(dominated_by[:, remaining].any(axis=1))
+        ranks[current] = front
+        remaining &= ~current
+        front += 1
+    return ranks
+
+
+def _weighted_scores(matrix: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    lo = matrix.min(axis=0)
+    span = matrix.max(axis=0) - lo
+    span[span == 0] = 1.0
+    return ((matrix - lo) / span) @ weights
+
+
+# ---- Tool ----
+async def rank_transport_options(
+    options: List[Dict[str, Any]],
+    tool_context: ToolContext,
+    constraints: Optional[Dict[str, Any]] = None,
+    max_price: Optional[float] = None,
+    max_duration_hours: Optional[float] = None,
+    top_k: int = 5,
+) -> Dict[str, Any]:
+    """
+    Filter and Pareto-rank transport options from flight/train/bus/ship search.
+
+    Args:
+        options: option dicts exactly as returned by the search agents (may mix modes).
+        constraints: trip_plan.constraints ({timing, comfort, baggage, accessibility, other}).
+            Defaults to the constraints saved in state under "trip_plan", if any.
+        max_price: hard cap on the price in the traveller's currency (e.g. the transport share of the budget).
+        max_duration_hours: hard cap on journey duration.
+        top_k: number of ranked options to return.
+
+    Returns:
+        {"status", "ranked": [option + "rank", "pareto_front", "score", "metrics"],
+         "filtered_out": [{"option", "reason"}], "front_size"}
+    """
+    if constraints is None:
+        trip_plan = await blobs.get(tool_context, "trip_plan")
+        if isinstance(trip_plan, str):
+            try:
+                trip_plan = json.loads(trip_plan)
+            except ValueError:
+                trip_plan = None
+        constraints = trip_plan.get("constraints") if isinstance(trip_plan, dict) else None
+    constraints = constraints or {}
+
+    options = [o for o in options or [] if isinstance(o, dict)]
+    if not options:
+        return {"status": "error", "error": "no options to rank"}
+
+    # Compare prices in one currency: the traveller's, else the first priced option's.
+    profile = tool_context.state.get("user_profile") or {}
+    currency = normalize_currency(profile.get("preferred_currency")) if isinstance(profile, dict) else None
+    if currency is None:
+        currency = next((normalize_currency((o.get("price_total") or {}).get("currency")) for o in options
+                         if isinstance(o.get("price_total"), dict) and o["price_total"].get("currency")), None)
+
+    text = _constraint_text(constraints)
+    window = _timing_window(str(constraints.get("timing") or ""))
+    max_minutes = float(max_duration_hours) * 60 if max_duration_hours else None
+    if max_minutes is None:
+        m = re.search(r"(?:under|within|max(?:imum)?|less than)\s+(\d+(?:\.\d+)?)\s*(?:h|hr|hrs|hours)\b", text)
+        max_minutes = float(m.group(1)) * 60 if m else None
+
+    raw = np.array(
+        [
+            [
+                _price(o, currency),
+                _duration_minutes(o.get("duration")),
+                _stops(o),
+                _departure_hour(o.get("departure_time_local") or o.get("departure_datetime")),
+            ]
+            for o in options
+        ],
+        dtype=float,
+    )
+
+    keep, filtered_out = [], []
+    for i, option in enumerate(options):
+        reason = _hard_filter(option, text, max_price, max_minutes, window, *raw[i])
+        if reason:
+            filtered_out.append({"option": _label(option), "reason": reason})
+        else:
+            keep.append(i)
+    if not keep:
+        return {"status": "ok", "ranked": [], "filtered_out": filtered_out, "front_size": 0}
+
+    kept = raw[keep]
+    matrix = np.column_stack([kept[:, 0], kept[:, 1], kept[:, 2], _window_distance(kept[:, 3], window)])
+    # unknown values rank just behind the worst known value (0 when the whole column is unknown)
+    known = np.where(np.isnan(matrix), -np.inf, matrix).max(axis=0)
+    worst = np.where(np.isfinite(known), known + 1, 0.0)
+    matrix = np.where(np.isnan(matrix), worst, matrix)
+
+    ranks = pareto_ranks(matrix)
+    scores = _weighted_scores(matrix, DEFAULT_WEIGHTS)
+    order = np.lexsort((scores, ranks))
+
+    ranked = []
+    for position, j in enumerate(order[: max(1, int(top_k))], start=1):
+        option = options[keep[j]]
+        ranked.append({
+            **option,
+            "rank": position,
+            "pareto_front": int(ranks[j]),
+            "score": round(float(scores[j]), 4),
+            "metrics": {
+                "price": None if np.isnan(kept[j, 0]) else float(kept[j, 0]),
+                "currency": currency,
+                "duration_minutes": None if np.isnan(kept[j, 1]) else float(kept[j, 1]),
+                "stops": None if np.isnan(kept[j, 2]) else int(kept[j, 2]),
+                "departure_fit_hours": round(float(matrix[j, 3]), 2),
+            },
+        })
+
+    logger.info("Ranked %d/%d transport options (%d on the Pareto front)",
+                len(keep), len(options), int((ranks == 0).sum()))
+    return {
+        "status": "ok",
+        "ranked": ranked,
+        "filtered_out": filtered_out,
+        "front_size": int((ranks == 0).sum()),
+    }
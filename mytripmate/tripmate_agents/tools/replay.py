@@ -0,0 +1,227 @@
+# tripmate_agents/tools/replay.py
+"""
+Record/replay of external traffic, to turn a real conversation into a network-free test.
+
+- TRAFFIC_MODE=record passes every model call and Places lookup through and appends the
+  exchange to TRAFFIC_FIXTURE (JSONL, gzip when the name ends in .gz). TRAFFIC_MODE=replay
+  serves them back from that file without any network call; "off" (default) does neither.
+- Model calls are wrapped by RecordReplayLlm (models.model_for does this for every
+  agent). google_search runs inside the model (grounding), so search results are part
+  of the recorded google_search_agent responses.
+- Requests are matched on a normalized key: system instruction, conversation (texts,
+  tool calls, tool results) and tool names, with timestamps, UUIDs, mock booking ids and
+  cache-hit markers masked, and without the model name or sampling config. If that
+  misses, the next unused response recorded for the same agent instruction is served.
+- Places lookups (places._find_place) are keyed on the normalized query text.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict, deque
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from pydantic import PrivateAttr
+
+from .config import TRAFFIC_FIXTURE, TRAFFIC_MODE
+
+logger = logging.getLogger(__name__)
+
+# Values that differ between a recording and its replay.
+VOLATILE = (
+    (re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"), "<uuid>"),
+    (re.compile(r"\b(?:PAY|EMT[A-Z]{2})[A-Z0-9]{6}\b"), "<id>"),  # tools/bookings.py _id()
+    # Cache bookkeeping (tools/weather.py): a warm process hits where the recording missed.
+    # JSON in tool results, Python repr in another agent's quoted transcript.
+    (re.compile(r"""(["'])(cached|cache_hits)\1: (?:true|false|True|False|\d+)"""), r"\1\2\1: <cache>"),
+)
+
+
+class ReplayMiss(LookupError):
+    """A request in replay mode that the fixture has no recording for."""
+
+
+# ---- Keys ----
+def normalize_text(text: Any) -> str:
+    text = " ".join(str(text or "").split())
+    for pattern, placeholder in VOLATILE:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+def _digest(value: Any) -> str:
+    blob = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:32]
+
+
+def _instruction(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if instruction is None or isinstance(instruction, str):
+        return normalize_text(instruction)
+    parts = getattr(instruction, "parts", None) or []
+    return normalize_text(" ".join(p.text for p in parts if getattr(p, "text", None)))
+
+
+def _json(value: Any) -> str:
+    return json.dumps(value or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _part(part) -> Any:
+    if part.text:
+        return normalize_text(part.text)
+    if part.function_call:
+        return {"call": part.function_call.name, "args": normalize_text(_json(part.function_call.args))}
+    if part.function_response:
+        return {"result": part.function_response.name, "data": normalize_text(_json(part.function_response.response))}
+    return None
+
+
+def llm_keys(llm_request: LlmRequest) -> Tuple[str, str]:
+    """(exact key, instruction key) for a model request."""
+    instruction = _instruction(llm_request)
+    contents = [[c.role, [p for p in map(_part, c.parts or []) if p is not None]] for c in llm_request.contents or []]
+    tools = []
+    for tool in (llm_request.config.tools or []) if llm_request.config else []:
+        tools.extend(d.name for d in getattr(tool, "function_declarations", None) or [])
+        if getattr(tool, "google_search", None):
+            tools.append("google_search")
+    return _digest([instruction, contents, sorted(tools)]), _digest(instruction)
+
+
+# ---- Fixture ----
+class Tape:
+    """The fixture file: appended to while recording, indexed while replaying."""
+
+    def __init__(self, path: Optional[str] = TRAFFIC_FIXTURE, mode: str = TRAFFIC_MODE):
+        self.path = path
+        self.mode = (mode or "off").lower()
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: List[Dict[str, Any]] = []
+        self._exact: Dict[Tuple[str, str], Deque[int]] = {}
+        self._shape: Dict[Tuple[str, str], Deque[int]] = {}
+        self._used: set = set()
+        if self.mode == "replay":
+            self.load()
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def load(self) -> None:
+        try:
+            with self._open("r") as f:
+                self._entries = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read traffic fixture %s: %s", self.path, e)
+            self._entries = []
+        self.rewind()
+        logger.info("Loaded %d recorded exchanges from %s", len(self._entries), self.path)
+
+    def rewind(self) -> None:
+        """Make every recorded response available again (e.g. before the next replay run)."""
+        exact, shape = defaultdict(deque), defaultdict(deque)
+        for index, entry in enumerate(self._entries):
+            exact[(entry["kind"], entry["key"])].append(index)
+            shape[(entry["kind"], entry.get("shape") or entry["key"])].append(index)
+        self._exact, self._shape, self._used = dict(exact), dict(shape), set()
+
+    def record(self, kind: str, key: str, response: Any, shape: Optional[str] = None) -> None:
+        entry = {"kind": kind, "key": key, "shape": shape, "response": response}
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with self._open("a") as f:
+                    f.write(line)
+            except OSError as e:
+                logger.warning("Could not append to traffic fixture %s: %s", self.path, e)
+
+    def _take(self, queue: Optional[Deque[int]]) -> Optional[int]:
+        while queue:
+            index = queue.popleft()
+            if index not in self._used:
+                self._used.add(index)
+                return index
+        return None
+
+    def lookup(self, kind: str, key: str, shape: Optional[str] = None) -> Any:
+        """
+        The next unused recorded response for `key`; else the last one for `key` again
+        (identical repeated requests, e.g. many sessions of one script under load); else
+        the next unused one for `shape`. Raises ReplayMiss.
+        """
+        with self._lock:
+            index = self._take(self._exact.get((kind, key)))
+            if index is None:
+                index = next((i for i in reversed(range(len(self._entries)))
+                              if self._entries[i]["kind"] == kind and self._entries[i]["key"] == key), None)
+            if index is None and shape:
+                index = self._take(self._shape.get((kind, shape)))
+                if index is not None:
+                    logger.info("Replay: no exact %s match, served by instruction order", kind)
+            if index is None:
+                self.misses += 1
+                raise ReplayMiss(f"no recorded {kind} response for key {key} in {self.path}")
+            return self._entries[index]["response"]
+
+    def exchange(self, kind: str, key: str, live: Callable[[], Any]) -> Any:
+        """Run `live()` (record/off) or serve the recorded result (replay) for a plain call."""
+        if self.mode == "replay":
+            return self.lookup(kind, key)
+        result = live()
+        if self.mode == "record":
+            self.record(kind, key, result)
+        return result
+
+
+tape = Tape()
+
+
+# ---- Model wrapper ----
+class RecordReplayLlm(BaseLlm):
+    """Records the wrapped model's responses, or serves them back in replay mode."""
+
+    inner: Any = None  # model name or BaseLlm; unused in replay mode
+    _llm: Optional[BaseLlm] = PrivateAttr(default=None)
+
+    def _inner(self) -> BaseLlm:
+        if self._llm is None:
+            inner = self.inner or self.model
+            self._llm = LLMRegistry.new_llm(inner) if isinstance(inner, str) else inner
+        return self._llm
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        key, shape = llm_keys(llm_request)
+        if tape.mode == "replay":
+            for data in tape.lookup("llm", key, shape):
+                yield LlmResponse.model_validate(data)
+            return
+        recorded = []
+        try:
+            async for response in self._inner().generate_content_async(llm_request, stream=stream):
+                recorded.append(response.model_dump(mode="json", exclude_none=True))
+                yield response
+        finally:
+            # ADK may close the generator after a function call (e.g. transfer_to_agent).
+            if tape.mode == "record" and recorded:
+                tape.record("llm", key, recorded, shape=shape)
+
+    @property
+    def capabilities(self):
+        return self._inner().capabilities
+
+    def connect(self, llm_request: LlmRequest):
+        return self._inner().connect(llm_request)
@@ -0,0 +1,256 @@
+# tripmate_agents/tools/rooms.py
+"""
+Deterministic room-combination optimizer for hotel room selection.
+
+Given the room inventory returned for the chosen hotel (RoomsSelection-style options)
+and the trip headcount, optimize_rooms(...) searches the minimal combinations of rooms
+that fit the group under occupancy limits (branch and bound on price and comfort, so
+large groups stay fast), then returns the cheapest one plus the top-k alternatives
+ranked by price and comfort. Guest allocations are built only for the returned options.
+
+Occupancy rules:
+- adults + children count against occupancy_limit; infants use a cot and do not.
+- every room needs at least one adult.
+"""
+
+import heapq
+import logging
+import math
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bed types that make a room more comfortable for the same headcount.
+BED_COMFORT = {"king": 1.0, "queen": 0.8, "double": 0.6, "twin": 0.4, "single": 0.2}
+
+
+# ---- Helpers ----
+def _amount(value: Any) -> Optional[float]:
+    if isinstance(value, dict):
+        value = value.get("amount")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _nightly_price(room: Dict[str, Any], nights: int) -> Optional[float]:
+    price = _amount(room.get("price_per_night"))
+    if price is None:
+        total = _amount(room.get("total_price"))
+        price = total / nights if total is not None else None
+    return price
+
+
+def _room_comfort(room: Dict[str, Any]) -> float:
+    amenities = room.get("amenities") or []
+    bed = str(room.get("bed_type") or "").lower()
+    bed_score = max((v for k, v in BED_COMFORT.items() if k in bed), default=0.3)
+    refundable = 0.5 if str(room.get("refundable") or "").lower() == "yes" else 0.0
+    return min(len(amenities), 8) / 8 + bed_score + refundable
+
+
+def _normalize_rooms(rooms: List[Dict[str, Any]], nights: int, max_rooms: int) -> List[Dict[str, Any]]:
+    """Keep rooms with a usable occupancy and price; skip incomplete entries."""
+    usable = []
+    for room in rooms or []:
+        try:
+            occupancy = int(room.get("occupancy_limit") or 0)
+        except (TypeError, ValueError):
+            occupancy = 0
+        price = _nightly_price(room, nights)
+        if occupancy <= 0 or price is None:
+            logger.info("Skipping room without occupancy/price: %s", room.get("room_type"))
+            continue
+        available = room.get("available")
+        available = int(available) if isinstance(available, (int, float)) else max_rooms
+        usable.append({
+            "room": room,
+            "occupancy": occupancy,
+            "price": price,
+            "available": max(0, min(available, max_rooms)),
+            "comfort": _room_comfort(room),
+            "currency": (room.get("price_per_night") or {}).get("currency")
+            if isinstance(room.get("price_per_night"), dict) else None,
+        })
+    return usable
+
+
+def _search(rooms: List[Dict[str, Any]], guests: int, max_rooms: int, nights: int, budget: Optional[float],
+            keep: int) -> Tuple[List[List[int]], Optional[List[int]], int]:
+    """
+    Branch and bound over the minimal combinations covering `guests` with at most `max_rooms` rooms.
+
+    Returns (the `keep` cheapest count vectors in ranking order, the most comfortable one -
+    within budget when any combination is - and how many combinations were scored). A branch
+    is cut when its cheapest possible completion (remaining beds at the lowest price per bed)
+    cannot enter the top `keep`, and its comfort ceiling cannot beat the best comfort found.
+    """
+    order = sorted(range(len(rooms)), key=lambda j: -rooms[j]["comfort"])
+    ranked = [rooms[j] for j in order]
+    bed_price = [r["price"] / r["occupancy"] for r in ranked]
+    min_bed_price = [min(bed_price[i:]) for i in range(len(ranked))]
+    max_occupancy = max(r["occupancy"] for r in ranked)
+    # a minimal combination has less than one room of slack
+    slack_bonus = 0.5 * (max_occupancy - 1) / (guests + max_occupancy - 1)
+    counts = [0] * len(ranked)
+    cheapest: List[tuple] = []  # max-heap of (-total, comfort, -rooms, -seq, counts)
+    best: Dict[bool, tuple] = {}  # within budget? -> (comfort, -total, -rooms, -seq, counts)
+    scored = 0
+
+    def score(capacity: int, used: int, price: float, comfort_sum: float) -> None:
+        nonlocal scored
+        scored += 1
+        total = price * nights
+        comfort = round(comfort_sum / used + 0.5 * (capacity - guests) / capacity, 3)
+        vector = [0] * len(ranked)
+        for i, n in enumerate(counts):
+            vector[order[i]] = n
+        entry = (-round(total, 2), comfort, -used, -scored, vector)
+        if len(cheapest) < keep:
+            heapq.heappush(cheapest, entry)
+        elif entry > cheapest[0]:
+            heapq.heapreplace(cheapest, entry)
+        fits = budget is None or total <= budget
+        candidate = (comfort, -round(total, 2), -used, -scored, vector)
+        if fits not in best or candidate > best[fits]:
+            best[fits] = candidate
+
+    def worth_it(i: int, capacity: int, used: int, price: float, comfort_sum: float) -> bool:
+        lower = (price + (guests - capacity) * min_bed_price[i]) * nights
+        if len(cheapest) < keep or round(lower, 2) <= -cheapest[0][0]:
+            return True
+        ceiling = max(comfort_sum / used, ranked[i]["comfort"]) if used else ranked[i]["comfort"]
+        ceiling = round(ceiling + slack_bonus, 3)
+        if (budget is None or lower <= budget) and (True not in best or ceiling >= best[True][0]):
+            return True
+        return True not in best and (False not in best or ceiling >= best[False][0])
+
+    def walk(i: int, capacity: int, used: int, price: float, comfort_sum: float):
+        if capacity >= guests:
+            # minimal: dropping any single room must break the fit
+            if all(capacity - ranked[j]["occupancy"] < guests for j, c in enumerate(counts) if c):
+                score(capacity, used, price, comfort_sum)
+            return
+        if i == len(ranked) or used == max_rooms or not worth_it(i, capacity, used, price, comfort_sum):
+            return
+        room = ranked[i]
+        need = math.ceil((guests - capacity) / room["occupancy"])
+        for n in range(min(room["available"], max_rooms - used, need), -1, -1):
+            counts[i] = n
+            walk(i + 1, capacity + n * room["occupancy"], used + n,
+                 price + n * room["price"], comfort_sum + n * room["comfort"])
+        counts[i] = 0
+
+    walk(0, 0, 0, 0.0, 0.0)
+    top = [entry[-1] for entry in sorted(cheapest, reverse=True)]
+    comfiest = best.get(True) or best.get(False)
+    return top, comfiest[-1] if comfiest else None, scored
+
+
+def _distribute(rooms: List[Tuple[Dict[str, Any], int]], adults: int, children: int, infants: int) -> List[Dict[str, Any]]:
+    """Spread the group over the chosen rooms: one adult each first, then fill remaining beds."""
+    slots = [{"room_type": r["room"].get("room_type"), "occupancy_limit": r["occupancy"],
+              "adults": 0, "children": 0, "infants": 0} for r, n in rooms for _ in range(n)]
+    slots.sort(key=lambda s: -s["occupancy_limit"])
+    for slot in slots:
+        slot["adults"] = 1
+    adults -= len(slots)
+    for kind, left in (("adults", adults), ("children", children)):
+        for slot in slots:
+            free = slot["occupancy_limit"] - slot["adults"] - slot["children"]
+            take = min(free, left)
+            slot[kind] += take
+            left -= take
+    for i in range(infants):
+        slots[i % len(slots)]["infants"] += 1
+    return slots
+
+
+def _option(rooms: List[Dict[str, Any]], counts: List[int], nights: int, adults: int, children: int,
+            infants: int, budget: Optional[float], currency: Optional[str]) -> Dict[str, Any]:
+    chosen = [(r, n) for r, n in zip(rooms, counts) if n]
+    per_night = sum(r["price"] * n for r, n in chosen)
+    total = per_night * nights
+    guests = adults + children
+    capacity = sum(r["occupancy"] * n for r, n in chosen)
+    n_rooms = sum(counts)
+    # comfort: room quality weighted by rooms, plus breathing room, minus split penalty
+    comfort = sum(r["comfort"] * n for r, n in chosen) / n_rooms + 0.5 * (capacity - guests) / capacity
+    return {
+        "rooms": [
+            {
+                "room_type": r["room"].get("room_type"),
+                "count": n,
+                "occupancy_limit": r["occupancy"],
+                "bed_type": r["room"].get("bed_type"),
+                "refundable": r["room"].get("refundable"),
+                "price_per_night": {"amount": round(r["price"], 2), "currency": currency},
+            }
+            for r, n in chosen
+        ],
+        "allocation": _distribute(chosen, adults, children, infants),
+        "room_count": n_rooms,
+        "price_per_night": {"amount": round(per_night, 2), "currency": currency},
+        "total_price": {"amount": round(total, 2), "currency": currency, "notes": f"{nights} night(s)"},
+        "comfort_score": round(comfort, 3),
+        "within_budget": None if budget is None else total <= budget,
+    }
+
+
+# ---- Tool ----
+def optimize_rooms(
+    rooms: List[Dict[str, Any]],
+    adults: int,
+    children: int = 0,
+    infants: int = 0,
+    nights: int = 1,
+    budget: Optional[float] = None,
+    top_k: int = 3,
+) -> Dict[str, Any]:
+    """
+    Pick the cheapest valid room combination for the group, plus ranked alternatives.
+
+    Args:
+        rooms: room options for the chosen hotel, each with at least room_type,
+            occupancy_limit and price_per_night {amount, currency} (or total_price).
+            An optional integer "available" caps how many of that room can be booked.
+        adults, children, infants: trip_plan headcount (seniors count as adults).
+        nights: number of nights of the stay.
+        budget: total stay budget in the rooms' currency, if any.
+        top_k: number of alternatives to return.
+
+    Returns:
+        {"status", "cheapest", "alternatives", "best_comfort", "considered"} ("considered":
+        combinations scored after pruning); each option lists
+        rooms with counts, the guest allocation per room, nightly/total price and comfort_score.
+    """
+    adults, children, infants = int(adults or 0), int(children or 0), int(infants or 0)
+    nights = max(1, int(nights or 1))
+    if adults <= 0:
+        return {"status": "error", "error": "at least one adult is required"}
+
+    guests = adults + children
+    usable = _normalize_rooms(rooms, nights, max_rooms=adults)
+    if not usable:
+        return {"status": "error", "error": "no room options with occupancy_limit and price"}
+    currency = next((r["currency"] for r in usable if r["currency"]), None)
+    budget = float(budget) if budget is not None else None
+
+    top, comfiest, considered = _search(usable, guests, adults, nights, budget, keep=1 + max(0, int(top_k)))
+    if not top:
+        return {"status": "error",
+                "error": f"no combination of available rooms fits {adults} adult(s) and {children} child(ren)"}
+
+    options = [_option(usable, counts, nights, adults, children, infants, budget, currency) for counts in top]
+    best_comfort = next((o for o, counts in zip(options, top) if counts == comfiest), None) \
+        or _option(usable, comfiest, nights, adults, children, infants, budget, currency)
+    cheapest = options[0]
+
+    return {
+        "status": "ok",
+        "cheapest": cheapest,
+        "alternatives": options[1:1 + max(0, int(top_k))],
+        "best_comfort": best_comfort,
+        "considered": considered,
+    }
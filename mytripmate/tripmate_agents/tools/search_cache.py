@@ -0,0 +1,380 @@
+# tripmate_agents/tools/search_cache.py
+"""
+Cross-user cache for the search sub-agents.
+
+CachedAgentTool is a drop-in replacement for AgentTool: it normalizes the structured
+search request into a key, answers hits straight from the shared cache (the sub-agent
+and its LLM/search calls are skipped entirely), serves stale entries while refreshing
+them in the background, and stores fresh results on a miss.
+
+Transport/hotel keys are (mode, origin, destination, dates, exact headcount, budget,
+preferences): the search agents filter and rank by budget and preferences and quote
+group totals, so an answer is only reused for the same request. Each mode has its own
+TTL because fares move faster than hotel lists. Stale entries are refreshed on a
+detached session of the sub-agent, never on the (already finished) turn that hit them.
+
+Only real answers are shared: a search agent's answer must parse as its AGENT_SCHEMAS
+entry with at least one option, and the sub-agent's error messages (which AgentTool
+returns as the result when the agent produced nothing) and "nothing found" replies are
+never stored.
+
+CachedSearchAgentTool does the same for google_search_agent questions, keyed by the
+question's words in order (direction words kept). An optional MinHash tier (off unless
+SEARCH_SIMILARITY_THRESHOLD is set) lets a near-duplicate question reuse an earlier
+answer, but only when its place names and request fields (dates, months, headcounts,
+budget; see request_fields) match exactly.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from .. import structured
+from .cache import TTLCache, STALE, make_backend
+from .config import (
+    SEARCH_CACHE_BACKEND, SEARCH_CACHE_PATH, SEARCH_CACHE_STALE_SECONDS, SEARCH_CACHE_TTL,
+    SEARCH_SIMILARITY_THRESHOLD,
+)
+from ..shared_libraries.types import HotelSearchRequest, TransportSearchRequest
+from .minhash import MinHashIndex, place_tokens, words
+
+logger = logging.getLogger(__name__)
+
+# Seconds a result stays fresh, per mode. Override with SEARCH_CACHE_TTL="flight=600,hotel=86400".
+DEFAULT_TTL = {
+    "flight": 20 * 60,
+    "train": 60 * 60,
+    "bus": 60 * 60,
+    "ship": 6 * 60 * 60,
+    "hotel": 12 * 60 * 60,
+    "search": 6 * 60 * 60,
+    "search_live": 30 * 60,  # weather/news/"today" questions
+}
+
+# Questions whose answers go stale quickly get the short "search_live" TTL.
+LIVE_QUERY = re.compile(r"\b(weather|forecast|rain|news|alert|advisory|today|tonight|tomorrow|now|live|status|open)\b")
+
+# Old/alternate spellings that should share a cache entry.
+PLACE_ALIASES = {
+    "bangalore": "bengaluru",
+    "bombay": "mumbai",
+    "madras": "chennai",
+    "calcutta": "kolkata",
+    "chikmagalur": "chikkamagaluru",
+    "gurgaon": "gurugram",
+    "mysore": "mysuru",
+}
+
+# Free-text answers that only say nothing was found.
+NO_ANSWER = re.compile(
+    r"^\W*(?:(?:i'?m |i am )?sorry|unfortunately|i (?:could ?n[o']t|can ?n[o']t|was unable|am unable|"
+    r"did ?n[o']t find)|no (?:relevant |matching )?(?:results?|information|options?|answers?)\b)", re.I)
+
+# user_id of the detached sessions that refresh stale entries
+REFRESH_USER = "search_cache_refresh"
+
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d %b %Y", "%d %B %Y", "%b %d %Y", "%B %d %Y")
+
+
+def _parse_ttl(spec: Optional[str]) -> Dict[str, float]:
+    ttl = dict(DEFAULT_TTL)
+    for part in (spec or "").split(","):
+        if "=" in part:
+            mode, seconds = part.split("=", 1)
+            try:
+                ttl[mode.strip().lower()] = float(seconds)
+            except ValueError:
+                logger.warning("Ignoring bad SEARCH_CACHE_TTL entry: %s", part)
+    return ttl
+
+
+# One cache per process, shared by every session and user.
+search_cache = TTLCache(
+    backend=make_backend(SEARCH_CACHE_BACKEND, SEARCH_CACHE_PATH),
+    ttl=_parse_ttl(SEARCH_CACHE_TTL),
+    stale_ttl=SEARCH_CACHE_STALE_SECONDS,
+)
+
+
+# ---- Key normalization ----
+def normalize_place(value: Any) -> str:
+    text = re.sub(r"[^\w\s]", " ", str(value or "").lower())
+    text = re.sub(r"\s+", " ", text).strip()
+    return " ".join(PLACE_ALIASES.get(word, word) for word in text.split())
+
+
+def normalize_date(value: Any) -> str:
+    text = re.sub(r"\s+", " ", str(value or "").replace(",", " ")).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return text.lower()
+
+
+def headcount(adults: Any, children: Any = 0, infants: Any = 0) -> str:
+    """Exact group, e.g. "a2c1i0": prices are quoted for the whole group."""
+    try:
+        return f"a{int(adults or 0)}c{int(children or 0)}i{int(infants or 0)}"
+    except (TypeError, ValueError):
+        return f"a{adults}c{children}i{infants}"
+
+
+def normalize_budget(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value or "").lower().replace(",", "")).strip()
+
+
+def normalize_preferences(value: Any) -> str:
+    """Word set of the preference text ("morning, AC" == "AC morning")."""
+    return " ".join(sorted(set(re.findall(r"[a-z0-9]+", str(value or "").lower()))))
+
+
+def search_key(mode: str, args: Dict[str, Any]) -> str:
+    """Normalized key for a transport/hotel search request."""
+    origin = normalize_place(args.get("origin"))
+    destination = normalize_place(args.get("destination"))
+    start = normalize_date(args.get("departure_date") or args.get("check_in"))
+    end = normalize_date(args.get("return_date") or args.get("check_out"))
+    group = headcount(args.get("adults", 1), args.get("children", 0), args.get("infants", 0))
+    budget = normalize_budget(args.get("budget"))
+    preferences = normalize_preferences(args.get("preferences"))
+    return "|".join((mode, origin, destination, start, end, group, budget, preferences))
+
+
+def query_key(args: Dict[str, Any]) -> str:
+    """Filler-insensitive key for a free-text question; word order and direction words count."""
+    return " ".join(words(args.get("request") or ""))
+
+
+# Error messages of the wrapped agent's model calls during the current run_async.
+_sub_agent_errors: "contextvars.ContextVar[Optional[list]]" = contextvars.ContextVar("sub_agent_errors",
+                                                                                     default=None)
+
+
+def _record_error(callback_context, llm_response):
+    """after_model callback on wrapped agents: remember error messages for _cacheable."""
+    errors = _sub_agent_errors.get()
+    if errors is not None and llm_response.error_message:
+        errors.append(llm_response.error_message.strip())
+    return None
+
+
+# Request fields a free-text question may state, and how they are spotted in its text.
+REQUEST_FIELDS = tuple(dict.fromkeys([*TransportSearchRequest.model_fields, *HotelSearchRequest.model_fields]))
+_TEXT_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2}|\d{1,2}[/-]\d{1,2}[/-]\d{4}|\d{1,2}(?:st|nd|rd|th)?\s+[a-z]{3,9}(?:,?\s*\d{4})?"
+                        r"|[a-z]{3,9}\s+\d{1,2}(?:st|nd|rd|th)?(?:\s*,?\s*\d{4})?)\b")
+_ORDINAL = re.compile(r"(?<=\d)(?:st|nd|rd|th)\b")
+_MONTH = re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)(?:uary|ruary|ch|il|e|y|ust|t|tember|ober|ember)?\b")
+_COUNT = re.compile(r"\b(\d+)\s*(adult|people|person|pax|traveller|traveler|child|children|kid|infant|baby|room|night|day)s?\b")
+_BUDGET = re.compile(r"\b(?:under|below|within|max|budget|upto|up to|less than|around)\s*(?:of\s*)?(?:rs\.?|inr|₹)?\s*"
+                     r"(\d[\d,]*(?:\.\d+)?)\s*(k|lakhs?|lacs?)?\b")
+_COUNT_NOUNS = {"people": "adult", "person": "adult", "pax": "adult", "traveller": "adult", "traveler": "adult",
+                "children": "child", "kid": "child", "baby": "infant"}
+
+
+def request_fields(args: Dict[str, Any]) -> frozenset:
+    """
+    "field:value" tokens of the structured request a search states: TransportSearchRequest /
+    HotelSearchRequest fields passed as arguments, and the dates, months, headcounts and
+    budget written in a free-text question. Near-duplicate hits need these to be equal.
+    """
+    out = set()
+    for field in REQUEST_FIELDS:
+        value = args.get(field)
+        if field == "preferences" or value in (None, ""):
+            continue
+        if field.endswith("date") or field in ("check_in", "check_out"):
+            value = normalize_date(value)
+        elif field in ("origin", "destination"):
+            value = normalize_place(value)
+        else:
+            value = normalize_budget(value)
+        out.add(f"{field}:{value}")
+    text = str(args.get("request") or "").lower().replace("’", "'")
+    for mention in _TEXT_DATE.findall(text):
+        if mention[0].isdigit() or _MONTH.match(mention):
+            out.add(f"date:{normalize_date(_ORDINAL.sub('', mention))}")
+    out.update(f"month:{m}" for m in _MONTH.findall(text))
+    out.update(f"count:{n}:{_COUNT_NOUNS.get(noun, noun)}" for n, noun in _COUNT.findall(text))
+    for amount, unit in _BUDGET.findall(text):
+        scale = 1000 if unit == "k" else 100000 if unit else 1
+        out.add(f"budget:{float(amount.replace(',', '')) * scale:g}")
+    return frozenset(out)
+
+
+def _exact(args: Dict[str, Any]) -> frozenset:
+    return place_tokens(args.get("request") or "") | request_fields(args)
+
+
+def _cacheable(agent_name: str, result: Any, errors: Any = ()) -> bool:
+    """True for a real answer of `agent_name`, never for its error output or an empty reply."""
+    if result is None or result == "" or result == {}:
+        return False
+    if isinstance(result, dict) and result.get("status") == "error":
+        return False
+    if isinstance(result, str) and (result.strip() in errors or NO_ANSWER.match(result)):
+        return False
+    schema = structured.AGENT_SCHEMAS.get(agent_name)
+    return schema is None or structured.is_answer(result, schema)
+
+
+# ---- Background refresh ----
+# Refresh tasks stay referenced until they finish (the loop only keeps weak references).
+_refresh_tasks: set = set()
+
+
+def _refresh_done(task: asyncio.Task) -> None:
+    _refresh_tasks.discard(task)
+    if not task.cancelled() and task.exception():
+        logger.warning("Background cache refresh failed: %s", task.exception())
+
+
+# ---- Tool ----
+class CachedAgentTool(AgentTool):
+    """AgentTool that answers repeated requests from a shared TTLCache."""
+
+    def __init__(self, agent, namespace: str, key_fn: Optional[Callable[[Dict[str, Any]], str]] = None,
+                 cache: Optional[TTLCache] = None, **kwargs):
+        super().__init__(agent=agent, **kwargs)
+        self.namespace = namespace
+        self.key_fn = key_fn or (lambda args: search_key(namespace, args))
+        self.cache = cache or search_cache
+        self._refreshing: set = set()
+        current = agent.after_model_callback
+        callbacks = list(current) if isinstance(current, list) else [current] if current else []
+        if _record_error not in callbacks:
+            agent.after_model_callback = [_record_error, *callbacks]
+
+    async def _run_detached(self, args: Dict[str, Any]) -> Any:
+        """Run the wrapped agent on a session of its own, outside any user's turn."""
+        from google.adk.runners import Runner
+        from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+        schema = getattr(self.agent, "input_schema", None)
+        if schema:
+            text = schema.model_validate(args).model_dump_json(exclude_none=True)
+        else:
+            text = args.get("request") or json.dumps(args, ensure_ascii=False, sort_keys=True)
+        runner = Runner(app_name=self.agent.name, agent=self.agent, session_service=InMemorySessionService())
+        last = None
+        try:
+            session = await runner.session_service.create_session(app_name=self.agent.name, user_id=REFRESH_USER)
+            async for event in runner.run_async(user_id=REFRESH_USER, session_id=session.id,
+                                                new_message=types.Content(role="user", parts=[types.Part(text=text)])):
+                if event.content and event.content.parts:
+                    last = event.content
+        finally:
+            await runner.close()
+        if last is None:
+            return None
+        return "\n".join(p.text for p in last.parts if p.text and not p.thought) or None
+
+    async def run_detached(self, args: Dict[str, Any]) -> Any:
+        """Cached search without a tool_context, so it may outlive the turn that started it."""
+        key = self.key_fn(args)
+        value, freshness = self._lookup(key, args)
+        if freshness is not None:
+            logger.info("%s cache %s hit: %s", self.namespace, freshness, key)
+            if freshness == STALE:
+                self._refresh_later(key, args)
+            return value
+        logger.info("%s cache miss (detached): %s", self.namespace, key)
+        result = await self._run_detached(args)
+        if _cacheable(self.agent.name, result):
+            self._store(key, args, result)
+        return result
+
+    def _refresh_later(self, key: str, args: Dict[str, Any]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.get_running_loop().create_task(self._refresh(key, dict(args)))
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_done)
+
+    async def _refresh(self, key: str, args: Dict[str, Any]) -> None:
+        try:
+            result = await self._run_detached(args)
+            if _cacheable(self.agent.name, result):
+                self._store(key, args, result)
+                logger.info("Revalidated %s cache entry %s", self.namespace, key)
+        finally:
+            self._refreshing.discard(key)
+
+    def _namespace(self, args: Dict[str, Any]) -> str:
+        return self.namespace
+
+    def _lookup(self, key: str, args: Dict[str, Any]):
+        return self.cache.lookup(self._namespace(args), key)
+
+    def _store(self, key: str, args: Dict[str, Any], result: Any) -> None:
+        self.cache.store(self._namespace(args), key, result)
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: ToolContext) -> Any:
+        key = self.key_fn(args)
+        value, freshness = self._lookup(key, args)
+        if freshness is not None:
+            logger.info("%s cache %s hit: %s", self.namespace, freshness, key)
+            if freshness == STALE:
+                self._refresh_later(key, args)
+            return value
+
+        logger.info("%s cache miss: %s", self.namespace, key)
+        errors: list = []
+        token = _sub_agent_errors.set(errors)
+        try:
+            result = await super().run_async(args=args, tool_context=tool_context)
+        finally:
+            _sub_agent_errors.reset(token)
+        if _cacheable(self.agent.name, result, errors):
+            self._store(key, args, result)
+        else:
+            logger.info("%s result not cached: %.80r", self.namespace, result)
+        return result
+
+
+class CachedSearchAgentTool(CachedAgentTool):
+    """
+    Cached wrapper for google_search_agent, shared by every agent that uses it.
+
+    Tier 1: exact match on the question's words in order.
+    Tier 2 (similarity_threshold > 0, off by default): MinHash near-duplicate match on
+    earlier questions with the same place tokens and request fields.
+    """
+
+    def __init__(self, agent, similarity_threshold: Optional[float] = None, **kwargs):
+        super().__init__(agent=agent, namespace="search", key_fn=query_key, **kwargs)
+        threshold = SEARCH_SIMILARITY_THRESHOLD if similarity_threshold is None else similarity_threshold
+        self.index = MinHashIndex(threshold=threshold) if threshold > 0 else None
+
+    def _namespace(self, args: Dict[str, Any]) -> str:
+        return "search_live" if LIVE_QUERY.search(str(args.get("request") or "").lower()) else "search"
+
+    def _lookup(self, key: str, args: Dict[str, Any]):
+        value, freshness = super()._lookup(key, args)
+        if freshness is not None or self.index is None:
+            return value, freshness
+        match = self.index.query(frozenset(key.split()), _exact(args))
+        if match is None:
+            return None, None
+        similar_key, score = match
+        value, freshness = self.cache.lookup(self._namespace(args), similar_key)
+        if freshness is None:
+            self.index.remove(similar_key)  # expired or evicted from the backend
+        else:
+            logger.info("search cache similarity %.2f: '%s' ~ '%s'", score, key, similar_key)
+        return value, freshness
+
+    def _store(self, key: str, args: Dict[str, Any], result: Any) -> None:
+        super()._store(key, args, result)
+        if self.index is not None:
+            self.index.add(key, frozenset(key.split()), _exact(args))
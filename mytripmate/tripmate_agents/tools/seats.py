@@ -0,0 +1,444 @@
+# tripmate_agents/tools/seats.py
+"""
+Deterministic seat / berth / cabin allocation for the planning_agent.
+
+Replaces the per-mode LLM seat selection agents with a local seat-map engine:
+- One layout model per mode (flight, train, bus, ship), built once and cached.
+- allocate_seats(...) places the whole group on contiguous blocks (row, bay, cabin),
+  honours position/berth preferences and keeps seniors on accessible seats.
+- The result keeps the JSON shape the old seat/cabin agents returned
+  (e.g. class / seat_position / extras for flights) and adds the concrete seats.
+"""
+
+import logging
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Score used to rule a seat out for a traveller (exit rows for seniors/children, ...)
+BLOCKED = -1000
+
+# ---- Layout models ----
+# A layout is a list of seat dicts:
+#   {"seat": "14A", "block": ("14",), "pos": 0, "tags": frozenset({...})}
+# "block" groups seats that count as "together" (a row, a train bay, a cabin).
+# "pos" orders seats inside a block; for compartment layouts every subset of a
+# block is contiguous, for row layouts only consecutive positions are.
+
+FLIGHT_CABINS = {
+    # class: (rows, letters, window, aisle, middle)
+    "first": (range(1, 3), "AF", "AF", "", ""),
+    "business": (range(3, 8), "ACDF", "AF", "CD", ""),
+    "premium economy": (range(8, 12), "ABCDEF", "AF", "CD", "BE"),
+    "economy": (range(12, 39), "ABCDEF", "AF", "CD", "BE"),
+}
+FLIGHT_EXIT_ROWS = {24, 25}
+
+TRAIN_COACHES = {
+    # class: (coach prefix, coaches, bays per coach, berth pattern per bay)
+    "SL": ("S", 3, 9, ["lower", "middle", "upper", "lower", "middle", "upper", "side_lower", "side_upper"]),
+    "3A": ("B", 2, 8, ["lower", "middle", "upper", "lower", "middle", "upper", "side_lower", "side_upper"]),
+    "2A": ("A", 1, 8, ["lower", "upper", "lower", "upper", "side_lower", "side_upper"]),
+    "1A": ("H", 1, 6, ["lower", "upper", "lower", "upper"]),
+}
+TRAIN_CHAIR_CAR = ("C", 2, 16, "ABCDE", "AE", "CD", "B")  # prefix, coaches, rows, letters, window, aisle, middle
+
+SHIP_CABINS = {
+    # class: (berths per cabin, berth pattern, cabin amenities)
+    "standard cabin": (4, ["lower", "lower", "upper", "upper"], []),
+    "deluxe cabin": (2, ["lower", "lower"], ["private_bathroom"]),
+    "suite": (2, ["lower", "lower"], ["private_bathroom", "balcony"]),
+}
+
+# Aliases accepted from the user / LLM for each mode's class field.
+CLASS_ALIASES = {
+    "flight": {
+        "economy": "economy", "eco": "economy", "y": "economy",
+        "premium economy": "premium economy", "premium": "premium economy",
+        "business": "business", "j": "business",
+        "first": "first", "f": "first",
+    },
+    "train": {
+        "sleeper": "SL", "sl": "SL",
+        "3ac": "3A", "3a": "3A", "third ac": "3A",
+        "2ac": "2A", "2a": "2A", "second ac": "2A",
+        "1ac": "1A", "1a": "1A", "first ac": "1A",
+        "chair car": "CC", "cc": "CC",
+    },
+    "bus": {"seater": "seater", "sleeper": "sleeper"},
+    "ship": {
+        "deck": "deck",
+        "standard cabin": "standard cabin", "standard": "standard cabin",
+        "deluxe cabin": "deluxe cabin", "deluxe": "deluxe cabin",
+        "suite": "suite",
+    },
+}
+
+DISPLAY_CLASS = {
+    "economy": "Economy", "premium economy": "Premium Economy", "business": "Business", "first": "First",
+    "SL": "Sleeper", "3A": "3AC", "2A": "2AC", "1A": "1AC", "CC": "Chair Car",
+    "seater": "Seater", "sleeper": "Sleeper",
+    "deck": "Deck", "standard cabin": "Standard Cabin", "deluxe cabin": "Deluxe Cabin", "suite": "Suite",
+}
+
+
+def _seat(seat_id: str, block: Tuple[str, ...], pos: int, *tags: str) -> Dict[str, Any]:
+    return {"seat": seat_id, "block": block, "pos": pos, "tags": frozenset(t for t in tags if t)}
+
+
+def _row_seats(prefix: str, row: int, letters: str, window: str, aisle: str, middle: str,
+               block: Tuple[str, ...], *extra: str) -> List[Dict[str, Any]]:
+    """Seats of one row; an aisle between two aisle letters leaves a gap in 'pos'."""
+    seats = []
+    pos = 0
+    for i, letter in enumerate(letters):
+        if i and letters[i - 1] in aisle and letter in aisle:
+            pos += 1  # crossing the aisle is not "adjacent"
+        position = "window" if letter in window else "aisle" if letter in aisle else "middle" if letter in middle else ""
+        seats.append(_seat(f"{prefix}{row}{letter}", block, pos, position, *extra))
+        pos += 1
+    return seats
+
+
+def _flight_layout(cls: str) -> List[Dict[str, Any]]:
+    rows, letters, window, aisle, middle = FLIGHT_CABINS[cls]
+    first_row = rows[0]
+    seats = []
+    for row in rows:
+        extra = []
+        if row == first_row:
+            extra += ["extra_legroom", "bulkhead"]
+        if row in FLIGHT_EXIT_ROWS and cls == "economy":
+            extra += ["extra_legroom", "near_exit", "exit"]
+        if row - first_row < 5:
+            extra += ["quiet_zone", "front"]
+        for s in _row_seats("", row, letters, window, aisle, middle, (str(row),), *extra):
+            if "aisle" in s["tags"] or cls in ("first", "business"):
+                s["tags"] = s["tags"] | {"accessible"}
+            seats.append(s)
+    return seats
+
+
+def _train_layout(cls: str) -> List[Dict[str, Any]]:
+    seats = []
+    if cls == "CC":
+        prefix, coaches, rows, letters, window, aisle, middle = TRAIN_CHAIR_CAR
+        for c in range(1, coaches + 1):
+            coach = f"{prefix}{c}"
+            for row in range(1, rows + 1):
+                extra = ["quiet_coach" if c == coaches else "", "front" if row <= 3 else ""]
+                for s in _row_seats("", row, letters, window, aisle, middle, (coach, str(row)), *extra):
+                    # chair car seats are numbered sequentially in a coach
+                    number = (row - 1) * len(letters) + letters.index(s["seat"][-1]) + 1
+                    s["seat"] = f"{coach}-{number}"
+                    if "aisle" in s["tags"]:
+                        s["tags"] = s["tags"] | {"accessible"}
+                    seats.append(s)
+        return seats
+
+    prefix, coaches, bays, pattern = TRAIN_COACHES[cls]
+    for c in range(1, coaches + 1):
+        coach = f"{prefix}{c}"
+        for bay in range(bays):
+            for i, berth in enumerate(pattern):
+                number = bay * len(pattern) + i + 1
+                accessible = "accessible" if berth in ("lower", "side_lower") else ""
+                seats.append(_seat(f"{coach}-{number}", (coach, str(bay + 1)), i, berth, accessible))
+    return seats
+
+
+def _bus_layout(cls: str) -> List[Dict[str, Any]]:
+    seats = []
+    if cls == "seater":
+        for row in range(1, 11):
+            extra = "front" if row <= 3 else ""
+            for s in _row_seats("", row, "ABCD", "AD", "BC", "", (str(row),), extra):
+                if "aisle" in s["tags"] or row <= 3:
+                    s["tags"] = s["tags"] | {"accessible"}
+                seats.append(s)
+        return seats
+
+    # 2+1 sleeper: per deck row one single berth, then a double berth across the aisle
+    for deck, prefix in (("lower", "L"), ("upper", "U")):
+        for row in range(1, 6):
+            n = (row - 1) * 3
+            front = "front" if row <= 2 else ""
+            accessible = "accessible" if deck == "lower" else ""
+            block = (deck, str(row))
+            seats.append(_seat(f"{prefix}{n + 1}", block, 0, deck, "window", "single", front, accessible))
+            seats.append(_seat(f"{prefix}{n + 2}", block, 2, deck, "aisle", "double", front, accessible))
+            seats.append(_seat(f"{prefix}{n + 3}", block, 3, deck, "window", "double", front, accessible))
+    return seats
+
+
+def _ship_layout(cls: str) -> List[Dict[str, Any]]:
+    seats = []
+    if cls == "deck":
+        for row in range(1, 21):
+            for s in _row_seats("D", row, "ABCDEF", "AF", "CD", "BE", (str(row),), "front" if row <= 4 else ""):
+                if "aisle" in s["tags"]:
+                    s["tags"] = s["tags"] | {"accessible"}
+                seats.append(s)
+        return seats
+
+    _, pattern, amenities = SHIP_CABINS[cls]
+    for deck in (1, 2):
+        for cabin in range(1, 21):
+            number = deck * 100 + cabin
+            sea_view = "sea_view" if cabin % 2 else ""  # odd cabins are on the outer side
+            for i, berth in enumerate(pattern):
+                accessible = "accessible" if berth == "lower" and deck == 1 else ""
+                seats.append(_seat(f"{number}-{'LU'[berth == 'upper']}{i + 1}", (str(number),), i,
+                                   berth, sea_view, accessible, *amenities))
+    return seats
+
+
+LAYOUT_BUILDERS = {
+    "flight": _flight_layout,
+    "train": _train_layout,
+    "bus": _bus_layout,
+    "ship": _ship_layout,
+}
+
+# Modes where a whole block (bay / cabin) counts as one contiguous unit.
+COMPARTMENT_MODES = {("train", "SL"), ("train", "3A"), ("train", "2A"), ("train", "1A"),
+                     ("ship", "standard cabin"), ("ship", "deluxe cabin"), ("ship", "suite")}
+
+
+@lru_cache(maxsize=None)
+def _layout(mode: str, cls: str) -> Tuple[Dict[str, Any], ...]:
+    return tuple(LAYOUT_BUILDERS[mode](cls))
+
+
+# ---- Scoring ----
+def _norm(value: Any) -> str:
+    return str(value or "").strip().lower().replace("-", "_").replace(" ", "_")
+
+
+def _wanted_tags(mode: str, prefs: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """Return (position tags, extra tags) requested in the mode's preference fields."""
+    positions = []
+    for field in ("seat_position", "berth_type", "berth_position"):
+        value = _norm(prefs.get(field))
+        if value:
+            positions.append(value)
+    extras = []
+    for field in ("extras", "amenities"):
+        value = prefs.get(field) or []
+        if isinstance(value, str):
+            value = [value]
+        extras += [_norm(v) for v in value if v]
+    if _norm(prefs.get("quiet_coach")) in ("yes", "true"):
+        extras.append("quiet_coach")
+    return positions, extras
+
+
+def _score(seat: Dict[str, Any], traveler: Dict[str, Any], positions: List[str], extras: List[str]) -> int:
+    tags = seat["tags"]
+    kind = traveler["type"]
+    if "exit" in tags and (kind in ("senior", "child") or traveler.get("with_infant")):
+        return BLOCKED
+
+    score = 0
+    score += sum(3 for p in positions if p in tags)
+    score += sum(2 for e in extras if e in tags)
+    if kind == "senior":
+        score += 6 if "accessible" in tags else 0
+        score += 1 if "front" in tags else 0
+        score -= 6 if tags & {"upper", "middle", "side_upper"} else 0
+    if kind == "child":
+        score -= 2 if tags & {"upper", "side_upper"} else 0
+    if traveler.get("with_infant"):
+        score += 3 if "bulkhead" in tags else 0
+        score -= 4 if tags & {"upper", "middle", "side_upper"} else 0
+    return score
+
+
+def _assign(seats: List[Dict[str, Any]], travelers: List[Dict[str, Any]],
+            positions: List[str], extras: List[str]) -> Tuple[int, List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+    """Greedy assignment inside a chosen run: the most constrained travellers pick first."""
+    free = list(seats)
+    total = 0
+    pairs = []
+    for traveler in sorted(travelers, key=lambda t: t["priority"]):
+        best = max(free, key=lambda s: (_score(s, traveler, positions, extras), -s["pos"]))
+        score = _score(best, traveler, positions, extras)
+        if score <= BLOCKED:
+            return BLOCKED, []
+        total += score
+        pairs.append((traveler, best))
+        free.remove(best)
+    return total, pairs
+
+
+def _runs(block_seats: List[Dict[str, Any]], size: int, compartment: bool):
+    """Yield (gap_penalty, seats) candidates of `size` free seats inside one block."""
+    if compartment:
+        if len(block_seats) <= 8:
+            for combo in combinations(block_seats, size):
+                yield 0, list(combo)
+        else:
+            yield 0, block_seats[:size]
+        return
+    ordered = sorted(block_seats, key=lambda s: s["pos"])
+    for i in range(len(ordered) - size + 1):
+        run = ordered[i:i + size]
+        gaps = sum(b["pos"] - a["pos"] - 1 for a, b in zip(run, run[1:]))
+        if gaps <= 1:  # allow at most one aisle between group members
+            yield gaps, run
+
+
+def _travelers(adults: int, children: int, infants: int, seniors: int) -> List[Dict[str, Any]]:
+    """Seated travellers; infants travel on an adult's lap and mark that adult."""
+    people = []
+    for i in range(seniors):
+        people.append({"label": f"senior_{i + 1}", "type": "senior", "priority": 0})
+    for i in range(adults):
+        people.append({"label": f"adult_{i + 1}", "type": "adult", "priority": 2,
+                       "with_infant": i < infants})
+    for i in range(children):
+        people.append({"label": f"child_{i + 1}", "type": "child", "priority": 1})
+    for p in people:
+        if p.get("with_infant"):
+            p["priority"] = 1
+    return people
+
+
+def _place_group(layout: Tuple[Dict[str, Any], ...], taken: set, travelers: List[Dict[str, Any]],
+                 positions: List[str], extras: List[str], compartment: bool):
+    """Place travellers on as few blocks as possible, preferring neighbouring blocks when splitting."""
+    blocks: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    order: List[Tuple[str, ...]] = []
+    for seat in layout:
+        if seat["seat"] in taken:
+            continue
+        if seat["block"] not in blocks:
+            blocks[seat["block"]] = []
+            order.append(seat["block"])
+        blocks[seat["block"]].append(seat)
+    index = {b: i for i, b in enumerate(order)}
+
+    placed: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+    remaining = list(travelers)
+    used_blocks: List[int] = []
+    while remaining:
+        best = None
+        size = min(len(remaining), max((len(s) for s in blocks.values()), default=0))
+        while size and best is None:
+            # keep the most constrained travellers together in the first chunk
+            chunk = sorted(remaining, key=lambda t: t["priority"])[:size]
+            for block in order:
+                if len(blocks[block]) < size:
+                    continue
+                near = -min((abs(index[block] - u) for u in used_blocks), default=0)
+                for gaps, run in _runs(blocks[block], size, compartment):
+                    score, pairs = _assign(run, chunk, positions, extras)
+                    if score <= BLOCKED:
+                        continue
+                    key = (score - 2 * gaps + 2 * near, -index[block])
+                    if best is None or key > best[0]:
+                        best = (key, block, pairs)
+            if best is None:
+                size -= 1
+        if best is None:
+            return None
+        _, block, pairs = best
+        used_blocks.append(index[block])
+        for traveler, seat in pairs:
+            placed.append((traveler, seat))
+            remaining.remove(traveler)
+            blocks[block].remove(seat)
+    return placed
+
+
+# ---- Tool ----
+def allocate_seats(
+    mode: str,
+    seat_class: str,
+    adults: int = 1,
+    children: int = 0,
+    infants: int = 0,
+    seniors: int = 0,
+    preferences: Optional[Dict[str, Any]] = None,
+    occupied: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Allocate seats/berths/cabins for the whole group on the chosen transport option.
+
+    Args:
+        mode: "flight" | "train" | "bus" | "ship".
+        seat_class: flight class (Economy/Premium Economy/Business/First), train class
+            (Sleeper/Chair Car/3AC/2AC/1AC), bus seat_type (Seater/Sleeper) or ship
+            cabin_class (Deck/Standard Cabin/Deluxe Cabin/Suite).
+        adults, children, seniors: travellers needing a seat (seniors are counted
+            separately from adults). Infants sit on an adult's lap.
+        preferences: the mode's preference fields, e.g.
+            flight {"seat_position": "Window", "extras": ["extra_legroom"]},
+            train {"berth_type": "Lower", "quiet_coach": "yes"},
+            bus {"ac": "AC", "berth_position": "Lower", "seat_position": "Window"},
+            ship {"berth_position": "Lower", "amenities": ["sea_view"]}.
+        occupied: seat ids already taken on this service, if known.
+
+    Returns:
+        The seat/cabin selection JSON for the mode plus
+        "seats": [{"seat", "traveler", "attributes"}], "contiguous" and "notes".
+    """
+    mode = _norm(mode)
+    if mode not in LAYOUT_BUILDERS:
+        return {"status": "error", "error": f"unsupported mode '{mode}'; use flight, train, bus or ship"}
+    cls = CLASS_ALIASES[mode].get(str(seat_class or "").strip().lower())
+    if cls is None:
+        return {"status": "error", "error": f"unknown {mode} class '{seat_class}'"}
+
+    prefs = dict(preferences or {})
+    travelers = _travelers(max(0, int(adults)), max(0, int(children)), max(0, int(infants)), max(0, int(seniors)))
+    if not travelers:
+        return {"status": "error", "error": "no travellers to seat"}
+    if int(infants) > int(adults):
+        return {"status": "error", "error": "each infant must travel with an adult"}
+
+    positions, extras = _wanted_tags(mode, prefs)
+    layout = _layout(mode, cls)
+    placed = _place_group(layout, set(occupied or []), travelers, positions, extras,
+                          (mode, cls) in COMPARTMENT_MODES)
+    if placed is None:
+        return {"status": "error", "error": f"not enough free {DISPLAY_CLASS[cls]} seats for {len(travelers)} travellers"}
+
+    placed.sort(key=lambda p: layout.index(p[1]))
+    blocks = {seat["block"] for _, seat in placed}
+    notes = []
+    unmet = [p for p in positions if not any(p in seat["tags"] for _, seat in placed)]
+    if unmet:
+        notes.append(f"preference not available for this group: {', '.join(unmet)}")
+    if any(t["type"] == "senior" for t, seat in placed if "accessible" not in seat["tags"]):
+        notes.append("not every senior could get an accessible seat")
+    if extras and "quiet_coach" in extras and not any("quiet_coach" in s["tags"] for _, s in placed):
+        notes.append("quiet coach not available for this class")
+
+    result: Dict[str, Any] = {"mode": mode}
+    if mode == "flight":
+        result.update({"class": DISPLAY_CLASS[cls], "seat_position": prefs.get("seat_position"),
+                       "extras": prefs.get("extras") or []})
+    elif mode == "train":
+        result.update({"class": DISPLAY_CLASS[cls], "berth_type": prefs.get("berth_type"),
+                       "quiet_coach": prefs.get("quiet_coach") or "no"})
+    elif mode == "bus":
+        result.update({"seat_type": DISPLAY_CLASS[cls], "ac": prefs.get("ac"),
+                       "berth_position": prefs.get("berth_position"), "seat_position": prefs.get("seat_position")})
+    else:
+        result.update({"cabin_class": DISPLAY_CLASS[cls], "berth_position": prefs.get("berth_position"),
+                       "amenities": prefs.get("amenities") or []})
+
+    result.update({
+        "seats": [
+            {"seat": seat["seat"], "traveler": traveler["label"], "attributes": sorted(seat["tags"])}
+            for traveler, seat in placed
+        ],
+        "contiguous": len(blocks) == 1,
+        "notes": notes,
+        "status": "ok",
+    })
+    logger.info("Allocated %d %s seats across %d block(s)", len(placed), mode, len(blocks))
+    return result
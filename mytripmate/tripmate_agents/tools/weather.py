@@ -0,0 +1,251 @@
+# tripmate_agents/tools/weather.py
+"""
+Batched, cached weather lookups for a whole itinerary.
+
+- get_weather_batch(locations) takes every (city, date) pair of the plan in one call,
+  deduplicates them, serves repeats from a cache keyed by (city, date, forecast issue
+  time) and fetches the rest once per city. It is an async tool: the blocking work
+  (weather_batch: HTTP requests, one thread per city) runs in a worker thread, so a
+  slow provider never stalls the event loop the other sessions share.
+- Providers are pluggable (WEATHER_PROVIDER):
+    "open-meteo": live daily forecast, no API key needed.
+    "fixture":    local JSON stand-in (tripmate_agents/weather/forecast_fixture.json),
+                  so the tool works offline and in tests.
+"""
+
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+import requests
+
+from .cache import MemoryBackend, TTLCache
+from .config import WEATHER_FIXTURE_PATH, WEATHER_PROVIDER
+from .search_cache import normalize_place
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+FORECAST_DAYS = 16
+
+# WMO weather codes -> short summary
+WMO_SUMMARY = {
+    0: "clear", 1: "mainly clear", 2: "partly cloudy", 3: "overcast", 45: "fog", 48: "fog",
+    51: "light drizzle", 53: "drizzle", 55: "heavy drizzle", 61: "light rain", 63: "rain",
+    65: "heavy rain", 80: "rain showers", 81: "rain showers", 82: "violent rain showers",
+    95: "thunderstorm", 96: "thunderstorm with hail", 99: "thunderstorm with hail",
+}
+
+
+# ---- Helpers ----
+def _norm_city(city: Any) -> str:
+    return normalize_place(city)
+
+
+def _norm_date(value: Any) -> Optional[str]:
+    try:
+        return datetime.strptime(str(value).strip()[:10], "%Y-%m-%d").date().isoformat()
+    except ValueError:
+        return None
+
+
+def _alerts(day: Dict[str, Any]) -> List[str]:
+    alerts = []
+    if (day.get("precip_mm") or 0) >= 20 or (day.get("precip_probability") or 0) >= 80:
+        alerts.append("heavy rain likely: slippery trails, plan indoor backups")
+    if (day.get("temp_max_c") or 0) >= 38:
+        alerts.append("heat: avoid outdoor activities 12:00-16:00, stay hydrated")
+    if day.get("temp_min_c") is not None and day["temp_min_c"] <= 2:
+        alerts.append("near-freezing nights: carry warm layers")
+    if (day.get("weather_code") or 0) >= 95:
+        alerts.append("thunderstorms: avoid peaks and open water")
+    return alerts
+
+
+# ---- Providers ----
+class FixtureWeatherProvider:
+    """Offline provider backed by a JSON file of daily forecasts and monthly normals per city."""
+
+    name = "fixture"
+
+    def __init__(self, path: str = WEATHER_FIXTURE_PATH):
+        self.path = path
+        with open(path, "r", encoding="utf-8") as f:
+            self.data = json.load(f)
+        self.cities = {_norm_city(k): v for k, v in self.data.get("cities", {}).items()}
+
+    def issue_time(self) -> str:
+        return self.data.get("issued_at", "fixture")
+
+    def fetch(self, city: str, dates: List[str]) -> Dict[str, Dict[str, Any]]:
+        entry = self.cities.get(_norm_city(city))
+        if entry is None:
+            return {d: {"status": "unknown_city"} for d in dates}
+        out = {}
+        for d in dates:
+            day = entry.get("daily", {}).get(d)
+            if day is None:
+                day = dict(entry.get("monthly", {}).get(str(int(d[5:7])), {}))
+                day["basis"] = "monthly normal"
+            out[d] = {**day, "status": "ok" if day else "no_data"}
+        return out
+
+
+class OpenMeteoProvider:
+    """Live daily forecasts from Open-Meteo (up to 16 days ahead)."""
+
+    name = "open-meteo"
+
+    def __init__(self, timeout: int = 5):
+        self.timeout = timeout
+        self._geocode: Dict[str, Optional[Dict[str, float]]] = {}
+
+    def issue_time(self) -> str:
+        # Forecast models refresh every few hours; bucket to 6h so a new run invalidates the cache.
+        now = datetime.now(timezone.utc)
+        return now.replace(hour=now.hour - now.hour % 6, minute=0, second=0, microsecond=0).isoformat()
+
+    def _locate(self, city: str) -> Optional[Dict[str, float]]:
+        key = _norm_city(city)
+        if key not in self._geocode:
+            try:
+                resp = requests.get(GEOCODE_URL, params={"name": city, "count": 1}, timeout=self.timeout)
+                resp.raise_for_status()
+                results = resp.json().get("results") or []
+            except requests.RequestException as e:
+                logger.warning("Geocoding failed for %s: %s", city, e)
+                return None
+            self._geocode[key] = (
+                {"latitude": results[0]["latitude"], "longitude": results[0]["longitude"]} if results else None
+            )
+        return self._geocode[key]
+
+    def fetch(self, city: str, dates: List[str]) -> Dict[str, Dict[str, Any]]:
+        where = self._locate(city)
+        if where is None:
+            return {d: {"status": "unknown_city"} for d in dates}
+        today = datetime.now(timezone.utc).date()
+        in_range = [d for d in dates if 0 <= (datetime.fromisoformat(d).date() - today).days < FORECAST_DAYS]
+        out = {d: {"status": "out_of_forecast_range"} for d in dates if d not in in_range}
+        if not in_range:
+            return out
+        params = {
+            **where,
+            "daily": "weather_code,temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max",
+            "timezone": "auto",
+            "start_date": min(in_range),
+            "end_date": max(in_range),
+        }
+        try:
+            resp = requests.get(FORECAST_URL, params=params, timeout=self.timeout)
+            resp.raise_for_status()
+            daily = resp.json().get("daily") or {}
+        except requests.RequestException as e:
+            logger.warning("Forecast request failed for %s: %s", city, e)
+            return {**out, **{d: {"status": "error", "error": str(e)} for d in in_range}}
+        for i, d in enumerate(daily.get("time") or []):
+            if d in in_range:
+                code = daily["weather_code"][i]
+                out[d] = {
+                    "status": "ok",
+                    "summary": WMO_SUMMARY.get(code, "mixed"),
+                    "weather_code": code,
+                    "temp_min_c": daily["temperature_2m_min"][i],
+                    "temp_max_c": daily["temperature_2m_max"][i],
+                    "precip_mm": daily["precipitation_sum"][i],
+                    "precip_probability": daily["precipitation_probability_max"][i],
+                }
+        return out
+
+
+PROVIDERS = {"fixture": FixtureWeatherProvider, "open-meteo": OpenMeteoProvider}
+
+_provider = None
+weather_cache = TTLCache(backend=MemoryBackend(max_entries=4096), default_ttl=6 * 60 * 60)
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = PROVIDERS.get(WEATHER_PROVIDER, OpenMeteoProvider)()
+    return _provider
+
+
+def set_provider(provider) -> None:
+    """Swap the weather provider (e.g. a FixtureWeatherProvider in tests)."""
+    global _provider
+    _provider = provider
+
+
+# ---- Tool ----
+def weather_batch(locations: List[Dict[str, str]]) -> Dict[str, Any]:
+    """get_weather_batch's work; blocks on the provider, so call it from a worker thread."""
+    provider = get_provider()
+    issued = provider.issue_time()
+
+    pairs, seen, invalid = [], set(), []
+    for loc in locations or []:
+        city, date = (loc or {}).get("city"), _norm_date((loc or {}).get("date"))
+        if not city or date is None:
+            invalid.append(loc)
+            continue
+        key = (_norm_city(city), date)
+        if key not in seen:
+            seen.add(key)
+            pairs.append((city, date))
+
+    results: Dict[tuple, Dict[str, Any]] = {}
+    missing: Dict[str, List[str]] = {}
+    for city, date in pairs:
+        cached, _ = weather_cache.lookup("weather", f"{_norm_city(city)}|{date}|{issued}")
+        if cached is not None:
+            results[(_norm_city(city), date)] = {**cached, "cached": True}
+        else:
+            missing.setdefault(city, []).append(date)
+    hits = len(results)
+
+    def fetch(item):
+        city, dates = item
+        return city, provider.fetch(city, dates)
+
+    with ThreadPoolExecutor(max_workers=min(8, len(missing) or 1)) as pool:
+        for city, days in pool.map(fetch, missing.items()):
+            for date, day in days.items():
+                day = {**day, "alerts": _alerts(day)} if day.get("status") == "ok" else day
+                if day.get("status") == "ok":
+                    weather_cache.store("weather", f"{_norm_city(city)}|{date}|{issued}", day)
+                results[(_norm_city(city), date)] = {**day, "cached": False}
+
+    forecasts = [
+        {"city": city, "date": date, **results.get((_norm_city(city), date), {"status": "no_data"}),
+         "issued_at": issued}
+        for city, date in pairs
+    ]
+    logger.info("Weather batch: %d requested, %d unique, %d cache hits", len(locations or []), len(pairs), hits)
+    return {
+        "forecasts": forecasts,
+        "invalid": invalid,
+        "requested": len(locations or []),
+        "unique": len(pairs),
+        "cache_hits": hits,
+        "provider": provider.name,
+    }
+
+
+async def get_weather_batch(locations: List[Dict[str, str]]) -> Dict[str, Any]:
+    """
+    Weather for every (city, date) of an itinerary in one call.
+
+    Args:
+        locations: [{"city": "Chikkamagaluru", "date": "YYYY-MM-DD"}, ...]; duplicates are fine.
+
+    Returns:
+        {"forecasts": [{"city", "date", "status", "summary", "temp_min_c", "temp_max_c",
+          "precip_mm", "precip_probability", "alerts", "issued_at", "cached"}],
+         "requested", "unique", "cache_hits", "provider"}
+    """
+    return await asyncio.to_thread(weather_batch, locations)
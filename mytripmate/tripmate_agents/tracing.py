@@ -0,0 +1,249 @@
+# tripmate_agents/tracing.py
+"""
+Span tracing for a whole turn: root agent -> sub-agents -> AgentTools -> tools.
+
+ADK already opens OpenTelemetry spans for every invocation, agent run (invoke_agent),
+model call (call_llm / generate_content) and tool call (execute_tool), nested by
+context, including the runs an AgentTool starts inside its tool call. This module only
+adds where they go:
+
+- setup_tracing(path) hooks two processors into the OpenTelemetry tracer provider
+  (creating one if `adk web` has not): one stamps every span with the turn's session id
+  (tripmate.session_id, inherited from the parent, so AgentTool child sessions keep the
+  user's id), and one batches finished spans into a JSONL file (OTLP-like field names).
+  build_root_agent() calls it when TRACE_PATH is set.
+- The analysis helpers below (critical_path, self_time, ...) read that file back;
+  `python -m tripmate_agents.critical_path TRACE_PATH` prints them for one turn.
+"""
+
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .tools.config import TRACE_MAX_ATTR_CHARS, TRACE_PATH
+
+logger = logging.getLogger(__name__)
+
+SESSION_ATTR = "tripmate.session_id"
+# ADK's session id attributes on invoke_agent / call_llm spans.
+SESSION_SOURCES = ("gen_ai.conversation.id", "gcp.vertex.agent.session_id")
+
+_setup_lock = threading.Lock()
+_tracing_path: Optional[str] = None
+
+
+# ---- Export ----
+def _attribute(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return [_attribute(v) for v in value]
+    if isinstance(value, str) and TRACE_MAX_ATTR_CHARS and len(value) > TRACE_MAX_ATTR_CHARS:
+        return f"{value[:TRACE_MAX_ATTR_CHARS]}... [+{len(value) - TRACE_MAX_ATTR_CHARS} chars]"
+    return value
+
+
+def span_to_dict(span) -> Dict[str, Any]:
+    """A finished OpenTelemetry span as a plain dict (OTLP JSON field names, hex ids)."""
+    context, parent = span.get_span_context(), span.parent
+    return {
+        "trace_id": format(context.trace_id, "032x"),
+        "span_id": format(context.span_id, "016x"),
+        "parent_span_id": format(parent.span_id, "016x") if parent else None,
+        "name": span.name,
+        "kind": span.kind.name,
+        "start_time_unix_nano": span.start_time,
+        "end_time_unix_nano": span.end_time,
+        "status": {"code": span.status.status_code.name, "message": span.status.description},
+        "attributes": {k: _attribute(v) for k, v in (span.attributes or {}).items()},
+    }
+
+
+def _exporter_classes():
+    # OpenTelemetry comes with google-adk; imported here so the module loads without it.
+    from opentelemetry.context import Context
+    from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonlSpanExporter(SpanExporter):
+        """Appends finished spans to a JSONL file, one span per line."""
+
+        def __init__(self, path: str):
+            self.path = path
+            self._lock = threading.Lock()
+
+        def export(self, spans: Sequence[ReadableSpan]) -> "SpanExportResult":
+            lines = "".join(json.dumps(span_to_dict(s), default=str) + "\n" for s in spans)
+            try:
+                with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                    f.write(lines)
+            except OSError as e:
+                logger.warning("Could not write spans to %s: %s", self.path, e)
+                return SpanExportResult.FAILURE
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self) -> None:
+            return None
+
+    class SessionSpanProcessor(SpanProcessor):
+        """Stamps each span with the session id of its parent, or its own if it is the first."""
+
+        def __init__(self):
+            self._open: Dict[int, Span] = {}
+
+        def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+            self._open[span.get_span_context().span_id] = span
+            parent = self._open.get(span.parent.span_id) if span.parent else None
+            # ADK sets the session id on a span after starting it, so the parent's
+            # attributes are read now, when the child starts.
+            session = _session_attribute(parent.attributes) if parent is not None else None
+            session = session or _session_attribute(span.attributes)
+            if session:
+                span.set_attribute(SESSION_ATTR, session)
+
+        def on_end(self, span: ReadableSpan) -> None:
+            self._open.pop(span.get_span_context().span_id, None)
+
+    return JsonlSpanExporter, SessionSpanProcessor
+
+
+def setup_tracing(path: Optional[str] = TRACE_PATH) -> Optional[str]:
+    """Export all spans to `path` (JSONL). Idempotent; no-op without a path."""
+    global _tracing_path
+    if not path:
+        return None
+    with _setup_lock:
+        if _tracing_path is not None:
+            return _tracing_path
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        except ImportError as e:
+            logger.warning("Tracing disabled, OpenTelemetry SDK missing: %s", e)
+            return None
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            provider = TracerProvider()
+            trace.set_tracer_provider(provider)
+        JsonlSpanExporter, SessionSpanProcessor = _exporter_classes()
+        provider.add_span_processor(SessionSpanProcessor())
+        provider.add_span_processor(BatchSpanProcessor(JsonlSpanExporter(path)))
+        _tracing_path = path
+        logger.info("Writing trace spans to %s", path)
+    return _tracing_path
+
+
+# ---- Analysis ----
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    return spans
+
+
+def _session_attribute(attributes) -> Optional[str]:
+    attributes = attributes or {}
+    return attributes.get(SESSION_ATTR) or next((attributes[k] for k in SESSION_SOURCES if attributes.get(k)), None)
+
+
+def session_of(span: Dict[str, Any]) -> Optional[str]:
+    return _session_attribute(span.get("attributes"))
+
+
+def trace_session(spans: List[Dict[str, Any]]) -> Optional[str]:
+    """Session id of a trace (the runner's root span itself carries none)."""
+    ordered = sorted(spans, key=lambda s: s["start_time_unix_nano"])
+    return next((session for session in map(session_of, ordered) if session), None)
+
+
+# Model spans wrap a response generator: ADK runs the tools of a response while that
+# generator is suspended, so the span stays open over its sibling tool spans.
+GENERATOR_SPANS = ("call_llm", "generate_content")
+
+
+def build_tree(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Index one trace's spans: {"roots": [...], "children": {span_id: [...]}} (children by
+    start). Model spans are cut off where the next sibling starts, and every span where
+    its parent ends, so time is not counted twice; the recorded end is kept in
+    "raw_end_time_unix_nano".
+    """
+    ids = {s["span_id"] for s in spans}
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    roots = []
+    for span in sorted(spans, key=lambda s: s["start_time_unix_nano"]):
+        span.setdefault("raw_end_time_unix_nano", span["end_time_unix_nano"])
+        parent = span.get("parent_span_id")
+        if parent in ids:
+            children.setdefault(parent, []).append(span)
+        else:
+            roots.append(span)
+
+    def clip(span: Dict[str, Any]) -> None:
+        kids = children.get(span["span_id"], [])
+        for i, kid in enumerate(kids):
+            end = min(kid["raw_end_time_unix_nano"], span["end_time_unix_nano"])
+            if kid["name"].startswith(GENERATOR_SPANS):
+                later = [k["start_time_unix_nano"] for k in kids[i + 1:]
+                         if k["start_time_unix_nano"] > kid["start_time_unix_nano"]]
+                end = min([end, *later])
+            kid["end_time_unix_nano"] = max(end, kid["start_time_unix_nano"])
+            clip(kid)
+
+    for root in roots:
+        clip(root)
+    return {"roots": roots, "children": children}
+
+
+def duration(span: Dict[str, Any]) -> float:
+    return (span["end_time_unix_nano"] - span["start_time_unix_nano"]) / 1e9
+
+
+def self_time(span: Dict[str, Any], children: List[Dict[str, Any]]) -> float:
+    """Seconds of `span` not covered by any child (overlapping children are merged)."""
+    covered, cursor = 0, span["start_time_unix_nano"]
+    for child in sorted(children, key=lambda c: c["start_time_unix_nano"]):
+        start, end = max(child["start_time_unix_nano"], cursor), min(child["end_time_unix_nano"], span["end_time_unix_nano"])
+        if end > start:
+            covered += end - start
+            cursor = end
+    return max(0.0, duration(span) - covered / 1e9)
+
+
+def critical_path(span: Dict[str, Any], children: Dict[str, List[Dict[str, Any]]],
+                  depth: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    (depth, span) pairs the turn waited on. Walking back from a span's end, the child
+    that finished last is critical, then the child that finished last before it
+    started, and so on; a parallel sibling that finished earlier is not.
+    """
+    path = [(depth, span)]
+    kids, chain, cursor = children.get(span["span_id"], []), [], span["end_time_unix_nano"]
+    while True:
+        before = [k for k in kids if k["end_time_unix_nano"] <= cursor and k not in chain]
+        if not before:
+            break
+        chain.append(max(before, key=lambda k: k["end_time_unix_nano"]))
+        cursor = chain[-1]["start_time_unix_nano"]
+    for kid in reversed(chain):
+        path.extend(critical_path(kid, children, depth + 1))
+    return path
+
+
+def select_trace(spans: List[Dict[str, Any]], trace_id: Optional[str] = None,
+                 session: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Spans of `trace_id`, else of the latest trace (of `session`, when given)."""
+    if session:
+        traces = {s["trace_id"] for s in spans if session_of(s) == session}
+        spans = [s for s in spans if s["trace_id"] in traces]
+    if not spans:
+        return []
+    if trace_id is None:
+        trace_id = max(spans, key=lambda s: s["end_time_unix_nano"])["trace_id"]
+    return [s for s in spans if s["trace_id"].startswith(trace_id)]